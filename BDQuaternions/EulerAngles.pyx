@@ -1,20 +1,20 @@
+"""
+Euler angles conversion algorithms after Ken Shoemake in Graphics Gems IV (Academic Press, 1994), p. 222
+
+All angles are in radians by default
+"""
+
 import numpy as np
 
 from cython import boundscheck, wraparound
 
 from cpython.array cimport array, clone
-from libc.math cimport sin, cos, atan2, sqrt, M_PI, fabs
-from libc.float cimport DBL_MIN
+from libc.math cimport M_PI, fabs
 from .EulerAnglesConventions cimport Convention
+from .euler_angles_arrays cimport euler_to_rotation_matrix, euler_from_rotation_matrix
 from ._quaternion_operations cimport quaternion_to_rotation_matrix, quaternion_from_rotation_matrix
 from .Rotation cimport Rotation
 
-"""
-Euler angles conversion algorithms after Ken Shoemake in Graphics Gems IV (Academic Press, 1994), p. 222
-
-All angles are in radians by default
-"""
-
 cdef class EulerAngles(object):
 
     def __init__(self, double[:] euler_angles, Convention convention):
@@ -70,6 +70,9 @@ cdef class EulerAngles(object):
     def convention(self):
         return self.__convention
 
+    def __reduce__(self):
+        return _restore_euler_angles, (np.array(self.__euler_angles), self.__convention)
+
     def __str__(self):
         cdef:
             int i
@@ -84,7 +87,7 @@ cdef class EulerAngles(object):
         Theoretically derived conventions can be nested endless.
         This function will bring the angles to the highest level parent convention.
         """
-        if self.__convention.__parent != self.__convention:
+        if self.__convention.__parent is not self.__convention:
             self.__euler_angles = self.__reduce_euler_angles(self.__convention.to_parent(self.__euler_angles))
             self.__convention = self.__convention.__parent
 
@@ -96,59 +99,13 @@ cdef class EulerAngles(object):
         :return: 3x3 rotation matrix as numpy array of floats
         """
         cdef:
-            Convention parent_convention = self.__convention
-            int inner_axis, parity, repetition, frame
-            int i, j, k
-            double ci, si, cj, sj, ck, sk, cc, ss, cs, sc
-            double[:, :] m = np.empty((3,3), dtype=np.double)
-            double[:] euler_angles
-            array[double] template = array('d')
-        euler_angles = clone(template, 3, zero=False)
-        euler_angles[0] = self.__euler_angles[0]
-        euler_angles[1] = self.__euler_angles[1]
-        euler_angles[2] = self.__euler_angles[2]
-        while parent_convention.__parent != parent_convention:
-            euler_angles = parent_convention.to_parent(euler_angles)
-            parent_convention = parent_convention.__parent
-        inner_axis, parity, repetition, frame = parent_convention.__code
-        i = parent_convention.__euler_safe_axis[inner_axis]
-        j = parent_convention.__euler_next_axis[i + parity]
-        k = parent_convention.__euler_next_axis[i - parity + 1]
-        if frame:
-            euler_angles[0], euler_angles[2] = euler_angles[2], euler_angles[0]
-        if parity:
-            euler_angles[0], euler_angles[1], euler_angles[2] = -euler_angles[0], -euler_angles[1], -euler_angles[2]
-        ci = cos(euler_angles[0])
-        si = sin(euler_angles[0])
-        cj = cos(euler_angles[1])
-        sj = sin(euler_angles[1])
-        ck = cos(euler_angles[2])
-        sk = sin(euler_angles[2])
-        cc = ci * ck
-        ss = si * sk
-        cs = ci * sk
-        sc = si * ck
-
-        if repetition:
-            m[i, i] = cj
-            m[i, j] = si * sj
-            m[i, k] = ci * sj
-            m[j, i] = sj * sk
-            m[j, j] = cc - cj * ss
-            m[j, k] = -sc - cj * cs
-            m[k, i] = -sj * ck
-            m[k, j] = cs + cj * sc
-            m[k, k] = cj * cc - ss
-        else:
-            m[i, i] = cj * ck
-            m[i, j] = sj * sc - cs
-            m[i, k] = sj * cc + ss
-            m[j, i] = cj * sk
-            m[j, j] = sj * ss + cc
-            m[j, k] = sj * cs - sc
-            m[k, i] = -sj
-            m[k, j] = si * cj
-            m[k, k] = ci * cj
+            double[:] root_angles = self.__convention.to_root(self.__euler_angles)
+            double euler_angles[3]
+            double[:, ::1] m = np.empty((3, 3), dtype=np.double)
+        euler_angles[0] = root_angles[0]
+        euler_angles[1] = root_angles[1]
+        euler_angles[2] = root_angles[2]
+        euler_to_rotation_matrix(euler_angles, &self.__convention.__root.__plan, &m[0, 0])
         return m
 
     @boundscheck(False)
@@ -161,55 +118,16 @@ cdef class EulerAngles(object):
         :return: ax, ay, az three Euler angles
         """
         cdef:
-            Convention parent_convention = convention
-            Convention current_convention = convention
-            int inner_axis, parity, repetition, frame
-            int i, j, k
-            double ci, si, cj, sj, ck, sk, sy, cy, ax, ay, az
-            double[:] euler_angles
-            array[double] template = array('d')
+            int i, j
+            double m_c[9]
+            array[double] euler_angles, template = array('d')
         euler_angles = clone(template, 3, zero=False)
-        while parent_convention.__parent != parent_convention:
-            parent_convention = parent_convention.__parent
-        inner_axis, parity, repetition, frame = parent_convention.__code
-        i = parent_convention.__euler_safe_axis[inner_axis]
-        j = parent_convention.__euler_next_axis[i + parity]
-        k = parent_convention.__euler_next_axis[i - parity + 1]
-        if repetition:
-            sy = sqrt(m[i, j] * m[i, j] + m[i, k] * m[i, k])
-            if sy > DBL_MIN * 4:
-                ax = atan2(m[i, j], m[i, k])
-                ay = atan2(sy, m[i, i])
-                az = atan2(m[j, i], -m[k, i])
-            else:
-                ax = atan2(-m[j, k], m[j, j])
-                ay = atan2(sy, m[i, i])
-                az = 0.0
-        else:
-            cy = sqrt(m[i, i] * m[i, i] + m[j, i] * m[j, i])
-            if cy > DBL_MIN * 4:
-                ax = atan2(m[k, j], m[k, k])
-                ay = atan2(-m[k, i], cy)
-                az = atan2(m[j, i], m[i, i])
-            else:
-                ax = atan2(-m[j, k], m[j, j])
-                ay = atan2(-m[k, i], cy)
-                az = 0.0
-        if parity:
-            ax, ay, az = -ax, -ay, -az
-        if frame:
-            ax, az = az, ax
-        euler_angles[0] = ax
-        euler_angles[1] = ay
-        euler_angles[2] = az
-        while parent_convention != convention:
-            while current_convention.__parent != parent_convention:
-                current_convention = current_convention.__parent
-            euler_angles = current_convention.from_parent(euler_angles)
-            parent_convention = current_convention
-            current_convention = convention
-        self.__euler_angles = euler_angles
-        self.__convention = current_convention
+        for i in range(3):
+            for j in range(3):
+                m_c[3 * i + j] = m[i, j]
+        euler_from_rotation_matrix(m_c, &convention.__root.__plan, &euler_angles.data.as_doubles[0])
+        self.__euler_angles = convention.from_root(euler_angles)
+        self.__convention = convention
 
 
     cpdef void change_convention(self, Convention new_convention):
@@ -252,3 +170,14 @@ cdef class EulerAngles(object):
 
     cpdef void from_quaternion(self, Rotation quaternion, Convention convention):
         self.__from_quaternion(quaternion.quadruple, convention)
+
+
+def _restore_euler_angles(double[:] euler_angles, Convention convention):
+    """
+    Unpickle EulerAngles with the angles stored as they were, bypassing the reduction done by __init__
+    """
+    cdef:
+        EulerAngles result = EulerAngles.__new__(EulerAngles)
+    result.__euler_angles = array('d', euler_angles)
+    result.__convention = convention
+    return result
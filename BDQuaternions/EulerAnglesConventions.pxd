@@ -1,3 +1,12 @@
+ctypedef struct AxesPlan:
+    int i
+    int j
+    int k
+    int parity
+    int repetition
+    int frame
+
+
 cdef class Convention(object):
     cdef:
         int[4] __euler_safe_axis
@@ -11,10 +20,20 @@ cdef class Convention(object):
         Convention __parent
         Function __to_parent
         Function __from_parent
-        Conventions __conventions
+        Convention __root
+        list __chain
+        AxesPlan __plan
+
+    cdef void __compile_plan(self)
 
     cpdef double[:] to_parent(self, double[:] euler_angles)
     cpdef double[:] from_parent(self, double[:] euler_angles)
+    cpdef to_parent_array(self, euler_angles)
+    cpdef from_parent_array(self, euler_angles)
+    cpdef double[:] to_root(self, double[:] euler_angles)
+    cpdef double[:] from_root(self, double[:] euler_angles)
+    cpdef to_root_array(self, euler_angles)
+    cpdef from_root_array(self, euler_angles)
     cpdef void print_convention_tree(self)
 
 
@@ -27,9 +46,12 @@ cdef class Conventions(object):
         dict __derived_conventions
 
     cpdef bint check(self, str convention)
-    cdef dict __get_convention(self, str convention)
     cpdef Convention get_convention(self, str convention)
 
 
+cdef Convention _lookup(str convention)
+
+
 cdef class Function(object):
     cpdef double[:] evaluate(self, double[:] euler_angles)
+    cpdef evaluate_array(self, euler_angles)
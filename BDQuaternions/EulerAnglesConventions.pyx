@@ -1,3 +1,7 @@
+"""
+description of rotations after Ken Shoemake in Graphics Gems IV (Academic Press, 1994), p. 222
+"""
+
 import numpy as np
 
 from cython import boundscheck, wraparound
@@ -5,15 +9,14 @@ from cython import boundscheck, wraparound
 from cpython.array cimport array, clone
 from cpython.object cimport Py_EQ, Py_NE
 from libc.math cimport M_PI
+from .instrumentation cimport enabled, count
 
 
-"""
-description of rotations after Ken Shoemake in Graphics Gems IV (Academic Press, 1994), p. 222
-"""
-
 cdef class Conventions(object):
 
     def __init__(self):
+        if enabled():
+            count('conventions_created')
         # the tuples are for inner axis (X - 0, Y - 1, Z - 2), parity (Even - 0, Odd - 1),
         # repetition (No - 0, Yes - 1), frame (0 - static; 1 - rotating frame)
         self.__euler_angles_codes = {
@@ -271,86 +274,92 @@ cdef class Conventions(object):
             print('Falling back to complete list')
         return final_list
 
-    @boundscheck(False)
-    @wraparound(False)
     cpdef bint check(self, str convention):
-        cdef:
-            dict conventions
-            str key
-        conventions = dict(self.__general_conventions, **self.__special_conventions)
-        # first we search requested convention in the dict of 'standard' conventions
-        for key in conventions.keys():
-            if convention.lower().strip() in conventions[key]['variants']:
-                return True
-        # If not found we look through the dict of 'derived' conventions
-        for key in self.__derived_conventions.keys():
-            if convention.lower().strip() in self.__derived_conventions[key]['variants']:
-                return True
-        return False
-
-    @boundscheck(False)
-    @wraparound(False)
-    cdef dict __get_convention(self, str convention):
-        cdef:
-            dict conventions, euler_angles_convention, parent_convention
-            bint match = False
-            str key, parent_label
-        conventions = dict(self.__general_conventions, **self.__special_conventions)
-        euler_angles_convention = conventions[self.__default_convention]
-        # first we search requested convention in the dict of 'standard' conventions
-        for key in conventions.keys():
-            if convention.lower().strip() in conventions[key]['variants']:
-                euler_angles_convention = conventions[key]
-                euler_angles_convention['label'] = key
-                euler_angles_convention['parent_convention'] = ''
-                euler_angles_convention['code'] = self.__euler_angles_codes[euler_angles_convention['axes']]
-                euler_angles_convention['to_parent'] = Function()
-                euler_angles_convention['from_parent'] = Function()
-                match = True
-                break
-        # If not found we look through the dict of 'derived' conventions
-        for key in self.__derived_conventions.keys():
-            if convention.lower().strip() in self.__derived_conventions[key]['variants']:
-                euler_angles_convention = self.__derived_conventions[key]
-                euler_angles_convention['label'] = key
-                parent_label = euler_angles_convention['parent_convention']
-                while True:
-                    parent_convention = self.__get_convention(parent_label)
-                    if 'axes' in list(parent_convention.keys()):
-                        euler_angles_convention['axes'] = parent_convention['axes']
-                        euler_angles_convention['code'] = self.__euler_angles_codes[euler_angles_convention['axes']]
-                        break
-                match = True
-                break
-        if not match:
-            euler_angles_convention = self.__get_convention(self.__default_convention)
-        return euler_angles_convention
+        """
+        Check if convention is known
+        :param convention: string with short form of convention e.g. 'XYZs' or 'Bunge'
+        :return: True if convention is registered
+        """
+        return _lookup(convention) is not None
 
-    @boundscheck(False)
-    @wraparound(False)
     cpdef Convention get_convention(self, str convention):
         """
-        returns euler_angles convention as a dict
+        returns euler_angles convention.
+        Conventions are interned, the same Convention object is returned for all synonyms of the convention.
+        Falls back to the default convention if requested convention is not known.
         :param convention: string with short form of convention e.g. 'XYZs' or 'Bunge'
-        :return: dict describing convention
+        :return: Convention object
         """
         cdef:
-            dict euler_angles_convention
-            bint match = False
-            str key
-        euler_angles_convention = self.__get_convention(convention)
-        return Convention(euler_angles_convention['label'], euler_angles_convention['axes'],
-                          list(euler_angles_convention['axes_labels']), list(euler_angles_convention['labels']),
-                          list(euler_angles_convention['code']), euler_angles_convention['description'],
-                          euler_angles_convention['parent_convention'],
-                          euler_angles_convention['to_parent'],
-                          euler_angles_convention['from_parent'])
+            Convention euler_angles_convention = _lookup(convention)
+        if euler_angles_convention is None:
+            euler_angles_convention = _lookup(self.__default_convention)
+        return euler_angles_convention
+
+
+# Registry of interned Convention objects and the index of lower-cased variants of the conventions names.
+# Registry is built on first lookup.
+cdef dict _registry = {}
+cdef dict _variants_index = {}
+
+
+cdef void _build_registry():
+    cdef:
+        Conventions conventions = Conventions()
+        dict standard = dict(conventions.general_conventions, **conventions.special_conventions)
+        dict derived = conventions.derived_conventions
+        dict pending
+        dict description
+        str key, variant
+        Convention parent
+    # registry is marked as non-empty before the first Convention is created to stop recursion
+    _variants_index[''] = None
+    for key, description in standard.items():
+        _registry[key] = Convention(key, description['axes'],
+                                    list(description['axes_labels']), list(description['labels']),
+                                    list(conventions.euler_angles_codes[description['axes']]),
+                                    description['description'])
+        for variant in description['variants']:
+            _variants_index[variant] = key
+    # derived conventions are registered after their parents
+    pending = dict(derived)
+    while pending:
+        for key, description in list(pending.items()):
+            if _lookup(description['parent_convention']) is None:
+                continue
+            parent = _lookup(description['parent_convention'])
+            _registry[key] = Convention(key, parent.axes,
+                                        list(description['axes_labels']), list(description['labels']),
+                                        list(parent.code), description['description'],
+                                        description['parent_convention'],
+                                        description['to_parent'], description['from_parent'])
+            for variant in description['variants']:
+                _variants_index[variant] = key
+            del pending[key]
+
+
+cdef Convention _lookup(str convention):
+    """
+    Find interned convention by any of its variants
+    :param convention: string with short form of convention e.g. 'XYZs' or 'Bunge'
+    :return: Convention or None if not found
+    """
+    cdef:
+        object label
+    if not _variants_index:
+        _build_registry()
+    label = _variants_index.get(convention.lower().strip())
+    if label is None:
+        return None
+    return _registry[label]
 
 
 cdef class Convention(object):
 
     def __init__(self, str label, str axes, list axes_labels, list angle_labels, list code, str description='',
                  str parent='', Function to_parent=Function(), Function from_parent=Function()):
+        if enabled():
+            count('convention_created')
         self.__euler_safe_axis = (0, 1, 2, 0)
         self.__euler_next_axis = (1, 2, 0, 1)
         self.__label = label
@@ -359,13 +368,37 @@ cdef class Convention(object):
         self.__angle_labels = [str(angle_label) for angle_label in angle_labels]
         self.__code = [int(code_i) for code_i in code]
         self.__description = description
-        self.__conventions = Conventions()
         self.__to_parent = to_parent
         self.__from_parent = from_parent
-        if self.__conventions.check(parent):
-            self.__parent = self.__conventions.get_convention(parent)
-        else:
+        self.__parent = _lookup(parent)
+        if self.__parent is None:
             self.__parent = self
+        self.__compile_plan()
+
+    def __reduce__(self):
+        if _lookup(self.__label) is self:
+            return _restore_convention, (self.__label,)
+        return Convention, (self.__label, self.__axes, self.__axes_labels, self.__angle_labels, list(self.__code),
+                            self.__description, '' if self.__parent is self else self.__parent.__label,
+                            self.__to_parent, self.__from_parent)
+
+    cdef void __compile_plan(self):
+        """
+        Resolve the highest level parent convention, the chain of derived conventions leading to it,
+        and the axes permutation used by conversion algorithms
+        """
+        cdef:
+            int inner_axis
+        if self.__parent is self:
+            self.__root = self
+            self.__chain = []
+        else:
+            self.__root = self.__parent.__root
+            self.__chain = [self] + self.__parent.__chain
+        inner_axis, self.__plan.parity, self.__plan.repetition, self.__plan.frame = self.__root.__code
+        self.__plan.i = self.__euler_safe_axis[inner_axis]
+        self.__plan.j = self.__euler_next_axis[self.__plan.i + self.__plan.parity]
+        self.__plan.k = self.__euler_next_axis[self.__plan.i - self.__plan.parity + 1]
 
     @property
     def euler_next_axis(self):
@@ -434,6 +467,60 @@ cdef class Convention(object):
     cpdef double[:] from_parent(self, double[:] euler_angles):
         return self.__from_parent.evaluate(euler_angles)
 
+    cpdef to_parent_array(self, euler_angles):
+        return self.__to_parent.evaluate_array(euler_angles)
+
+    cpdef from_parent_array(self, euler_angles):
+        return self.__from_parent.evaluate_array(euler_angles)
+
+    @property
+    def root(self):
+        return self.__root
+
+    cpdef double[:] to_root(self, double[:] euler_angles):
+        """
+        Convert Euler angles to the highest level parent convention
+        :param euler_angles: Euler angles in this convention
+        :return: Euler angles in the root convention, may be the same buffer if the convention has no parent
+        """
+        cdef:
+            Convention convention
+        for convention in self.__chain:
+            euler_angles = convention.to_parent(euler_angles)
+        return euler_angles
+
+    cpdef double[:] from_root(self, double[:] euler_angles):
+        """
+        Convert Euler angles from the highest level parent convention to this convention
+        :param euler_angles: Euler angles in the root convention
+        :return: Euler angles in this convention, may be the same buffer if the convention has no parent
+        """
+        cdef:
+            Convention convention
+        for convention in reversed(self.__chain):
+            euler_angles = convention.from_parent(euler_angles)
+        return euler_angles
+
+    cpdef to_root_array(self, euler_angles):
+        """
+        Convert array of Euler angles of shape (N, 3) to the highest level parent convention
+        """
+        cdef:
+            Convention convention
+        for convention in self.__chain:
+            euler_angles = convention.to_parent_array(euler_angles)
+        return euler_angles
+
+    cpdef from_root_array(self, euler_angles):
+        """
+        Convert array of Euler angles of shape (N, 3) from the highest level parent convention to this convention
+        """
+        cdef:
+            Convention convention
+        for convention in reversed(self.__chain):
+            euler_angles = convention.from_parent_array(euler_angles)
+        return euler_angles
+
     @boundscheck(False)
     @wraparound(False)
     cpdef void print_convention_tree(self):
@@ -467,6 +554,26 @@ cdef class Function(object):
         result[2] = euler_angles[2]
         return result
 
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef evaluate_array(self, euler_angles):
+        """
+        Evaluates the function on array of Euler angles triplets.
+        Sub-classes may override this method with a vectorized implementation,
+        by default evaluate() is called for each triplet.
+        :param euler_angles: array of Euler angles of shape (N, 3)
+        :return: new array of shape (N, 3)
+        """
+        cdef:
+            Py_ssize_t i
+        euler_angles = np.asarray(euler_angles, dtype=np.double)
+        if type(self) is Function:
+            return euler_angles.copy()
+        result = np.empty(euler_angles.shape, dtype=np.double)
+        for i in range(euler_angles.shape[0]):
+            result[i] = self.evaluate(euler_angles[i])
+        return result
+
 cdef class Kocks2Roe(Function):
 
     @boundscheck(False)
@@ -479,6 +586,11 @@ cdef class Kocks2Roe(Function):
         result[2] = M_PI - euler_angles[2]
         return result
 
+    cpdef evaluate_array(self, euler_angles):
+        result = np.array(euler_angles, dtype=np.double)
+        result[:, 2] = M_PI - result[:, 2]
+        return result
+
 cdef class Canova2Roe(Function):
 
     @boundscheck(False)
@@ -490,3 +602,16 @@ cdef class Canova2Roe(Function):
         result[1] = euler_angles[1]
         result[2] = 3 * M_PI / 2 - euler_angles[2]
         return result
+
+    cpdef evaluate_array(self, euler_angles):
+        result = np.array(euler_angles, dtype=np.double)
+        result[:, 0] = M_PI / 2 - result[:, 0]
+        result[:, 2] = 3 * M_PI / 2 - result[:, 2]
+        return result
+
+
+def _restore_convention(str label):
+    """
+    Unpickle interned Convention by its registry label
+    """
+    return _lookup(label)
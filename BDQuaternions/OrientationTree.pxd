@@ -0,0 +1,26 @@
+from .symmetry cimport PointGroup
+
+
+ctypedef struct _Neighbour:
+    double distance
+    Py_ssize_t index
+
+
+ctypedef struct _Neighbours:
+    _Neighbour* data
+    Py_ssize_t size
+    Py_ssize_t capacity
+
+
+cdef class OrientationTree(object):
+    cdef:
+        double[:, ::1] __points
+        Py_ssize_t[::1] __index
+        double[::1] __thresholds
+        PointGroup __symmetry
+        const double[:, ::1] __operators
+
+    cdef void __build(self, Py_ssize_t lo, Py_ssize_t hi, double* scratch, unsigned long long* seed) nogil
+    cdef void __knn(self, Py_ssize_t lo, Py_ssize_t hi, const double* q, Py_ssize_t k,
+                    Py_ssize_t* index, double* distance) nogil
+    cdef int __radius(self, Py_ssize_t lo, Py_ssize_t hi, const double* q, double r, _Neighbours* result) nogil
@@ -0,0 +1,345 @@
+"""
+Vantage point tree (P. N. Yianilos, SODA 1993) over orientations given as unit quaternions.
+Distance between quaternions p and q is d(p, q) = acos(|p . q|), i.e. half of the rotation angle between them,
+which identifies q and -q and is a metric on the rotation group.
+With crystal symmetry the distance is the minimum over all symmetric equivalents q * s,
+which is evaluated by searching for every symmetric copy of the query against the shared result set.
+The tree is stored implicitly: node of the index range [lo, hi) has its vantage point at lo,
+the inner subtree at [lo + 1, mid) and the outer subtree at [mid, hi) with mid = lo + 1 + (hi - lo - 1) // 2.
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound
+
+from libc.math cimport fabs, acos, INFINITY
+from libc.stdlib cimport malloc, realloc, free, qsort
+from ._kernels cimport q_dot, q_mul
+from .symmetry cimport PointGroup, get_point_group
+from .RotationSet cimport RotationSet
+from . import quaternion_arrays as qa
+
+
+cdef inline double _distance(const double* p, const double* q) nogil:
+    cdef:
+        double d = fabs(q_dot(p, q))
+    if d > 1.0:
+        d = 1.0
+    return acos(d)
+
+
+cdef inline void _swap(Py_ssize_t* index, double* d, Py_ssize_t i, Py_ssize_t j) nogil:
+    cdef:
+        Py_ssize_t t_i = index[i]
+        double t_d = d[i]
+    index[i] = index[j]
+    index[j] = t_i
+    d[i] = d[j]
+    d[j] = t_d
+
+
+cdef void _select(Py_ssize_t* index, double* d, Py_ssize_t lo, Py_ssize_t hi, Py_ssize_t kth) nogil:
+    """
+    Partially sort index range [lo, hi) by distances d so that kth element is in its sorted position
+    """
+    cdef:
+        Py_ssize_t i, j
+        double pivot
+    hi -= 1
+    while lo < hi:
+        pivot = d[(lo + hi) // 2]
+        i = lo
+        j = hi
+        while i <= j:
+            while d[i] < pivot:
+                i += 1
+            while d[j] > pivot:
+                j -= 1
+            if i <= j:
+                _swap(index, d, i, j)
+                i += 1
+                j -= 1
+        if kth <= j:
+            hi = j
+        elif kth >= i:
+            lo = i
+        else:
+            return
+
+
+cdef int _compare_index(const void* a, const void* b) nogil:
+    cdef:
+        const _Neighbour* n_a = <const _Neighbour*> a
+        const _Neighbour* n_b = <const _Neighbour*> b
+    if n_a.index != n_b.index:
+        return -1 if n_a.index < n_b.index else 1
+    if n_a.distance != n_b.distance:
+        return -1 if n_a.distance < n_b.distance else 1
+    return 0
+
+
+cdef int _compare_distance(const void* a, const void* b) nogil:
+    cdef:
+        const _Neighbour* n_a = <const _Neighbour*> a
+        const _Neighbour* n_b = <const _Neighbour*> b
+    if n_a.distance != n_b.distance:
+        return -1 if n_a.distance < n_b.distance else 1
+    if n_a.index != n_b.index:
+        return -1 if n_a.index < n_b.index else 1
+    return 0
+
+
+cdef int _append(_Neighbours* neighbours, Py_ssize_t index, double distance) nogil:
+    cdef:
+        _Neighbour* data
+    if neighbours.size == neighbours.capacity:
+        data = <_Neighbour*> realloc(neighbours.data, 2 * neighbours.capacity * sizeof(_Neighbour))
+        if data == NULL:
+            return -1
+        neighbours.data = data
+        neighbours.capacity *= 2
+    neighbours.data[neighbours.size].index = index
+    neighbours.data[neighbours.size].distance = distance
+    neighbours.size += 1
+    return 0
+
+
+cdef void _knn_insert(Py_ssize_t* index, double* distance, Py_ssize_t k, Py_ssize_t j, double d) nogil:
+    """
+    Insert neighbour j at distance d into the sorted list of k nearest neighbours, keeping every index once
+    """
+    cdef:
+        Py_ssize_t m, pos
+    if d >= distance[k - 1]:
+        return
+    for m in range(k):
+        if index[m] == j:
+            if d >= distance[m]:
+                return
+            for pos in range(m, k - 1):
+                index[pos] = index[pos + 1]
+                distance[pos] = distance[pos + 1]
+            index[k - 1] = -1
+            distance[k - 1] = INFINITY
+            break
+    pos = k - 1
+    while pos > 0 and distance[pos - 1] > d:
+        distance[pos] = distance[pos - 1]
+        index[pos] = index[pos - 1]
+        pos -= 1
+    distance[pos] = d
+    index[pos] = j
+
+
+cdef class OrientationTree(object):
+    """
+    Nearest neighbour index over N orientations stored as (N, 4) array of unit quaternions.
+    Supports batched k nearest neighbours and radius queries, optionally with crystal symmetry.
+    """
+
+    @boundscheck(False)
+    @wraparound(False)
+    def __init__(self, quadruples, symmetry=None):
+        """
+        :param quadruples: array-like of unit quaternions of shape (N, 4) or RotationSet
+        :param symmetry: optional crystal PointGroup or its label
+        """
+        cdef:
+            Py_ssize_t n
+            unsigned long long seed = 0x9E3779B97F4A7C15ULL
+            double[::1] scratch
+        if isinstance(quadruples, RotationSet):
+            quadruples = quadruples.quadruples
+        quadruples = qa.versor(np.array(quadruples, dtype=np.double, ndmin=2))
+        if quadruples.ndim != 2:
+            raise ValueError('Expected array of quaternions of shape (N, 4), got %s' % str(quadruples.shape))
+        n = quadruples.shape[0]
+        self.__points = quadruples
+        self.__index = np.arange(n, dtype=np.intp)
+        self.__thresholds = np.zeros(n, dtype=np.double)
+        self.__symmetry = get_point_group('1' if symmetry is None else symmetry)
+        self.__operators = self.__symmetry.operators
+        scratch = np.empty(n, dtype=np.double)
+        if n > 0:
+            with nogil:
+                self.__build(0, n, &scratch[0], &seed)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef void __build(self, Py_ssize_t lo, Py_ssize_t hi, double* scratch, unsigned long long* seed) nogil:
+        cdef:
+            Py_ssize_t i, mid, vp
+        if hi - lo <= 1:
+            return
+        seed[0] ^= seed[0] << 13
+        seed[0] ^= seed[0] >> 7
+        seed[0] ^= seed[0] << 17
+        _swap(&self.__index[0], scratch, lo, lo + <Py_ssize_t> (seed[0] % <unsigned long long> (hi - lo)))
+        vp = self.__index[lo]
+        for i in range(lo + 1, hi):
+            scratch[i] = _distance(&self.__points[vp, 0], &self.__points[self.__index[i], 0])
+        mid = lo + 1 + (hi - lo - 1) // 2
+        _select(&self.__index[0], scratch, lo + 1, hi, mid)
+        self.__thresholds[lo] = scratch[mid]
+        self.__build(lo + 1, mid, scratch, seed)
+        self.__build(mid, hi, scratch, seed)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef void __knn(self, Py_ssize_t lo, Py_ssize_t hi, const double* q, Py_ssize_t k,
+                    Py_ssize_t* index, double* distance) nogil:
+        cdef:
+            Py_ssize_t vp, mid
+            double d, mu
+        if lo >= hi:
+            return
+        vp = self.__index[lo]
+        d = _distance(q, &self.__points[vp, 0])
+        _knn_insert(index, distance, k, vp, d)
+        if hi - lo == 1:
+            return
+        mid = lo + 1 + (hi - lo - 1) // 2
+        mu = self.__thresholds[lo]
+        if d < mu:
+            if d - distance[k - 1] <= mu:
+                self.__knn(lo + 1, mid, q, k, index, distance)
+            if d + distance[k - 1] >= mu:
+                self.__knn(mid, hi, q, k, index, distance)
+        else:
+            if d + distance[k - 1] >= mu:
+                self.__knn(mid, hi, q, k, index, distance)
+            if d - distance[k - 1] <= mu:
+                self.__knn(lo + 1, mid, q, k, index, distance)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __radius(self, Py_ssize_t lo, Py_ssize_t hi, const double* q, double r, _Neighbours* result) nogil:
+        cdef:
+            Py_ssize_t vp, mid
+            double d, mu
+        if lo >= hi:
+            return 0
+        vp = self.__index[lo]
+        d = _distance(q, &self.__points[vp, 0])
+        if d <= r:
+            if _append(result, vp, d) < 0:
+                return -1
+        if hi - lo == 1:
+            return 0
+        mid = lo + 1 + (hi - lo - 1) // 2
+        mu = self.__thresholds[lo]
+        if d - r <= mu:
+            if self.__radius(lo + 1, mid, q, r, result) < 0:
+                return -1
+        if d + r >= mu:
+            if self.__radius(mid, hi, q, r, result) < 0:
+                return -1
+        return 0
+
+    def __len__(self):
+        return self.__points.shape[0]
+
+    @property
+    def quadruples(self):
+        return np.asarray(self.__points)
+
+    @property
+    def symmetry(self):
+        return self.__symmetry
+
+    @boundscheck(False)
+    @wraparound(False)
+    def query(self, q, Py_ssize_t k=1):
+        """
+        Find k nearest neighbours of every query orientation
+        :param q: array-like of unit quaternions of shape (..., 4)
+        :param k: number of neighbours
+        :return: tuple of distances (half rotation angles in radians) and indices, both of shape (..., k),
+            sorted by distance
+        """
+        cdef:
+            Py_ssize_t i, s, n, n_points = self.__points.shape[0], n_operators = self.__operators.shape[0]
+            const double[:, ::1] q_v
+            double[:, ::1] distances_v
+            Py_ssize_t[:, ::1] indices_v
+            double q_s[4]
+        if k < 1 or k > n_points:
+            raise ValueError('k must be in range [1, %d]' % n_points)
+        q = qa.as_quaternions_array(q)
+        shape = q.shape[:q.ndim - 1]
+        q_v = np.ascontiguousarray(qa.versor(q)).reshape(-1, 4)
+        n = q_v.shape[0]
+        distances = np.full((n, k), np.inf, dtype=np.double)
+        indices = np.full((n, k), -1, dtype=np.intp)
+        distances_v = distances
+        indices_v = indices
+        with nogil:
+            for i in range(n):
+                for s in range(n_operators):
+                    q_mul(&q_v[i, 0], &self.__operators[s, 0], q_s)
+                    self.__knn(0, n_points, q_s, k, &indices_v[i, 0], &distances_v[i, 0])
+        return distances.reshape(shape + (k,)), indices.reshape(shape + (k,))
+
+    @boundscheck(False)
+    @wraparound(False)
+    def query_radius(self, q, double r):
+        """
+        Find all orientations within distance r from every query orientation
+        :param q: array-like of unit quaternions of shape (..., 4), flattened to M queries
+        :param r: distance (half rotation angle in radians)
+        :return: tuple of offsets of shape (M + 1,), distances and indices;
+            neighbours of query i are indices[offsets[i]:offsets[i + 1]], sorted by distance
+        """
+        cdef:
+            Py_ssize_t i, j, start, unique, n, n_points = self.__points.shape[0]
+            Py_ssize_t s, n_operators = self.__operators.shape[0]
+            int status = 0
+            const double[:, ::1] q_v
+            Py_ssize_t[::1] offsets_v
+            double[::1] distances_v
+            Py_ssize_t[::1] indices_v
+            double q_s[4]
+            _Neighbours result
+        q = qa.as_quaternions_array(q)
+        q_v = np.ascontiguousarray(qa.versor(q)).reshape(-1, 4)
+        n = q_v.shape[0]
+        offsets = np.zeros(n + 1, dtype=np.intp)
+        offsets_v = offsets
+        result.capacity = 64
+        result.size = 0
+        result.data = <_Neighbour*> malloc(result.capacity * sizeof(_Neighbour))
+        if result.data == NULL:
+            raise MemoryError()
+        try:
+            with nogil:
+                for i in range(n):
+                    start = result.size
+                    for s in range(n_operators):
+                        q_mul(&q_v[i, 0], &self.__operators[s, 0], q_s)
+                        status = self.__radius(0, n_points, q_s, r, &result)
+                        if status < 0:
+                            break
+                    if status < 0:
+                        break
+                    if n_operators > 1 and result.size - start > 1:
+                        qsort(&result.data[start], result.size - start, sizeof(_Neighbour), _compare_index)
+                        unique = start + 1
+                        for j in range(start + 1, result.size):
+                            if result.data[j].index != result.data[unique - 1].index:
+                                result.data[unique] = result.data[j]
+                                unique += 1
+                        result.size = unique
+                    qsort(&result.data[start], result.size - start, sizeof(_Neighbour), _compare_distance)
+                    offsets_v[i + 1] = result.size
+            if status < 0:
+                raise MemoryError()
+            distances = np.empty(result.size, dtype=np.double)
+            indices = np.empty(result.size, dtype=np.intp)
+            distances_v = distances
+            indices_v = indices
+            for j in range(result.size):
+                distances_v[j] = result.data[j].distance
+                indices_v[j] = result.data[j].index
+        finally:
+            free(result.data)
+        return offsets, distances, indices
@@ -1,12 +1,20 @@
 cdef class Quaternion(object):
     cdef:
-        double[:] __quadruple
+        double __quadruple[4]
 
     cpdef double scalar_part(self)
     cpdef double[:] vector_part(self)
     cdef double[:] __conjugate(self)
     cpdef Quaternion conjugate(self)
 
+    cdef bint _is_unit(self)
+    cdef void _scale(self, double factor)
+    cdef void _mul_into(self, Quaternion other, Quaternion out)
+    cpdef Quaternion mul_into(self, Quaternion other, Quaternion out)
+    cpdef Quaternion add_into(self, Quaternion other, Quaternion out)
+    cpdef Quaternion sub_into(self, Quaternion other, Quaternion out)
+    cpdef Quaternion conjugate_into(self, Quaternion out)
+
     cpdef double _norm(self)
     cpdef double distance(self, Quaternion other)
     cpdef Quaternion versor(self)
@@ -14,3 +22,13 @@ cdef class Quaternion(object):
 
     cpdef double[:, :] real_matrix(self)
     cpdef double complex[:, :] complex_matrix(self)
+
+
+cdef Quaternion _quaternion(const double* quadruple, type cls=*)
+
+
+cdef class _QuadrupleBuffer:
+    cdef:
+        Quaternion __owner
+        Py_ssize_t __shape[1]
+        Py_ssize_t __strides[1]
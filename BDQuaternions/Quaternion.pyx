@@ -4,26 +4,37 @@ import numbers
 from cython import boundscheck, wraparound
 
 from libc.math cimport sqrt, cos, sin, acos
+from libc.string cimport memcpy
 from cpython.array cimport array, clone
 from cpython.object cimport Py_EQ, Py_NE
 
-from ._quaternion_operations cimport mul, norm, real_matrix, complex_matrix
+from ._quaternion_operations cimport real_matrix, complex_matrix
+from ._kernels cimport q_norm, q_mul, q_conjugate
+from .instrumentation cimport enabled, count
 
 
 cdef class Quaternion(object):
     """
     General quaternion object
+    Quadruple is stored inline in the object, quadruple property returns a numpy view of it
     """
 
+    def __cinit__(self):
+        if enabled():
+            count('quaternion_allocated')
+
     def __init__(self, double[:] quadruple=np.array([0, 0, 0, 1], dtype=np.double)):
-        self.__quadruple = np.empty(4, dtype=np.double)
         self.__quadruple[0] = quadruple[0]
         self.__quadruple[1] = quadruple[1]
         self.__quadruple[2] = quadruple[2]
         self.__quadruple[3] = quadruple[3]
 
     def __str__(self):
-        return str(np.asarray(self.__quadruple))
+        return str(self.quadruple)
+
+    def __reduce__(self):
+        return _restore_quaternion, (type(self), self.__quadruple[0], self.__quadruple[1],
+                                     self.__quadruple[2], self.__quadruple[3])
 
     def __repr__(self):
         return str(self)
@@ -43,7 +54,7 @@ cdef class Quaternion(object):
 
     @property
     def quadruple(self):
-        return np.asarray(self.__quadruple)
+        return np.asarray(_QuadrupleBuffer(self))
 
     @quadruple.setter
     def quadruple(self, double[:] quadruple):
@@ -68,7 +79,7 @@ cdef class Quaternion(object):
         Calculates vector part of the Quaternion
         :return: vector part of the Quaternion
         """
-        return self.__quadruple[1:4]
+        return self.quadruple[1:4]
 
     @wraparound(False)
     @boundscheck(False)
@@ -88,44 +99,200 @@ cdef class Quaternion(object):
         Calculates conjugate for the Quaternion
         :return: Quaternion which is conjugate of current quaternion
         """
-        return Quaternion(self.__conjugate())
+        cdef:
+            Quaternion result = _quaternion(self.__quadruple, _result_class(self))
+        q_conjugate(self.__quadruple, result.__quadruple)
+        return result
 
     def __mul__(x, y):
+        cdef:
+            Quaternion result
         if isinstance(x, Quaternion) and isinstance(y, Quaternion):
-            return Quaternion(mul(x.quadruple, y.quadruple))
+            result = _quaternion((<Quaternion> x).__quadruple, _result_class(x))
+            (<Quaternion> x)._mul_into(y, result)
+            return result
         elif isinstance(x, Quaternion) and isinstance(y, numbers.Number):
-            return Quaternion(mul(x.quadruple, np.array([np.double(y), 0, 0, 0], dtype=np.double)))
+            result = _quaternion((<Quaternion> x).__quadruple, _result_class(x))
+            result._scale(y)
+            return result
         elif isinstance(x, numbers.Number) and isinstance(y, Quaternion):
-            return Quaternion(mul(np.array([np.double(x), 0, 0, 0], dtype=np.double), y.quadruple))
+            result = _quaternion((<Quaternion> y).__quadruple, _result_class(y))
+            result._scale(x)
+            return result
         else:
             return NotImplemented
 
     def __add__(x, y):
+        cdef:
+            Quaternion result
         if isinstance(x, Quaternion) and isinstance(y, Quaternion):
-            return Quaternion(x.quadruple + y.quadruple)
+            result = _quaternion((<Quaternion> x).__quadruple, _result_class(x))
+            return (<Quaternion> x).add_into(y, result)
         elif isinstance(x, Quaternion) and isinstance(y, numbers.Number):
-            return Quaternion(x.quadruple + np.array([np.double(y), 0, 0, 0]))
+            result = _quaternion((<Quaternion> x).__quadruple, _result_class(x))
+            result.__quadruple[0] += y
+            return result
         elif isinstance(x, numbers.Number) and isinstance(y, Quaternion):
-            return Quaternion(y.quadruple + np.array([np.double(x), 0, 0, 0]))
+            result = _quaternion((<Quaternion> y).__quadruple, _result_class(y))
+            result.__quadruple[0] += x
+            return result
         else:
             return NotImplemented
 
     def __sub__(x, y):
+        cdef:
+            Quaternion result
         if isinstance(x, Quaternion) and isinstance(y, Quaternion):
-            return Quaternion(x.quadruple - y.quadruple)
+            result = _quaternion((<Quaternion> x).__quadruple, _result_class(x))
+            return (<Quaternion> x).sub_into(y, result)
         elif isinstance(x, Quaternion) and isinstance(y, numbers.Number):
-            return Quaternion(x.quadruple - np.array([np.double(y), 0, 0, 0]))
+            result = _quaternion((<Quaternion> x).__quadruple, _result_class(x))
+            result.__quadruple[0] -= y
+            return result
         elif isinstance(x, numbers.Number) and isinstance(y, Quaternion):
-            return Quaternion(np.array([np.double(x), 0, 0, 0]) - y.quadruple)
+            result = _quaternion((<Quaternion> y).__quadruple, _result_class(y))
+            result._scale(-1.0)
+            result.__quadruple[0] += x
+            return result
         else:
             return NotImplemented
 
+    # In-place operators and *_into methods reuse the storage of the destination quaternion.
+    # Operations which would break the invariant of the destination class (e.g. unit norm)
+    # are not done in-place: augmented assignment falls back to the regular operator
+    # and *_into methods raise TypeError.
+
+    cdef bint _is_unit(self):
+        return False
+
+    @wraparound(False)
+    @boundscheck(False)
+    cdef void _scale(self, double factor):
+        self.__quadruple[0] *= factor
+        self.__quadruple[1] *= factor
+        self.__quadruple[2] *= factor
+        self.__quadruple[3] *= factor
+
+    @wraparound(False)
+    @boundscheck(False)
+    cdef void _mul_into(self, Quaternion other, Quaternion out):
+        q_mul(self.__quadruple, other.__quadruple, out.__quadruple)
+
+    def __imul__(self, other):
+        if isinstance(other, Quaternion):
+            self._mul_into(other, self)
+            return self
+        elif isinstance(other, numbers.Number):
+            self._scale(other)
+            return self
+        return NotImplemented
+
+    @wraparound(False)
+    @boundscheck(False)
+    def __iadd__(self, other):
+        cdef:
+            Quaternion q
+        if isinstance(other, Quaternion):
+            q = other
+            self.__quadruple[0] += q.__quadruple[0]
+            self.__quadruple[1] += q.__quadruple[1]
+            self.__quadruple[2] += q.__quadruple[2]
+            self.__quadruple[3] += q.__quadruple[3]
+            return self
+        elif isinstance(other, numbers.Number):
+            self.__quadruple[0] += other
+            return self
+        return NotImplemented
+
+    @wraparound(False)
+    @boundscheck(False)
+    def __isub__(self, other):
+        cdef:
+            Quaternion q
+        if isinstance(other, Quaternion):
+            q = other
+            self.__quadruple[0] -= q.__quadruple[0]
+            self.__quadruple[1] -= q.__quadruple[1]
+            self.__quadruple[2] -= q.__quadruple[2]
+            self.__quadruple[3] -= q.__quadruple[3]
+            return self
+        elif isinstance(other, numbers.Number):
+            self.__quadruple[0] -= other
+            return self
+        return NotImplemented
+
+    def __itruediv__(self, other):
+        if isinstance(other, numbers.Number):
+            self._scale(1.0 / np.double(other))
+            return self
+        return NotImplemented
+
+    cpdef Quaternion mul_into(self, Quaternion other, Quaternion out):
+        """
+        Calculate product self * other and store it in out without allocations
+        :param other: Quaternion
+        :param out: destination Quaternion, may be self or other
+        :return: out
+        """
+        if out._is_unit() and not (self._is_unit() and other._is_unit()):
+            raise TypeError('Product of %s and %s can not be stored in %s' %
+                            (type(self).__name__, type(other).__name__, type(out).__name__))
+        self._mul_into(other, out)
+        return out
+
+    @wraparound(False)
+    @boundscheck(False)
+    cpdef Quaternion add_into(self, Quaternion other, Quaternion out):
+        """
+        Calculate sum self + other and store it in out without allocations
+        :param other: Quaternion
+        :param out: destination Quaternion, may be self or other
+        :return: out
+        """
+        if out._is_unit():
+            raise TypeError('Sum can not be stored in %s' % type(out).__name__)
+        out.__quadruple[0] = self.__quadruple[0] + other.__quadruple[0]
+        out.__quadruple[1] = self.__quadruple[1] + other.__quadruple[1]
+        out.__quadruple[2] = self.__quadruple[2] + other.__quadruple[2]
+        out.__quadruple[3] = self.__quadruple[3] + other.__quadruple[3]
+        return out
+
+    @wraparound(False)
+    @boundscheck(False)
+    cpdef Quaternion sub_into(self, Quaternion other, Quaternion out):
+        """
+        Calculate difference self - other and store it in out without allocations
+        :param other: Quaternion
+        :param out: destination Quaternion, may be self or other
+        :return: out
+        """
+        if out._is_unit():
+            raise TypeError('Difference can not be stored in %s' % type(out).__name__)
+        out.__quadruple[0] = self.__quadruple[0] - other.__quadruple[0]
+        out.__quadruple[1] = self.__quadruple[1] - other.__quadruple[1]
+        out.__quadruple[2] = self.__quadruple[2] - other.__quadruple[2]
+        out.__quadruple[3] = self.__quadruple[3] - other.__quadruple[3]
+        return out
+
+    @wraparound(False)
+    @boundscheck(False)
+    cpdef Quaternion conjugate_into(self, Quaternion out):
+        """
+        Calculate conjugate of the quaternion and store it in out without allocations
+        :param out: destination Quaternion, may be self
+        :return: out
+        """
+        if out._is_unit() and not self._is_unit():
+            raise TypeError('Conjugate of %s can not be stored in %s' % (type(self).__name__, type(out).__name__))
+        q_conjugate(self.__quadruple, out.__quadruple)
+        return out
+
     cpdef double _norm(self):
         """
         Calculates the norm of the Quaternion
         :return: norm of Quaternion
         """
-        return norm(self.__quadruple)
+        return q_norm(self.__quadruple)
 
     @property
     def norm(self):
@@ -210,7 +377,10 @@ cdef class Quaternion(object):
         assert q_norm >= 0
         a = q_norm * cos(theta)
         v = n_hat * q_norm * sin(theta)
-        self.__quadruple = np.hstack((a, v))
+        self.__quadruple[0] = a
+        self.__quadruple[1] = v[0]
+        self.__quadruple[2] = v[1]
+        self.__quadruple[3] = v[2]
 
     def __pow__(x, power, modulo):
         if isinstance(x, Quaternion) and isinstance(power, numbers.Number):
@@ -226,11 +396,76 @@ cdef class Quaternion(object):
         Calculates real 4x4 matrix representation of the quaternion
         :return: 4x4 real numpy array matrix
         """
-        return real_matrix(self.__quadruple)
+        return real_matrix(self.quadruple)
 
     cpdef double complex[:, :] complex_matrix(self):
         """
         Calculates complex 2x2 matrix representation of the quaternion
         :return: 2x2 complex numpy array matrix
         """
-        return complex_matrix(self.__quadruple)
+        return complex_matrix(self.quadruple)
+
+
+cdef Quaternion _quaternion(const double* quadruple, type cls=Quaternion):
+    """
+    Create Quaternion or its subclass from four doubles bypassing __init__
+    """
+    cdef:
+        Quaternion result
+    if cls is Quaternion:
+        result = Quaternion.__new__(Quaternion)
+    else:
+        result = cls.__new__(cls)
+    memcpy(result.__quadruple, quadruple, 4 * sizeof(double))
+    return result
+
+
+cdef inline type _result_class(Quaternion q):
+    """
+    Class of general quaternion results of operations on q: subclasses of Quaternion are kept,
+    unit quaternions and rotations give plain Quaternion as the result is not unit in general
+    """
+    if q._is_unit():
+        return Quaternion
+    return type(q)
+
+
+cdef class _QuadrupleBuffer:
+    """
+    Buffer exporter for the inline quadruple of a Quaternion.
+    Keeps the quaternion alive while numpy arrays or memoryviews of its quadruple exist.
+    """
+
+    def __cinit__(self, Quaternion owner):
+        self.__owner = owner
+        self.__shape[0] = 4
+        self.__strides[0] = sizeof(double)
+
+    def __getbuffer__(self, Py_buffer* buffer, int flags):
+        buffer.buf = <void*> self.__owner.__quadruple
+        buffer.obj = self
+        buffer.len = 4 * sizeof(double)
+        buffer.itemsize = sizeof(double)
+        buffer.readonly = 0
+        buffer.ndim = 1
+        buffer.format = 'd'
+        buffer.shape = self.__shape
+        buffer.strides = self.__strides
+        buffer.suboffsets = NULL
+        buffer.internal = NULL
+
+    def __releasebuffer__(self, Py_buffer* buffer):
+        pass
+
+
+def _restore_quaternion(cls, double w, double x, double y, double z):
+    """
+    Unpickle Quaternion or its subclass from the four components without repeating checks of __init__
+    """
+    cdef:
+        Quaternion result = cls.__new__(cls)
+    result.__quadruple[0] = w
+    result.__quadruple[1] = x
+    result.__quadruple[2] = y
+    result.__quadruple[3] = z
+    return result
@@ -2,10 +2,27 @@ from .UnitQuaternion cimport UnitQuaternion
 from .EulerAnglesConventions cimport Convention
 
 
+cdef class _RotationCache(object):
+    cdef:
+        double __quadruple[4]
+        double __matrix[9]
+        list __euler_angles
+        tuple __axis_angle
+        tuple __description
+
+    cdef void _reset(self, const double* quadruple)
+
+
 cdef class Rotation(UnitQuaternion):
     cdef Convention __euler_angles_convention
+    cdef _RotationCache __cache
+
+    cdef _RotationCache _cache(self)
 
     cpdef Rotation conjugate(self)
     cpdef Rotation reciprocal(self)
-    cpdef double[:] rotate_vector(self, double[:] xyz)
-    cpdef double[:, :] rotate(self, double[:, :] xyz)
+    cpdef rotate_vector(self, xyz, out=*)
+    cpdef rotate(self, xyz, out=*, n_threads=*)
+
+
+cdef Rotation _rotation(const double* quadruple, Convention euler_angles_convention, type cls=*)
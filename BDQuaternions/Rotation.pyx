@@ -2,22 +2,91 @@ import numbers
 import numpy as np
 
 from cython import wraparound, boundscheck
+from cython cimport floating
+from cython.parallel cimport prange
 
 from cpython.object cimport Py_EQ, Py_NE
 from libc.math cimport fabs
 from libc.float cimport DBL_MIN
+from libc.string cimport memcpy, memcmp
+from cpython.array cimport array
 
-from .Quaternion cimport Quaternion
-from ._quaternion_operations cimport mul, quaternion_to_rotation_matrix, quaternion_from_rotation_matrix
-from ._helpers cimport matrix_vector_mult
+from .Quaternion cimport Quaternion, _quaternion
+from ._quaternion_operations cimport quaternion_from_rotation_matrix
+from ._kernels cimport q_conjugate, q_to_rotation_matrix
 from .UnitQuaternion cimport UnitQuaternion
 from .EulerAnglesConventions cimport Conventions, Convention
 from .EulerAngles cimport EulerAngles
+from .parallel cimport acquire_threads, release_threads
+from .instrumentation cimport timer_start, timer_stop
 
 
 conventions = Conventions()
 
 
+@boundscheck(False)
+@wraparound(False)
+cdef void _rotate_vectors(const double* m, const floating[:, :] xyz, floating[:, :] out, int n_threads) nogil:
+    """
+    Multiply array of row vectors by the rotation matrix, out may be the same array as xyz
+    :param m: 3x3 rotation matrix stored row-major in nine contiguous doubles
+    :param xyz: array of vectors of shape (N, 3)
+    :param out: output array of shape (N, 3)
+    :param n_threads: number of OpenMP threads
+    """
+    cdef:
+        Py_ssize_t i
+        double x, y, z
+    for i in prange(xyz.shape[0], schedule='static', num_threads=n_threads):
+        x = xyz[i, 0]
+        y = xyz[i, 1]
+        z = xyz[i, 2]
+        out[i, 0] = m[0] * x + m[1] * y + m[2] * z
+        out[i, 1] = m[3] * x + m[4] * y + m[5] * z
+        out[i, 2] = m[6] * x + m[7] * y + m[8] * z
+
+
+cdef object _vectors_array(xyz, int ndim):
+    """
+    Convert array-like (numpy array, list, memoryview) to an array of 3D vectors of float32 or float64 type
+    """
+    xyz = np.asarray(xyz)
+    if xyz.dtype.kind not in 'biuf':
+        raise TypeError('Expected numeric array of vectors, got %s' % str(xyz.dtype))
+    if xyz.ndim != ndim or xyz.shape[ndim - 1] != 3:
+        raise ValueError('Expected array of 3D vectors with %d dimension(s), got shape %s' % (ndim, str(xyz.shape)))
+    if xyz.dtype != np.float32 and xyz.dtype != np.double:
+        xyz = xyz.astype(np.double)
+    return xyz
+
+
+cdef object _output_array(out, xyz):
+    if out is None:
+        return np.empty(xyz.shape, dtype=xyz.dtype)
+    if not isinstance(out, np.ndarray) or out.dtype != xyz.dtype:
+        raise TypeError('out must be a numpy array of %s type' % str(xyz.dtype))
+    if out.shape != xyz.shape:
+        raise ValueError('out has shape %s, expected %s' % (str(out.shape), str(xyz.shape)))
+    return out
+
+
+cdef class _RotationCache(object):
+    """
+    Derived representations of a Rotation: rotation matrix, Euler angles per convention, axis-angle
+    and the text description.
+    The cache keeps a copy of the quadruple it was calculated for and is valid only while the quadruple
+    of the Rotation is unchanged, so any way of modifying the rotation (property setters, in-place operators,
+    writing through the quadruple view) invalidates it.
+    """
+
+    cdef void _reset(self, const double* quadruple):
+        memcpy(self.__quadruple, quadruple, 4 * sizeof(double))
+        q_to_rotation_matrix(self.__quadruple, self.__matrix)
+        self.__euler_angles = []
+        self.__axis_angle = None
+        self.__description = None
+
+
 cdef class Rotation(UnitQuaternion):
     """
     Rotation is the special class on top of UnitQuaternion dealing with 3D rotations
@@ -25,10 +94,16 @@ cdef class Rotation(UnitQuaternion):
     """
 
     def __init__(self, double[:] quadruple=np.array([1, 0, 0, 0], dtype=np.double),
-                 Convention euler_angles_convention=conventions.get_convention('Bunge')):
+                 Convention euler_angles_convention=None):
+        if euler_angles_convention is None:
+            euler_angles_convention = conventions.get_convention('Bunge')
         self.__euler_angles_convention = euler_angles_convention
         super(Rotation, self).__init__(quadruple)
 
+    def __reduce__(self):
+        return _restore_rotation, (type(self), self.__quadruple[0], self.__quadruple[1], self.__quadruple[2],
+                                   self.__quadruple[3], self.__euler_angles_convention)
+
     def __richcmp__(x, y, int op):
         if op == Py_EQ:
             if isinstance(x, Rotation) and isinstance(y, Rotation):
@@ -41,12 +116,27 @@ cdef class Rotation(UnitQuaternion):
         else:
             return NotImplemented
 
+    cdef _RotationCache _cache(self):
+        """
+        Lazily created cache of derived representations, recalculated if the quadruple has changed
+        :return: valid cache
+        """
+        if self.__cache is None:
+            self.__cache = _RotationCache.__new__(_RotationCache)
+            self.__cache._reset(self.__quadruple)
+        elif memcmp(self.__cache.__quadruple, self.__quadruple, 4 * sizeof(double)) != 0:
+            self.__cache._reset(self.__quadruple)
+        return self.__cache
+
     cpdef Rotation conjugate(self):
         """
         Calculates conjugate for the Rotation quaternion
         :return: Rotation quaternion which is conjugate of current quaternion
         """
-        return Rotation(self.__conjugate(), euler_angles_convention=self.__euler_angles_convention)
+        cdef:
+            Rotation result = _rotation(self.__quadruple, self.__euler_angles_convention, type(self))
+        q_conjugate(result.__quadruple, result.__quadruple)
+        return result
 
     cpdef Rotation reciprocal(self):
         """
@@ -62,11 +152,11 @@ cdef class Rotation(UnitQuaternion):
 
     @property
     def rotation_matrix(self):
-        return quaternion_to_rotation_matrix(self.__quadruple)
+        return np.array(<double[:3, :3]> &self._cache().__matrix[0])
 
     @rotation_matrix.setter
     def rotation_matrix(self, m):
-        self.__quadruple = quaternion_from_rotation_matrix(m)
+        self.quadruple = quaternion_from_rotation_matrix(m)
 
     """
     axis and angle representation of Rotation quaternion
@@ -75,19 +165,28 @@ cdef class Rotation(UnitQuaternion):
 
     @property
     def axis_angle(self):
-        _, axis, theta = self.polar
-        return axis, theta * 2
+        cdef:
+            _RotationCache cache = self._cache()
+        if cache.__axis_angle is None:
+            _, axis, theta = self.polar
+            cache.__axis_angle = (axis, theta * 2)
+        axis, theta = cache.__axis_angle
+        return array('d', axis), theta
 
     @axis_angle.setter
     def axis_angle(self, axis_angle_components):
         axis, theta = axis_angle_components
-        axis = np.array(axis, dtype=np.float)
+        axis = np.array(axis, dtype=np.double)
         axis_norm = np.sqrt(np.sum(axis * axis))
         if axis_norm > 0:
             axis /= axis_norm
         self.polar = 1, axis, theta / 2
 
     def __str__(self):
+        cdef:
+            _RotationCache cache = self._cache()
+        if cache.__description is not None and cache.__description[0] is self.__euler_angles_convention:
+            return cache.__description[1]
         information = 'Rotation quaternion: ' + str(self.quadruple) + '\n'
         information += 'Euler angles: %s\n' % self.euler_angles_convention.description + '\n'
         information += str(self.euler_angles) + '\n'
@@ -95,6 +194,7 @@ cdef class Rotation(UnitQuaternion):
         information += str(np.asarray(self.rotation_matrix)) + '\n'
         information += 'rotation axis, angle:\n'
         information += str(self.axis_angle) + '\n'
+        cache.__description = (self.__euler_angles_convention, information)
         return information
 
     """
@@ -120,9 +220,21 @@ cdef class Rotation(UnitQuaternion):
 
     @property
     def euler_angles(self):
-        cdef EulerAngles ea
-        ea = EulerAngles(np.zeros(3, dtype=np.double), convention=self.__euler_angles_convention)
-        ea.from_quaternion(self, self.__euler_angles_convention)
+        cdef:
+            _RotationCache cache = self._cache()
+            EulerAngles ea
+        for convention, angles in cache.__euler_angles:
+            if convention is self.__euler_angles_convention:
+                break
+        else:
+            ea = EulerAngles(np.zeros(3, dtype=np.double), convention=self.__euler_angles_convention)
+            ea.from_rotation_matrix(<double[:3, :3]> &cache.__matrix[0], self.__euler_angles_convention)
+            angles = array('d', ea.__euler_angles)
+            cache.__euler_angles.append((self.__euler_angles_convention, angles))
+            return ea
+        ea = EulerAngles.__new__(EulerAngles)
+        ea.__euler_angles = array('d', angles)
+        ea.__convention = self.__euler_angles_convention
         return ea
 
     @euler_angles.setter
@@ -139,62 +251,113 @@ cdef class Rotation(UnitQuaternion):
         return NotImplemented
 
     def __mul__(x, y):
-        if isinstance(x, Rotation) and isinstance(y, Rotation):
-            quadruple = mul(x.quadruple, y.quadruple)
-            return Rotation(quadruple, euler_angles_convention=x.euler_angles_convention)
-        elif isinstance(x, Rotation) and isinstance(y, UnitQuaternion):
-            quadruple = mul(x.quadruple, y.quadruple)
-            return Rotation(quadruple, euler_angles_convention=x.euler_angles_convention)
-        elif isinstance(x, UnitQuaternion) and isinstance(y, Rotation):
-            quadruple = mul(x.quadruple, y.quadruple)
-            return Rotation(quadruple, euler_angles_convention=y.euler_angles_convention)
-        elif isinstance(x, Rotation) and isinstance(y, Quaternion):
-            quadruple = mul(x.quadruple, y.quadruple)
-            return Quaternion(quadruple)
+        cdef:
+            Quaternion result
+        if isinstance(x, Rotation) and isinstance(y, UnitQuaternion):
+            result = _rotation((<Quaternion> x).__quadruple, (<Rotation> x).__euler_angles_convention, type(x))
         elif isinstance(x, UnitQuaternion) and isinstance(y, Rotation):
-            quadruple = mul(x.quadruple, y.quadruple)
-            return Quaternion(quadruple)
+            result = _rotation((<Quaternion> x).__quadruple, (<Rotation> y).__euler_angles_convention, type(y))
+        elif isinstance(x, Quaternion) and isinstance(y, Quaternion):
+            result = Quaternion.__new__(Quaternion)
         elif isinstance(x, Rotation) and isinstance(y, numbers.Number):
-            if fabs(float(y) - 1) < 4 * DBL_MIN:
-                return Rotation(x.quadruple, euler_angles_convention=x.euler_angles_convention)
-            elif fabs(float(y) + 1) < 4 * DBL_MIN:
-                return Rotation(-1 * x.quadruple, euler_angles_convention=x.euler_angles_convention)
+            if fabs(fabs(float(y)) - 1) < 4 * DBL_MIN:
+                result = _rotation((<Quaternion> x).__quadruple, (<Rotation> x).__euler_angles_convention, type(x))
             else:
-                return Quaternion(x.quadruple) * y
+                result = _quaternion((<Quaternion> x).__quadruple)
+            result._scale(y)
+            return result
         elif isinstance(x, numbers.Number) and isinstance(y, Rotation):
-            if fabs(float(x) - 1) < 4 * DBL_MIN:
-                return Rotation(y.quadruple, euler_angles_convention=y.euler_angles_convention)
-            elif fabs(float(x) + 1) < 4 * DBL_MIN:
-                return Rotation(-1 * y.quadruple, euler_angles_convention=y.euler_angles_convention)
+            if fabs(fabs(float(x)) - 1) < 4 * DBL_MIN:
+                result = _rotation((<Quaternion> y).__quadruple, (<Rotation> y).__euler_angles_convention, type(y))
             else:
-                return Quaternion(y.quadruple) * x
+                result = _quaternion((<Quaternion> y).__quadruple)
+            result._scale(x)
+            return result
         else:
             return NotImplemented
+        (<Quaternion> x)._mul_into(y, result)
+        return result
 
     @boundscheck(False)
     @wraparound(False)
-    cpdef double[:] rotate_vector(self, double[:] xyz):
+    cpdef rotate_vector(self, xyz, out=None):
         """
         Apply rotation to vector
-        :param xyz: vector
+        :param xyz: vector as array-like of three floats (numpy array, list, memoryview)
+        :param out: optional output array of the same shape and type as xyz, may be xyz itself
         :return: rotated vector
         """
-        return matrix_vector_mult(quaternion_to_rotation_matrix(self.__quadruple), xyz, 3, 3)
+        xyz = _vectors_array(xyz, 1)
+        out = _output_array(out, xyz)
+        self.rotate(xyz[np.newaxis], out[np.newaxis])
+        return out
 
     @boundscheck(False)
     @wraparound(False)
-    cpdef double[:, :] rotate(self, double[:, :] xyz):
+    cpdef rotate(self, xyz, out=None, n_threads=None):
         """
-        Apply rotation to vector or array of vectors
-        :param xyz: vector or array of vectors
-        :return: rotated vector or array of vectors
+        Apply rotation to array of vectors.
+        Rotation matrix is taken from the cache and the loop runs without GIL.
+        :param xyz: array-like of vectors of shape (N, 3), float32 or float64 arrays are used without copying
+        :param out: optional output array of the same shape and type as xyz, may be xyz itself
+        :param n_threads: number of threads, None for the default (see parallel module)
+        :return: rotated array of vectors
         """
         cdef:
-            int i, j, k, rows = xyz.shape[0]
-            double[:, :] m = quaternion_to_rotation_matrix(self.__quadruple)
-            double[:, :] product = np.zeros((rows, 3), dtype=np.double)
-        for i in range(rows):
-            for j in range(3):
-                for k in range(3):
-                    product[i][j] += xyz[i][k] * m[j][k]
-        return product
+            int threads
+            bint single
+            double started
+            _RotationCache cache
+            const float[:, :] xyz_f
+            const double[:, :] xyz_d
+            float[:, :] out_f
+            double[:, :] out_d
+        xyz = _vectors_array(xyz, 2)
+        out = _output_array(out, xyz)
+        started = timer_start()
+        cache = self._cache()
+        single = xyz.dtype == np.float32
+        if single:
+            xyz_f = xyz
+            out_f = out
+        else:
+            xyz_d = xyz
+            out_d = out
+        threads = acquire_threads(n_threads, xyz.shape[0])
+        if single:
+            with nogil:
+                _rotate_vectors(cache.__matrix, xyz_f, out_f, threads)
+        else:
+            with nogil:
+                _rotate_vectors(cache.__matrix, xyz_d, out_d, threads)
+        release_threads(threads)
+        timer_stop('Rotation.rotate', started)
+        return out
+
+
+cdef Rotation _rotation(const double* quadruple, Convention euler_angles_convention, type cls=Rotation):
+    """
+    Create Rotation or its subclass from four doubles bypassing __init__ and the norm check
+    """
+    cdef:
+        Rotation result
+    if cls is Rotation:
+        result = Rotation.__new__(Rotation)
+    else:
+        result = cls.__new__(cls)
+    memcpy(result.__quadruple, quadruple, 4 * sizeof(double))
+    result.__euler_angles_convention = euler_angles_convention
+    return result
+
+
+def _restore_rotation(cls, double w, double x, double y, double z, Convention euler_angles_convention):
+    """
+    Unpickle Rotation or its subclass, the convention is pickled by its registry label
+    """
+    cdef:
+        double quadruple[4]
+    quadruple[0] = w
+    quadruple[1] = x
+    quadruple[2] = y
+    quadruple[3] = z
+    return _rotation(quadruple, euler_angles_convention, cls)
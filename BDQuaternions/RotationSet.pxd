@@ -0,0 +1,16 @@
+from .EulerAnglesConventions cimport Convention
+from .Rotation cimport Rotation
+
+
+cdef class RotationSet(object):
+    cdef:
+        object __quadruples
+        Convention __euler_angles_convention
+
+    cpdef RotationSet conjugate(self)
+    cpdef RotationSet reciprocal(self)
+    cpdef RotationSet cumprod(self, Py_ssize_t renormalize=*, str method=*, n_threads=*)
+    cpdef Rotation reduce(self, Py_ssize_t renormalize=*, str method=*, n_threads=*)
+
+
+cdef RotationSet _wrap(quadruples, Convention euler_angles_convention)
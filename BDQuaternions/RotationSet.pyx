@@ -0,0 +1,253 @@
+import numbers
+import numpy as np
+
+from .Rotation cimport Rotation, _rotation
+from .EulerAnglesConventions cimport Conventions, Convention
+from . import quaternion_arrays as qa
+from .utils import random_rotations_quadruples
+from .euler_angles_arrays import euler_angles_to_quaternions, euler_angles_from_quaternions
+
+
+conventions = Conventions()
+
+
+cdef RotationSet _wrap(quadruples, Convention euler_angles_convention):
+    """
+    Create RotationSet sharing memory with given (N, 4) float64 array without any checks
+    """
+    cdef RotationSet rotation_set = RotationSet.__new__(RotationSet)
+    rotation_set.__quadruples = quadruples
+    rotation_set.__euler_angles_convention = euler_angles_convention
+    return rotation_set
+
+
+cdef class RotationSet(object):
+    """
+    Array-backed container of N rotations stored as a single (N, 4) array of unit quaternions
+    sharing one Euler angles convention
+    """
+
+    def __init__(self, quadruples=None, Convention euler_angles_convention=None, bint copy=True):
+        if quadruples is None:
+            quadruples = np.array([[1, 0, 0, 0]], dtype=np.double)
+        elif copy:
+            quadruples = np.array(quadruples, dtype=np.double, order='C', ndmin=2)
+        else:
+            quadruples = np.atleast_2d(np.ascontiguousarray(quadruples, dtype=np.double))
+        if quadruples.ndim != 2 or quadruples.shape[1] != 4:
+            raise ValueError('Expected array of quaternions of shape (N, 4), got %s' % str(quadruples.shape))
+        if not np.allclose(qa.norm(quadruples), 1.0):
+            raise ValueError('Rotation quaternions must have unit norm')
+        if euler_angles_convention is None:
+            euler_angles_convention = conventions.get_convention('Bunge')
+        self.__quadruples = quadruples
+        self.__euler_angles_convention = euler_angles_convention
+
+    @classmethod
+    def from_rotations(cls, rotations, Convention euler_angles_convention=None):
+        """
+        Pack Rotation objects into RotationSet
+        :param rotations: iterable of Rotation objects
+        :param euler_angles_convention: convention of the set, defaults to the convention of the first rotation
+        :return: RotationSet
+        """
+        cdef:
+            Py_ssize_t i
+            Rotation rotation
+        rotations = list(rotations)
+        quadruples = np.empty((len(rotations), 4), dtype=np.double)
+        for i in range(len(rotations)):
+            rotation = rotations[i]
+            quadruples[i] = rotation.quadruple
+        if euler_angles_convention is None:
+            if rotations:
+                euler_angles_convention = rotations[0].euler_angles_convention
+            else:
+                euler_angles_convention = conventions.get_convention('Bunge')
+        return _wrap(quadruples, euler_angles_convention)
+
+    @classmethod
+    def from_euler_angles(cls, euler_angles, Convention euler_angles_convention):
+        """
+        Create RotationSet from array of Euler angles
+        :param euler_angles: array-like of shape (N, 3)
+        :param euler_angles_convention: Euler angles convention
+        :return: RotationSet
+        """
+        euler_angles = np.asarray(euler_angles, dtype=np.double).reshape(-1, 3)
+        return _wrap(euler_angles_to_quaternions(euler_angles, euler_angles_convention), euler_angles_convention)
+
+    @classmethod
+    def from_rotation_matrices(cls, m, Convention euler_angles_convention=None):
+        """
+        Create RotationSet from array of rotation matrices
+        :param m: array-like of shape (N, 3, 3)
+        :param euler_angles_convention: Euler angles convention, Bunge by default
+        :return: RotationSet
+        """
+        m = np.asarray(m, dtype=np.double).reshape(-1, 3, 3)
+        if euler_angles_convention is None:
+            euler_angles_convention = conventions.get_convention('Bunge')
+        return _wrap(qa.quaternions_from_rotation_matrices(m), euler_angles_convention)
+
+    @classmethod
+    def random(cls, Py_ssize_t n, seed=None, Convention euler_angles_convention=None):
+        """
+        Create RotationSet of random rotations uniformly distributed over the rotation group
+        :param n: number of rotations
+        :param seed: None, an integer, numpy SeedSequence or Generator
+        :param euler_angles_convention: Euler angles convention, Bunge by default
+        :return: RotationSet
+        """
+        if euler_angles_convention is None:
+            euler_angles_convention = conventions.get_convention('Bunge')
+        return _wrap(random_rotations_quadruples(n, seed), euler_angles_convention)
+
+    def to_rotations(self):
+        """
+        Unpack RotationSet into the list of Rotation objects
+        :return: list of Rotation objects
+        """
+        cdef:
+            Py_ssize_t i
+        return [Rotation(self.__quadruples[i], euler_angles_convention=self.__euler_angles_convention)
+                for i in range(self.__quadruples.shape[0])]
+
+    @property
+    def quadruples(self):
+        return self.__quadruples
+
+    @quadruples.setter
+    def quadruples(self, quadruples):
+        self.__quadruples[...] = quadruples
+
+    def __len__(self):
+        return self.__quadruples.shape[0]
+
+    def __getitem__(self, item):
+        if isinstance(item, numbers.Integral):
+            return Rotation(self.__quadruples[item], euler_angles_convention=self.__euler_angles_convention)
+        quadruples = self.__quadruples[item]
+        if quadruples.ndim != 2:
+            raise IndexError('RotationSet supports only indexing along the rotations axis')
+        return _wrap(quadruples, self.__euler_angles_convention)
+
+    def __setitem__(self, item, value):
+        if isinstance(value, Rotation):
+            self.__quadruples[item] = value.quadruple
+        elif isinstance(value, RotationSet):
+            self.__quadruples[item] = value.quadruples
+        else:
+            raise TypeError('Expected Rotation or RotationSet, got %s' % str(type(value)))
+
+    def __iter__(self):
+        cdef:
+            Py_ssize_t i
+        for i in range(self.__quadruples.shape[0]):
+            yield self[i]
+
+    def __reduce__(self):
+        # numpy arrays are pickled with out-of-band buffers under protocol 5
+        return _restore_rotation_set, (self.__quadruples, self.__euler_angles_convention)
+
+    def __str__(self):
+        return 'RotationSet of %d rotations (%s convention)\n' % (len(self), self.__euler_angles_convention.label) + \
+               str(self.__quadruples)
+
+    def __repr__(self):
+        return str(self)
+
+    """
+        euler angles convention get/set property
+    """
+
+    @property
+    def euler_angles_convention(self):
+        return self.__euler_angles_convention
+
+    @euler_angles_convention.setter
+    def euler_angles_convention(self, euler_angles_convention):
+        if isinstance(euler_angles_convention, Convention):
+            self.__euler_angles_convention = euler_angles_convention
+        else:
+            self.__euler_angles_convention = conventions.get_convention(str(euler_angles_convention))
+
+    cpdef RotationSet conjugate(self):
+        """
+        Calculates conjugates of all rotation quaternions
+        :return: RotationSet of conjugate quaternions
+        """
+        return _wrap(qa.conjugate(self.__quadruples), self.__euler_angles_convention)
+
+    cpdef RotationSet reciprocal(self):
+        """
+        For unit quaternions reciprocal is equal to conjugate
+        :return: RotationSet of inverse rotations
+        """
+        return self.conjugate()
+
+    cpdef RotationSet cumprod(self, Py_ssize_t renormalize=1024, str method='auto', n_threads=None):
+        """
+        Cumulative composition of the rotations: k-th rotation of the result is q[0] * q[1] * ... * q[k]
+        :param renormalize: running product is normalized every renormalize steps, 0 to disable
+        :param method: 'sequential', 'tree' or 'auto', see quaternion_arrays.cumprod()
+        :param n_threads: number of threads, None for the default (see parallel module)
+        :return: RotationSet of prefix products
+        """
+        return _wrap(qa.cumprod(self.__quadruples, renormalize=renormalize, method=method, n_threads=n_threads),
+                     self.__euler_angles_convention)
+
+    cpdef Rotation reduce(self, Py_ssize_t renormalize=1024, str method='auto', n_threads=None):
+        """
+        Composition of all rotations q[0] * q[1] * ... * q[N - 1], identity for empty set
+        :param renormalize: running product is normalized every renormalize steps, 0 to disable
+        :param method: 'sequential', 'tree' or 'auto', see quaternion_arrays.reduce()
+        :param n_threads: number of threads, None for the default (see parallel module)
+        :return: Rotation
+        """
+        cdef:
+            double[::1] product
+        product = qa.reduce(self.__quadruples, renormalize=renormalize, method=method, n_threads=n_threads)
+        return _rotation(&product[0], self.__euler_angles_convention)
+
+    def unique(self, double tol=1.0e-8, bint return_index=False, bint return_inverse=False,
+               bint return_counts=False):
+        """
+        Find unique rotations up to tolerance, q and -q are the same rotation, see quaternion_arrays.unique()
+        :param tol: tolerance of distance 2 * sin(angle / 4), where angle is the misorientation angle
+        :param return_index: if True also return indices of the representatives
+        :param return_inverse: if True also return indices of the representatives of all rotations
+        :param return_counts: if True also return the number of rotations assigned to every representative
+        :return: RotationSet of representatives in order of the first occurrence, optionally followed by
+            index, inverse and counts arrays
+        """
+        result = qa.unique(self.__quadruples, tol=tol, antipodal=True, return_index=return_index,
+                           return_inverse=return_inverse, return_counts=return_counts)
+        if isinstance(result, tuple):
+            return (_wrap(result[0], self.__euler_angles_convention),) + result[1:]
+        return _wrap(result, self.__euler_angles_convention)
+
+    def __mul__(x, y):
+        if isinstance(x, RotationSet) and isinstance(y, RotationSet):
+            return _wrap(qa.mul(x.quadruples, y.quadruples), x.euler_angles_convention)
+        elif isinstance(x, RotationSet) and isinstance(y, Rotation):
+            return _wrap(qa.mul(x.quadruples, y.quadruple), x.euler_angles_convention)
+        elif isinstance(x, Rotation) and isinstance(y, RotationSet):
+            return _wrap(qa.mul(x.quadruple, y.quadruples), y.euler_angles_convention)
+        else:
+            return NotImplemented
+
+    @property
+    def rotation_matrix(self):
+        return qa.rotation_matrices(self.__quadruples)
+
+    @property
+    def euler_angles(self):
+        return euler_angles_from_quaternions(self.__quadruples, self.__euler_angles_convention)
+
+
+def _restore_rotation_set(quadruples, Convention euler_angles_convention):
+    """
+    Unpickle RotationSet sharing memory with the unpickled quadruples array
+    """
+    return _wrap(quadruples, euler_angles_convention)
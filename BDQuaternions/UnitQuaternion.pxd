@@ -5,3 +5,6 @@ cdef class UnitQuaternion(Quaternion):
 
     cpdef UnitQuaternion conjugate(self)
     cpdef UnitQuaternion reciprocal(self)
+
+
+cdef UnitQuaternion _unit_quaternion(const double* quadruple, type cls=*)
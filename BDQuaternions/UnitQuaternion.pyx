@@ -1,10 +1,13 @@
 import numbers
 import numpy as np
 
+from libc.math cimport fabs
 from libc.float cimport DBL_MIN
+from libc.string cimport memcpy
 
-from .Quaternion cimport Quaternion
-from ._quaternion_operations cimport mul, norm
+from .Quaternion cimport Quaternion, _quaternion
+from ._quaternion_operations cimport norm
+from ._kernels cimport q_conjugate
 
 
 cdef class UnitQuaternion(Quaternion):
@@ -13,7 +16,7 @@ cdef class UnitQuaternion(Quaternion):
     """
 
     def __init__(self, double[:] quadruple=np.array([1, 0, 0, 0], dtype=np.double)):
-        assert np.allclose(norm(quadruple), 1.0)
+        assert fabs(norm(quadruple) - 1.0) <= 1.0e-8 + 1.0e-5
         super(UnitQuaternion, self).__init__(quadruple)
 
     cpdef UnitQuaternion conjugate(self):
@@ -21,7 +24,10 @@ cdef class UnitQuaternion(Quaternion):
         Calculates conjugate for the Unit Quaternion
         :return: Unit Quaternion which is conjugate of current unit quaternion
         """
-        return UnitQuaternion(self.__conjugate())
+        cdef:
+            UnitQuaternion result = _unit_quaternion(self.__quadruple, type(self))
+        q_conjugate(self.__quadruple, result.__quadruple)
+        return result
 
     cpdef UnitQuaternion reciprocal(self):
         """
@@ -31,25 +37,62 @@ cdef class UnitQuaternion(Quaternion):
         return self.conjugate()
 
     def __mul__(x, y):
+        cdef:
+            Quaternion result
         if isinstance(x, UnitQuaternion) and isinstance(y, UnitQuaternion):
-            return UnitQuaternion(mul(x.quadruple, y.quadruple))
-        elif isinstance(x, UnitQuaternion) and isinstance(y, Quaternion):
-            return Quaternion(mul(x.quadruple, y.quadruple))
-        elif isinstance(x, Quaternion) and isinstance(y, UnitQuaternion):
-            return Quaternion(mul(x.quadruple, y.quadruple))
+            result = _unit_quaternion((<Quaternion> x).__quadruple, type(x))
+        elif isinstance(x, Quaternion) and isinstance(y, Quaternion):
+            result = Quaternion.__new__(Quaternion)
         elif isinstance(x, UnitQuaternion) and isinstance(y, numbers.Number):
-            if abs(float(y) - 1) < 4 * DBL_MIN:
-                return UnitQuaternion(x.quadruple)
-            elif abs(float(y) + 1) < 4 * DBL_MIN:
-                return UnitQuaternion(-1 * x.quadruple)
+            if abs(abs(float(y)) - 1) < 4 * DBL_MIN:
+                result = _unit_quaternion((<Quaternion> x).__quadruple, type(x))
             else:
-                return Quaternion(x.quadruple) * y
+                result = _quaternion((<Quaternion> x).__quadruple)
+            result._scale(y)
+            return result
         elif isinstance(x, numbers.Number) and isinstance(y, UnitQuaternion):
-            if abs(float(x) - 1) < 4 * DBL_MIN:
-                return UnitQuaternion(y.quadruple)
-            elif abs(float(x) + 1) < 4 * DBL_MIN:
-                return UnitQuaternion(-1 * y.quadruple)
+            if abs(abs(float(x)) - 1) < 4 * DBL_MIN:
+                result = _unit_quaternion((<Quaternion> y).__quadruple, type(y))
             else:
-                return Quaternion(y.quadruple) * x
+                result = _quaternion((<Quaternion> y).__quadruple)
+            result._scale(x)
+            return result
         else:
             return NotImplemented
+        (<Quaternion> x)._mul_into(y, result)
+        return result
+
+    cdef bint _is_unit(self):
+        return True
+
+    def __imul__(self, other):
+        if isinstance(other, UnitQuaternion):
+            self._mul_into(other, self)
+            return self
+        elif isinstance(other, numbers.Number) and abs(abs(float(other)) - 1) < 4 * DBL_MIN:
+            self._scale(other)
+            return self
+        return NotImplemented
+
+    def __iadd__(self, other):
+        return NotImplemented
+
+    def __isub__(self, other):
+        return NotImplemented
+
+    def __itruediv__(self, other):
+        return NotImplemented
+
+
+cdef UnitQuaternion _unit_quaternion(const double* quadruple, type cls=UnitQuaternion):
+    """
+    Create UnitQuaternion or its subclass from four doubles bypassing __init__ and the norm check
+    """
+    cdef:
+        UnitQuaternion result
+    if cls is UnitQuaternion:
+        result = UnitQuaternion.__new__(UnitQuaternion)
+    else:
+        result = cls.__new__(cls)
+    memcpy(result.__quadruple, quadruple, 4 * sizeof(double))
+    return result
@@ -3,5 +3,9 @@ from BDQuaternions.EulerAngles cimport EulerAngles
 from BDQuaternions.Quaternion cimport Quaternion
 from BDQuaternions.UnitQuaternion cimport UnitQuaternion
 from BDQuaternions.Rotation cimport Rotation
+from BDQuaternions.RotationSet cimport RotationSet
+from BDQuaternions.interpolation cimport KeyframeSequence
+from BDQuaternions.symmetry cimport PointGroup
+from BDQuaternions.OrientationTree cimport OrientationTree
 
 from BDQuaternions.utils cimport random_rotation, random_unit_quaternion, random_quaternion
@@ -1,6 +1,53 @@
+"""
+Classes are imported from their extension modules on first access (PEP 562),
+so that importing the package does not load all of the extensions.
+"""
+
+import sys
+from types import ModuleType
+
 from ._version import __version__
-from .Quaternion import Quaternion
-from .UnitQuaternion import UnitQuaternion
-from .Rotation import Rotation
-from .EulerAnglesConventions import Conventions, Convention
-from .EulerAngles import EulerAngles
+
+_classes = {
+    'Quaternion': 'Quaternion',
+    'UnitQuaternion': 'UnitQuaternion',
+    'Rotation': 'Rotation',
+    'RotationSet': 'RotationSet',
+    'KeyframeSequence': 'interpolation',
+    'PointGroup': 'symmetry',
+    'OrientationTree': 'OrientationTree',
+    'Conventions': 'EulerAnglesConventions',
+    'Convention': 'EulerAnglesConventions',
+    'EulerAngles': 'EulerAngles',
+}
+
+__all__ = ['__version__'] + list(_classes)
+
+
+def __getattr__(name):
+    if name in _classes:
+        from importlib import import_module
+        value = getattr(import_module('.' + _classes[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_classes))
+
+
+class _Package(ModuleType):
+    """
+    Most of the classes share names with their modules, the import system binds a submodule to the package
+    attribute of the same name when the submodule is loaded. The binding is skipped, so that the name resolves
+    to the class as it did when all classes were imported eagerly.
+    """
+
+    def __setattr__(self, name, value):
+        if name in _classes and isinstance(value, ModuleType):
+            return
+        super(_Package, self).__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,311 @@
+"""
+Inline nogil kernels operating on a single quaternion stored as four contiguous doubles [w, x, y, z].
+The kernels are shared by all array-level routines of the package and never allocate.
+All kernels read their inputs into locals before writing, so the output may alias any input.
+"""
+
+cimport cython
+from libc.math cimport M_PI, sqrt, fabs, cos, sin, cosh, sinh, acos, exp as c_exp, log as c_log, pow as c_pow
+from libc.float cimport DBL_MIN
+
+
+ctypedef void (*unary_kernel)(const double* q, double* out) nogil
+
+
+@cython.cdivision(True)
+cdef inline double q_norm(const double* q) nogil:
+    return sqrt(q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3])
+
+
+@cython.cdivision(True)
+cdef inline void q_mul(const double* q1, const double* q2, double* out) nogil:
+    cdef:
+        double w, x, y, z
+    w = q1[0] * q2[0] - q1[1] * q2[1] - q1[2] * q2[2] - q1[3] * q2[3]
+    x = q1[0] * q2[1] + q1[1] * q2[0] + q1[2] * q2[3] - q1[3] * q2[2]
+    y = q1[0] * q2[2] - q1[1] * q2[3] + q1[2] * q2[0] + q1[3] * q2[1]
+    z = q1[0] * q2[3] + q1[1] * q2[2] - q1[2] * q2[1] + q1[3] * q2[0]
+    out[0] = w
+    out[1] = x
+    out[2] = y
+    out[3] = z
+
+
+@cython.cdivision(True)
+cdef inline void q_conjugate(const double* q, double* out) nogil:
+    out[0] = q[0]
+    out[1] = -q[1]
+    out[2] = -q[2]
+    out[3] = -q[3]
+
+
+@cython.cdivision(True)
+cdef inline void q_versor(const double* q, double* out) nogil:
+    cdef:
+        double n = q_norm(q)
+    out[0] = q[0] / n
+    out[1] = q[1] / n
+    out[2] = q[2] / n
+    out[3] = q[3] / n
+
+
+@cython.cdivision(True)
+cdef inline void q_reciprocal(const double* q, double* out) nogil:
+    cdef:
+        double n2 = q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3]
+    out[0] = q[0] / n2
+    out[1] = -q[1] / n2
+    out[2] = -q[2] / n2
+    out[3] = -q[3] / n2
+
+
+@cython.cdivision(True)
+cdef inline void q_exp(const double* q, double* out) nogil:
+    cdef:
+        double a = q[0], b = q[1], c = q[2], d = q[3]
+        double v_norm = sqrt(b * b + c * c + d * d)
+        double a1 = c_exp(a), sin_v_norm
+    if v_norm > 0.0:
+        sin_v_norm = a1 * sin(v_norm) / v_norm
+        out[0] = a1 * cos(v_norm)
+        out[1] = b * sin_v_norm
+        out[2] = c * sin_v_norm
+        out[3] = d * sin_v_norm
+    else:
+        out[0] = a1
+        out[1] = 0.0
+        out[2] = 0.0
+        out[3] = 0.0
+
+
+@cython.cdivision(True)
+cdef inline void q_log(const double* q, double* out) nogil:
+    cdef:
+        double a = q[0], b = q[1], c = q[2], d = q[3]
+        double q_n = q_norm(q)
+        double v_norm = sqrt(b * b + c * c + d * d)
+        double acos_a_q_norm
+    out[0] = c_log(q_n)
+    if v_norm > 0.0:
+        acos_a_q_norm = acos(a / q_n) / v_norm
+        out[1] = b * acos_a_q_norm
+        out[2] = c * acos_a_q_norm
+        out[3] = d * acos_a_q_norm
+    else:
+        out[1] = 0.0
+        out[2] = 0.0
+        out[3] = 0.0
+
+
+@cython.cdivision(True)
+cdef inline void q_power(const double* q, double p, double* out) nogil:
+    """
+    Raise quaternion to real power using its polar form |q|^p * (cos(p * theta) + n * sin(p * theta))
+    """
+    cdef:
+        double a = q[0], b = q[1], c = q[2], d = q[3]
+        double q_n = q_norm(q)
+        double v_norm = sqrt(b * b + c * c + d * d)
+        double theta, p_norm, s
+    if q_n == 0.0:
+        out[0] = 0.0
+        out[1] = 0.0
+        out[2] = 0.0
+        out[3] = 0.0
+        return
+    theta = acos(a / q_n)
+    p_norm = c_pow(q_n, p)
+    out[0] = p_norm * cos(theta * p)
+    if v_norm > 0.0:
+        s = p_norm * sin(theta * p) / v_norm
+        out[1] = b * s
+        out[2] = c * s
+        out[3] = d * s
+    else:
+        out[1] = 0.0
+        out[2] = 0.0
+        out[3] = 0.0
+
+
+@cython.cdivision(True)
+cdef inline void q_sin(const double* q, double* out) nogil:
+    """
+    sin(a + v) = sin(a) * cosh(|v|) + cos(a) * sinh(|v|) * v / |v|
+    """
+    cdef:
+        double a = q[0], b = q[1], c = q[2], d = q[3]
+        double v_norm = sqrt(b * b + c * c + d * d)
+        double s = 0.0
+    if v_norm > 0.0:
+        s = cos(a) * sinh(v_norm) / v_norm
+    out[0] = sin(a) * cosh(v_norm)
+    out[1] = b * s
+    out[2] = c * s
+    out[3] = d * s
+
+
+@cython.cdivision(True)
+cdef inline void q_cos(const double* q, double* out) nogil:
+    """
+    cos(a + v) = cos(a) * cosh(|v|) - sin(a) * sinh(|v|) * v / |v|
+    """
+    cdef:
+        double a = q[0], b = q[1], c = q[2], d = q[3]
+        double v_norm = sqrt(b * b + c * c + d * d)
+        double s = 0.0
+    if v_norm > 0.0:
+        s = -sin(a) * sinh(v_norm) / v_norm
+    out[0] = cos(a) * cosh(v_norm)
+    out[1] = b * s
+    out[2] = c * s
+    out[3] = d * s
+
+
+@cython.cdivision(True)
+cdef inline double q_dot(const double* q1, const double* q2) nogil:
+    return q1[0] * q2[0] + q1[1] * q2[1] + q1[2] * q2[2] + q1[3] * q2[3]
+
+
+@cython.cdivision(True)
+cdef inline void q_slerp(const double* q1, const double* q2, double omega, double sin_omega, double u,
+                         double* out) nogil:
+    """
+    Spherical linear interpolation between unit quaternions q1 and q2 separated by the angle omega
+    with precomputed sin(omega). Falls back to normalized linear interpolation for nearly equal quaternions.
+    Nearly antipodal quaternions are interpolated along the great circle through a quaternion orthogonal to q1.
+    No shortest path sign handling is done here.
+    """
+    cdef:
+        double c1, c2, n
+        double w, x, y, z
+    if sin_omega <= 1.0e-6 and omega > M_PI / 2:
+        c1 = cos(u * M_PI)
+        c2 = sin(u * M_PI)
+        out[0] = c1 * q1[0] - c2 * q1[3]
+        out[1] = c1 * q1[1] + c2 * q1[2]
+        out[2] = c1 * q1[2] - c2 * q1[1]
+        out[3] = c1 * q1[3] + c2 * q1[0]
+        return
+    if sin_omega > 1.0e-10:
+        c1 = sin((1.0 - u) * omega) / sin_omega
+        c2 = sin(u * omega) / sin_omega
+    else:
+        c1 = 1.0 - u
+        c2 = u
+    w = c1 * q1[0] + c2 * q2[0]
+    x = c1 * q1[1] + c2 * q2[1]
+    y = c1 * q1[2] + c2 * q2[2]
+    z = c1 * q1[3] + c2 * q2[3]
+    if sin_omega <= 1.0e-10:
+        n = sqrt(w * w + x * x + y * y + z * z)
+        w /= n
+        x /= n
+        y /= n
+        z /= n
+    out[0] = w
+    out[1] = x
+    out[2] = y
+    out[3] = z
+
+
+@cython.cdivision(True)
+cdef inline double q_angle_between(const double* q1, const double* q2) nogil:
+    """
+    Angle between unit quaternions on S3 as used by q_slerp, clipped to [0, pi]
+    """
+    cdef:
+        double d = q_dot(q1, q2)
+    if d > 1.0:
+        d = 1.0
+    elif d < -1.0:
+        d = -1.0
+    return acos(d)
+
+
+@cython.cdivision(True)
+cdef inline void q_to_rotation_matrix(const double* q, double* m) nogil:
+    """
+    Convert versor of quaternion to 3x3 rotation matrix stored row-major in nine contiguous doubles
+    """
+    cdef:
+        double n = q_norm(q)
+        double w = q[0] / n, x = q[1] / n, y = q[2] / n, z = q[3] / n
+    m[0] = 1 - 2 * y * y - 2 * z * z
+    m[1] = 2 * x * y - 2 * w * z
+    m[2] = 2 * x * z + 2 * w * y
+    m[3] = 2 * x * y + 2 * w * z
+    m[4] = 1 - 2 * x * x - 2 * z * z
+    m[5] = 2 * y * z - 2 * w * x
+    m[6] = 2 * x * z - 2 * w * y
+    m[7] = 2 * y * z + 2 * w * x
+    m[8] = 1 - 2 * x * x - 2 * y * y
+
+
+@cython.cdivision(True)
+cdef inline void q_from_rotation_matrix(const double* m, double* q) nogil:
+    """
+    Convert 3x3 rotation matrix stored row-major in nine contiguous doubles to quaternion
+    using Shepperd's selection of the numerically largest component. No orthogonality checks are done.
+    """
+    cdef:
+        double t = m[0] + m[4] + m[8], r, s, w, x, y, z
+    if t > 3 * DBL_MIN:
+        r = sqrt(1 + t)
+        s = 0.5 / r
+        w = 0.5 * r
+        x = (m[7] - m[5]) * s
+        y = (m[2] - m[6]) * s
+        z = (m[3] - m[1]) * s
+    elif m[0] >= m[4] and m[0] >= m[8]:
+        r = sqrt(1 + m[0] - m[4] - m[8])
+        s = 0.5 / r
+        w = (m[7] - m[5]) * s
+        x = 0.5 * r
+        y = (m[1] + m[3]) * s
+        z = (m[6] + m[2]) * s
+    elif m[4] >= m[8]:
+        r = sqrt(1 + m[4] - m[0] - m[8])
+        s = 0.5 / r
+        w = (m[2] - m[6]) * s
+        x = (m[1] + m[3]) * s
+        y = 0.5 * r
+        z = (m[5] + m[7]) * s
+    else:
+        r = sqrt(1 + m[8] - m[0] - m[4])
+        s = 0.5 / r
+        w = (m[3] - m[1]) * s
+        x = (m[6] + m[2]) * s
+        y = (m[5] + m[7]) * s
+        z = 0.5 * r
+    q[0] = w
+    q[1] = x
+    q[2] = y
+    q[3] = z
+
+
+@cython.cdivision(True)
+cdef inline double matrix3_det(const double* m) nogil:
+    """
+    Determinant of 3x3 matrix stored row-major in nine contiguous doubles
+    """
+    return m[0] * (m[4] * m[8] - m[5] * m[7]) \
+         - m[1] * (m[3] * m[8] - m[5] * m[6]) \
+         + m[2] * (m[3] * m[7] - m[4] * m[6])
+
+
+@cython.cdivision(True)
+cdef inline bint matrix3_is_orthogonal(const double* m, double tol) nogil:
+    """
+    Check that M * M.T is identity within given tolerance for 3x3 matrix stored row-major
+    """
+    cdef:
+        int i, j
+        double d
+    for i in range(3):
+        for j in range(3):
+            d = m[3 * i] * m[3 * j] + m[3 * i + 1] * m[3 * j + 1] + m[3 * i + 2] * m[3 * j + 2]
+            if i == j:
+                d -= 1.0
+            if fabs(d) > tol:
+                return False
+    return True
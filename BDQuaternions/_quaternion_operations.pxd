@@ -6,6 +6,9 @@ cpdef double complex[:, :] complex_matrix(double[:] q)
 
 cpdef double[:, :] quaternion_to_rotation_matrix(double[:] q)
 cpdef double[:] quaternion_from_rotation_matrix(double[:, :] m)
+cdef int bind_lapack() except -1
+cdef int symmetric_eigen4(double* a, double* w) nogil
+cdef int nearest_rotation_quaternion(const double* m, double* q) nogil
 
 cpdef double[:] exp(double[:] q)
 cpdef double[:] log(double[:] q)
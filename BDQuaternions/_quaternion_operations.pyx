@@ -6,9 +6,9 @@ from cython import boundscheck, wraparound
 from cpython.array cimport array, clone
 from libc.math cimport fabs, sqrt, cos, sin, acos, atan2
 from libc.math cimport exp as c_exp, log as c_log
-from libc.float cimport DBL_MIN
-from scipy.linalg.cython_lapack cimport dsyevd
-from ._helpers cimport _3x3_det, trace, check_orthogonal
+from cpython.pycapsule cimport PyCapsule_GetPointer, PyCapsule_GetName
+from ._kernels cimport matrix3_det, matrix3_is_orthogonal, q_from_rotation_matrix
+from .instrumentation cimport enabled, count
 
 
 @wraparound(False)
@@ -120,6 +120,81 @@ cpdef double[:, :] quaternion_to_rotation_matrix(double[:] q):
     return m
 
 
+# LAPACK is taken from SciPy, which is bound on the first use because importing scipy.linalg
+# takes much longer than importing the rest of the package.
+ctypedef void (*dsyevd_t)(char* jobz, char* uplo, int* n, double* a, int* lda, double* w, double* work,
+                          int* lwork, int* iwork, int* liwork, int* info) nogil
+
+cdef dsyevd_t _dsyevd = NULL
+
+
+cdef int bind_lapack() except -1:
+    """
+    Resolve LAPACK routines exported by scipy.linalg.cython_lapack, must be called with GIL held
+    """
+    global _dsyevd
+    if _dsyevd == NULL:
+        from scipy.linalg import cython_lapack
+        capsule = cython_lapack.__pyx_capi__['dsyevd']
+        _dsyevd = <dsyevd_t> PyCapsule_GetPointer(capsule, PyCapsule_GetName(capsule))
+    return 0
+
+
+cdef int symmetric_eigen4(double* a, double* w) nogil:
+    """
+    Eigen decomposition of symmetric 4x4 matrix stored in 16 contiguous doubles using LAPACK dsyevd.
+    Eigenvalues are returned in w in ascending order, eigenvectors overwrite a row by row.
+    bind_lapack() must be called with GIL held before, so that threads never bind LAPACK concurrently.
+    :return: LAPACK info code, -100 if LAPACK is not bound
+    """
+    cdef:
+        int n = 4, lwork = 57, liwork = 23, info
+        double work[57]
+        int iwork[23]
+        char L = b'L', J = b'V'
+    if _dsyevd == NULL:
+        return -100
+    _dsyevd(&J, &L, &n, a, &n, w, &work[0], &lwork, &iwork[0], &liwork, &info)
+    return info
+
+
+cdef int nearest_rotation_quaternion(const double* m, double* q) nogil:
+    """
+    Find quaternion of the rotation closest to the given 3x3 matrix stored row-major
+    as the eigenvector of the largest eigenvalue of symmetric 4x4 K matrix (Bar-Itzhack, 2000).
+    bind_lapack() must be called before.
+    :return: info code of symmetric_eigen4(), q is left unchanged if it is not zero
+    """
+    cdef:
+        int info
+        double k_m[4][4]
+        double w_n[4]
+    k_m[0][0] = (m[0] - m[4] - m[8]) / 3.0
+    k_m[0][1] = (m[1] + m[3]) / 3.0
+    k_m[0][2] = (m[2] + m[6]) / 3.0
+    k_m[0][3] = (m[7] - m[5]) / 3.0
+    k_m[1][0] = (m[1] + m[3]) / 3.0
+    k_m[1][1] = (m[4] - m[0] - m[8]) / 3.0
+    k_m[1][2] = (m[5] + m[7]) / 3.0
+    k_m[1][3] = (m[2] - m[6]) / 3.0
+    k_m[2][0] = (m[2] + m[6]) / 3.0
+    k_m[2][1] = (m[5] + m[7]) / 3.0
+    k_m[2][2] = (m[8] - m[0] - m[4]) / 3.0
+    k_m[2][3] = (m[3] - m[1]) / 3.0
+    k_m[3][0] = (m[7] - m[5]) / 3.0
+    k_m[3][1] = (m[2] - m[6]) / 3.0
+    k_m[3][2] = (m[3] - m[1]) / 3.0
+    k_m[3][3] = (m[0] + m[4] + m[8]) / 3.0
+    info = symmetric_eigen4(&k_m[0][0], &w_n[0])
+    if info != 0:
+        return info
+    q[0] = k_m[3][3]
+    q[1] = k_m[3][0]
+    q[2] = k_m[3][1]
+    q[3] = k_m[3][2]
+    return 0
+
+
 @wraparound(False)
 @boundscheck(False)
 cpdef double[:] quaternion_from_rotation_matrix(double[:, :] m):
@@ -129,75 +204,28 @@ cpdef double[:] quaternion_from_rotation_matrix(double[:, :] m):
     :return: quaternion as numpy array of four floats
     """
     cdef:
-        double det_m, t, r, w, s, x, y, z
+        int i, j
+        double det_m
+        double m_c[9]
         array[double] quadruple, template = array('d')
-        int n = 4, lwork = 57, liwork = 23, info
-        double k_m[4][4]
-        double work[57]
-        int iwork[23]
-        double w_n[4]
-        char L = b'L', J = b'V'
+    if enabled():
+        count('quaternion_from_rotation_matrix')
     quadruple = clone(template, 4, zero=False)
-    det_m = _3x3_det(m)
+    for i in range(3):
+        for j in range(3):
+            m_c[3 * i + j] = m[i, j]
+    det_m = matrix3_det(m_c)
     if abs(1 - det_m ** 2) > 1e-6:
         raise ValueError('Not a rotation matrix. det M = %2.2g' % det_m)
-    if check_orthogonal(m, 3, 3, 1.0e-12) and abs(det_m - 1.0) < 1.0e-12:
-        t = trace(m, 3)
-        if t > 3 * DBL_MIN:
-            r = sqrt(1 + t)
-            w = 0.5 * r
-            s = 0.5 / r
-            x = (m[2, 1] - m[1, 2]) * s
-            y = (m[0, 2] - m[2, 0]) * s
-            z = (m[1, 0] - m[0, 1]) * s
-        elif m[0, 0] >= m[1, 1] and m[0, 0] >= m[2, 2]:
-            r = sqrt(1 + m[0, 0] - m[1, 1] - m[2, 2])
-            s = 0.5 / r
-            w = (m[2, 1] - m[1, 2]) * s
-            x = 0.5 * r
-            y = (m[0, 1] + m[1, 0]) * s
-            z = (m[2, 0] + m[0, 2]) * s
-        elif m[1, 1] >= m[2, 2]:
-            r = sqrt(1 + m[1, 1] - m[0, 0] - m[2, 2])
-            s = 0.5 / r
-            w = (m[0, 2] - m[2, 0]) * s
-            x = (m[0, 1] + m[1, 0]) * s
-            y = 0.5 * r
-            z = (m[1, 2] + m[2, 1]) * s
-        else:
-            r = sqrt(1 + m[2, 2] - m[0, 0] - m[1, 1])
-            s = 0.5 / r
-            w = (m[1, 0] - m[0, 1]) * s
-            x = (m[2, 0] + m[0, 2]) * s
-            y = (m[1, 2] + m[2, 1]) * s
-            z = 0.5 * r
-        quadruple[0] = w
-        quadruple[1] = x
-        quadruple[2] = y
-        quadruple[3] = z
+    if matrix3_is_orthogonal(m_c, 1.0e-12) and abs(det_m - 1.0) < 1.0e-12:
+        q_from_rotation_matrix(m_c, &quadruple.data.as_doubles[0])
     else:
         warnings.warn('Not a rotation matrix. det M = %2.2g' % det_m)
-        k_m[0][0] = (m[0, 0] - m[1, 1] - m[2, 2]) / 3.0
-        k_m[0][1] = (m[0, 1] + m[1, 0]) / 3.0
-        k_m[0][2] = (m[0, 2] + m[2, 0]) / 3.0
-        k_m[0][3] = (m[2, 1] - m[1, 2]) / 3.0
-        k_m[1][0] = (m[0, 1] + m[1, 0]) / 3.0
-        k_m[1][1] = (m[1, 1] - m[0, 0] - m[2, 2]) / 3.0
-        k_m[1][2] = (m[1, 2] + m[2, 1]) / 3.0
-        k_m[1][3] = (m[0, 2] - m[2, 0]) / 3.0
-        k_m[2][0] = (m[0, 2] + m[2, 0]) / 3.0
-        k_m[2][1] = (m[1, 2] + m[2, 1]) / 3.0
-        k_m[2][2] = (m[2, 2] - m[0, 0] - m[1, 1]) / 3.0
-        k_m[2][3] = (m[1, 0] - m[0, 1]) / 3.0
-        k_m[3][0] = (m[2, 1] - m[1, 2]) / 3.0
-        k_m[3][1] = (m[0, 2] - m[2, 0]) / 3.0
-        k_m[3][2] = (m[1, 0] - m[0, 1]) / 3.0
-        k_m[3][3] = (m[0, 0] + m[1, 1] + m[2, 2]) / 3.0
-        dsyevd(&J, &L, &n, &k_m[0][0], &n, &w_n[0], &work[0], &lwork, &iwork[0], &liwork, &info)
-        quadruple[0] = k_m[3][3]
-        quadruple[1] = k_m[3][0]
-        quadruple[2] = k_m[3][1]
-        quadruple[3] = k_m[3][2]
+        if enabled():
+            count('rotation_matrix_fallback')
+        bind_lapack()
+        if nearest_rotation_quaternion(m_c, &quadruple.data.as_doubles[0]) != 0:
+            raise RuntimeError('Eigen decomposition failed, nearest rotation is not found')
     return quadruple
 
 
@@ -0,0 +1,19 @@
+cdef class RotationAccumulator(object):
+    cdef:
+        double __sums[10]
+        double __weight
+        Py_ssize_t __count
+
+    cpdef void reset(self)
+    cpdef RotationAccumulator merge(self, RotationAccumulator other)
+
+
+cdef class GroupedRotationAccumulator(object):
+    cdef:
+        object __sums
+        object __weights
+        object __counts
+
+    cdef void __grow(self, Py_ssize_t n_groups)
+    cpdef GroupedRotationAccumulator merge(self, GroupedRotationAccumulator other)
+    cdef tuple __means(self)
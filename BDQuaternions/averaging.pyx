@@ -0,0 +1,337 @@
+"""
+Averaging of rotations after F. L. Markley et al., Averaging quaternions,
+Journal of Guidance, Control, and Dynamics 30 (2007) 1193-1197.
+The mean rotation is the eigenvector of the largest eigenvalue of the weighted sum M of outer products q q^T.
+The sum is accumulated chunk by chunk, so arbitrary long streams are averaged in one pass and constant memory.
+Only the ten independent components of symmetric M are stored in the order
+(ww, wx, wy, wz, xx, xy, xz, yy, yz, zz).
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound, cdivision
+
+from ._quaternion_operations cimport symmetric_eigen4, bind_lapack
+from .RotationSet cimport RotationSet
+from . import quaternion_arrays as qa
+
+
+cdef inline void _accumulate(const double* q, double weight, double* sums) nogil:
+    sums[0] += weight * q[0] * q[0]
+    sums[1] += weight * q[0] * q[1]
+    sums[2] += weight * q[0] * q[2]
+    sums[3] += weight * q[0] * q[3]
+    sums[4] += weight * q[1] * q[1]
+    sums[5] += weight * q[1] * q[2]
+    sums[6] += weight * q[1] * q[3]
+    sums[7] += weight * q[2] * q[2]
+    sums[8] += weight * q[2] * q[3]
+    sums[9] += weight * q[3] * q[3]
+
+
+@cdivision(True)
+cdef int _mean(const double* sums, double weight, double* q, double* dispersion) nogil:
+    """
+    Calculate mean quaternion (with non-negative scalar part) and dispersion 1 - lambda_max / weight
+    from the accumulated sums, bind_lapack() must be called before
+    :return: info code of symmetric_eigen4(), q and dispersion are left unchanged if it is not zero
+    """
+    cdef:
+        int i, info
+        double m[16]
+        double w[4]
+        double sign
+    m[0] = sums[0]
+    m[1] = m[4] = sums[1]
+    m[2] = m[8] = sums[2]
+    m[3] = m[12] = sums[3]
+    m[5] = sums[4]
+    m[6] = m[9] = sums[5]
+    m[7] = m[13] = sums[6]
+    m[10] = sums[7]
+    m[11] = m[14] = sums[8]
+    m[15] = sums[9]
+    info = symmetric_eigen4(m, w)
+    if info != 0:
+        return info
+    sign = -1.0 if m[12] < 0 else 1.0
+    for i in range(4):
+        q[i] = sign * m[12 + i]
+    dispersion[0] = 1.0 - w[3] / weight
+    return 0
+
+
+cdef int _check_eigen(int info) except -1:
+    if info != 0:
+        raise RuntimeError('Eigen decomposition failed with info %d' % info)
+    return 0
+
+
+cdef tuple _chunk(quadruples, weights):
+    """
+    Validate chunk of quaternions and weights
+    :return: tuple of C-contiguous (N, 4) array, weights array and weights step (0 for unit weights)
+    """
+    if isinstance(quadruples, RotationSet):
+        quadruples = quadruples.quadruples
+    quadruples = np.ascontiguousarray(qa.as_quaternions_array(quadruples)).reshape(-1, 4)
+    if weights is None:
+        return quadruples, np.ones(1, dtype=np.double), 0
+    weights = np.ascontiguousarray(weights, dtype=np.double).ravel()
+    if weights.shape[0] != quadruples.shape[0]:
+        raise ValueError('Expected %d weights, got %d' % (quadruples.shape[0], weights.shape[0]))
+    return quadruples, weights, 1
+
+
+cdef class RotationAccumulator(object):
+    """
+    Streaming accumulator of the weighted sum of quaternion outer products for the mean rotation calculation.
+    Accumulators filled independently (e.g. by different workers) are combined with merge().
+    """
+
+    def __init__(self):
+        self.reset()
+
+    cpdef void reset(self):
+        """
+        Clear accumulated data
+        """
+        cdef:
+            int i
+        for i in range(10):
+            self.__sums[i] = 0.0
+        self.__weight = 0.0
+        self.__count = 0
+
+    @boundscheck(False)
+    @wraparound(False)
+    def add(self, quadruples, weights=None):
+        """
+        Fold chunk of rotations into the accumulator
+        :param quadruples: array-like of unit quaternions of shape (..., 4) or RotationSet
+        :param weights: optional array-like of weights, one per quaternion
+        :return: self
+        """
+        cdef:
+            Py_ssize_t i, n, s_w
+            const double[:, ::1] q_v
+            const double[::1] w_v
+        q_v, w_v, s_w = _chunk(quadruples, weights)
+        n = q_v.shape[0]
+        with nogil:
+            for i in range(n):
+                _accumulate(&q_v[i, 0], w_v[i * s_w], self.__sums)
+                self.__weight += w_v[i * s_w]
+            self.__count += n
+        return self
+
+    cpdef RotationAccumulator merge(self, RotationAccumulator other):
+        """
+        Add data accumulated by other accumulator
+        :param other: RotationAccumulator
+        :return: self
+        """
+        cdef:
+            int i
+        for i in range(10):
+            self.__sums[i] += other.__sums[i]
+        self.__weight += other.__weight
+        self.__count += other.__count
+        return self
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def weight(self):
+        return self.__weight
+
+    @property
+    def matrix(self):
+        """
+        Accumulated 4x4 weighted sum of outer products
+        """
+        cdef:
+            int i, j, k = 0
+        result = np.empty((4, 4), dtype=np.double)
+        for i in range(4):
+            for j in range(i, 4):
+                result[i, j] = result[j, i] = self.__sums[k]
+                k += 1
+        return result
+
+    def mean(self):
+        """
+        Mean rotation quaternion with non-negative scalar part
+        :return: numpy array of four floats
+        """
+        cdef:
+            double dispersion
+            double[::1] q_v
+        if self.__weight <= 0:
+            raise ValueError('No rotations accumulated')
+        result = np.empty(4, dtype=np.double)
+        q_v = result
+        bind_lapack()
+        _check_eigen(_mean(self.__sums, self.__weight, &q_v[0], &dispersion))
+        return result
+
+    @property
+    def dispersion(self):
+        """
+        Weighted mean of 1 - (q . q_mean)^2, zero for identical rotations.
+        Mean squared Frobenius distance between rotation matrices and the mean rotation matrix is 8 * dispersion.
+        """
+        cdef:
+            double dispersion
+            double q[4]
+        if self.__weight <= 0:
+            raise ValueError('No rotations accumulated')
+        bind_lapack()
+        _check_eigen(_mean(self.__sums, self.__weight, q, &dispersion))
+        return dispersion
+
+
+cdef class GroupedRotationAccumulator(object):
+    """
+    Streaming accumulator of per-group mean rotations, groups are labelled by non-negative integers.
+    Negative labels are skipped. The number of groups grows automatically to the largest label seen.
+    """
+
+    def __init__(self, Py_ssize_t n_groups=0):
+        self.__sums = np.zeros((n_groups, 10), dtype=np.double)
+        self.__weights = np.zeros(n_groups, dtype=np.double)
+        self.__counts = np.zeros(n_groups, dtype=np.int64)
+
+    cdef void __grow(self, Py_ssize_t n_groups):
+        cdef:
+            Py_ssize_t n = self.__weights.shape[0]
+        if n_groups <= n:
+            return
+        self.__sums = np.concatenate((self.__sums, np.zeros((n_groups - n, 10), dtype=np.double)))
+        self.__weights = np.concatenate((self.__weights, np.zeros(n_groups - n, dtype=np.double)))
+        self.__counts = np.concatenate((self.__counts, np.zeros(n_groups - n, dtype=np.int64)))
+
+    @boundscheck(False)
+    @wraparound(False)
+    def add(self, quadruples, labels, weights=None):
+        """
+        Fold chunk of labelled rotations into the accumulator
+        :param quadruples: array-like of unit quaternions of shape (..., 4) or RotationSet
+        :param labels: array-like of integer group labels, one per quaternion
+        :param weights: optional array-like of weights, one per quaternion
+        :return: self
+        """
+        cdef:
+            Py_ssize_t i, g, n, s_w
+            const double[:, ::1] q_v
+            const double[::1] w_v
+            const Py_ssize_t[::1] labels_v
+            double[:, ::1] sums_v
+            double[::1] weights_v
+            long long[::1] counts_v
+        q_v, w_v, s_w = _chunk(quadruples, weights)
+        labels = np.ascontiguousarray(labels, dtype=np.intp).ravel()
+        if labels.shape[0] != q_v.shape[0]:
+            raise ValueError('Expected %d labels, got %d' % (q_v.shape[0], labels.shape[0]))
+        if labels.shape[0] > 0:
+            self.__grow(labels.max() + 1)
+        labels_v = labels
+        sums_v = self.__sums
+        weights_v = self.__weights
+        counts_v = self.__counts
+        n = q_v.shape[0]
+        with nogil:
+            for i in range(n):
+                g = labels_v[i]
+                if g < 0:
+                    continue
+                _accumulate(&q_v[i, 0], w_v[i * s_w], &sums_v[g, 0])
+                weights_v[g] += w_v[i * s_w]
+                counts_v[g] += 1
+        return self
+
+    cpdef GroupedRotationAccumulator merge(self, GroupedRotationAccumulator other):
+        """
+        Add data accumulated by other accumulator
+        :param other: GroupedRotationAccumulator
+        :return: self
+        """
+        cdef:
+            Py_ssize_t n = other.__weights.shape[0]
+        self.__grow(n)
+        self.__sums[:n] += other.__sums
+        self.__weights[:n] += other.__weights
+        self.__counts[:n] += other.__counts
+        return self
+
+    def __len__(self):
+        return self.__weights.shape[0]
+
+    @property
+    def counts(self):
+        return self.__counts.copy()
+
+    @property
+    def weights(self):
+        return self.__weights.copy()
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef tuple __means(self):
+        cdef:
+            int info = 0
+            Py_ssize_t g, n = self.__weights.shape[0]
+            const double[:, ::1] sums_v = self.__sums
+            const double[::1] weights_v = self.__weights
+            double[:, ::1] means_v
+            double[::1] dispersions_v
+        means = np.full((n, 4), np.nan, dtype=np.double)
+        dispersions = np.full(n, np.nan, dtype=np.double)
+        means_v = means
+        dispersions_v = dispersions
+        bind_lapack()
+        with nogil:
+            for g in range(n):
+                if weights_v[g] > 0:
+                    info = _mean(&sums_v[g, 0], weights_v[g], &means_v[g, 0], &dispersions_v[g])
+                    if info != 0:
+                        break
+        _check_eigen(info)
+        return means, dispersions
+
+    def means(self):
+        """
+        Mean rotation quaternion of every group, NaN for empty groups
+        :return: numpy array of shape (G, 4)
+        """
+        return self.__means()[0]
+
+    def dispersions(self):
+        """
+        Dispersion (see RotationAccumulator.dispersion) of every group, NaN for empty groups
+        :return: numpy array of shape (G,)
+        """
+        return self.__means()[1]
+
+
+def mean_rotation(quadruples, weights=None):
+    """
+    Weighted mean of rotations
+    :param quadruples: array-like of unit quaternions of shape (..., 4) or RotationSet
+    :param weights: optional array-like of weights, one per quaternion
+    :return: mean quaternion as numpy array of four floats
+    """
+    return RotationAccumulator().add(quadruples, weights).mean()
+
+
+def grouped_mean_rotations(quadruples, labels, weights=None):
+    """
+    Weighted mean rotations of labelled groups
+    :param quadruples: array-like of unit quaternions of shape (..., 4) or RotationSet
+    :param labels: array-like of integer group labels, negative labels are skipped
+    :param weights: optional array-like of weights, one per quaternion
+    :return: numpy array of shape (G, 4), NaN for empty groups
+    """
+    return GroupedRotationAccumulator().add(quadruples, labels, weights).means()
@@ -0,0 +1,205 @@
+"""
+Streaming readers of EBSD orientation maps stored as EDAX/TSL .ang and Oxford HKL Channel 5 .ctf text files.
+The data rows are parsed in chunks of fixed number of pixels, so maps of any size are converted in constant memory.
+Both formats store Bunge (phi1 Phi phi2) Euler angles, .ang in radians and .ctf in degrees.
+The angles are converted as stored, no reference frame corrections are applied.
+Non-indexed pixels are passed through, use phase and quality columns (ci, mad, ...) to filter them.
+"""
+
+import os
+import itertools
+import numpy as np
+
+from .EulerAnglesConventions cimport Conventions, Convention, _lookup
+from .euler_angles_arrays import euler_angles_to_quaternions
+
+
+conventions = Conventions()
+cdef tuple _ang_columns = ('phi1', 'Phi', 'phi2', 'x', 'y', 'iq', 'ci', 'phase', 'sem_signal', 'fit')
+cdef tuple _ctf_euler_columns = ('euler1', 'euler2', 'euler3')
+
+
+cdef str _format(path, format):
+    if format is None:
+        format = os.path.splitext(str(path))[1].lstrip('.')
+    format = str(format).lower()
+    if format not in ('ang', 'ctf'):
+        raise ValueError('Unknown EBSD file format %s, expected ang or ctf' % format)
+    return format
+
+
+cdef object _number(str value):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+cdef dict _read_ang_header(f):
+    """
+    Parse header of .ang file, all header lines start with #, the file is left positioned at the first data line
+    :return: file info dict
+    """
+    header = {}
+    phases = []
+    while True:
+        position = f.tell()
+        line = f.readline()
+        if not line.startswith('#'):
+            f.seek(position)
+            break
+        fields = line[1:].strip().replace(':', ' ', 1).split(None, 1)
+        if not fields:
+            continue
+        key = fields[0]
+        value = fields[1].strip() if len(fields) > 1 else ''
+        if key == 'Phase':
+            phases.append({'id': _number(value)})
+        elif phases and key in ('MaterialName', 'Formula', 'Symmetry', 'LatticeConstants', 'NumberFamilies'):
+            phases[-1][key] = _number(value) if key in ('Symmetry', 'NumberFamilies') else value
+        elif key not in header:
+            header[key] = _number(value)
+    n_columns = len(line.split())
+    columns = [_ang_columns[i] if i < len(_ang_columns) else 'column_%d' % i for i in range(n_columns)]
+    count = None
+    if 'NROWS' in header and 'NCOLS_ODD' in header:
+        if str(header.get('GRID', 'SqrGrid')).lower().startswith('hex'):
+            count = ((header['NROWS'] + 1) // 2 * header['NCOLS_ODD']
+                     + header['NROWS'] // 2 * header.get('NCOLS_EVEN', header['NCOLS_ODD'] - 1))
+        else:
+            count = header['NROWS'] * header['NCOLS_ODD']
+    info = {'format': 'ang',
+            'euler_angles_convention': 'Bunge',
+            'degrees': False,
+            'columns': columns,
+            'euler_angles_columns': [0, 1, 2],
+            'count': count,
+            'x_step': header.get('XSTEP'),
+            'y_step': header.get('YSTEP'),
+            'phases': phases,
+            'header': header}
+    return info
+
+
+cdef dict _read_ctf_header(f):
+    """
+    Parse header of .ctf file, the header ends with the line of tab separated column names
+    :return: file info dict
+    """
+    header = {}
+    phases = []
+    names = None
+    n_phases = 0
+    for line in iter(f.readline, ''):
+        fields = line.rstrip('\r\n').split('\t')
+        if fields[:3] == ['Phase', 'X', 'Y']:
+            names = [name.strip().lower() for name in fields if name.strip()]
+            break
+        if n_phases > len(phases):
+            phases.append({'id': len(phases) + 1,
+                           'lattice_constants': fields[0] if len(fields) > 0 else '',
+                           'lattice_angles': fields[1] if len(fields) > 1 else '',
+                           'name': fields[2] if len(fields) > 2 else '',
+                           'laue_group': _number(fields[3]) if len(fields) > 3 else None,
+                           'space_group': _number(fields[4]) if len(fields) > 4 else None})
+            continue
+        key = fields[0].strip()
+        if not key:
+            continue
+        values = [field for field in fields[1:] if field]
+        header[key] = _number(values[0]) if len(values) == 1 else values
+        if key == 'Phases':
+            n_phases = int(values[0])
+    if names is None:
+        raise ValueError('Not a Channel Text File, the line of column names is missing')
+    for name in _ctf_euler_columns:
+        if name not in names:
+            raise ValueError('Column %s is missing in Channel Text File' % name)
+    count = None
+    if isinstance(header.get('XCells'), int) and isinstance(header.get('YCells'), int):
+        count = header['XCells'] * header['YCells']
+    info = {'format': 'ctf',
+            'euler_angles_convention': 'Bunge',
+            'degrees': True,
+            'columns': names,
+            'euler_angles_columns': [names.index(name) for name in _ctf_euler_columns],
+            'count': count,
+            'x_step': header.get('XStep'),
+            'y_step': header.get('YStep'),
+            'phases': phases,
+            'header': header}
+    return info
+
+
+cdef dict _read_header(f, str format):
+    if format == 'ang':
+        return _read_ang_header(f)
+    return _read_ctf_header(f)
+
+
+def ebsd_file_info(path, format=None):
+    """
+    Read header of EBSD file without reading the data
+    :param path: file name
+    :param format: 'ang' or 'ctf', guessed from the file extension if None
+    :return: dict with format, Euler angles convention label, angular units, column names, number of pixels
+        given in the header (None if unknown), grid steps, phases and all header fields
+    """
+    with open(path, 'r', encoding='latin-1') as f:
+        info = _read_header(f, _format(path, format))
+    return info
+
+
+def read_ebsd(path, Py_ssize_t chunk_size=65536, euler_angles_convention=None, degrees=None, format=None,
+              n_threads=None):
+    """
+    Lazily read EBSD map converting Euler angles to rotation quaternions chunk by chunk
+    :param path: file name
+    :param chunk_size: number of pixels in every yielded chunk (the last one may be shorter)
+    :param euler_angles_convention: Convention or its label overriding the convention of the format (Bunge)
+    :param degrees: True if angles are in degrees, by default taken from the format
+    :param format: 'ang' or 'ctf', guessed from the file extension if None
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: generator of tuples (quaternions, columns), where quaternions is an array of shape (chunk_size, 4)
+        and columns is a dict of per-pixel arrays of all other columns (phase as integers, coordinates, quality)
+    """
+    cdef:
+        Convention convention
+        Py_ssize_t i
+    if chunk_size < 1:
+        raise ValueError('Chunk size must be positive')
+    format = _format(path, format)
+    if euler_angles_convention is None:
+        convention = conventions.get_convention('Bunge')
+    elif isinstance(euler_angles_convention, Convention):
+        convention = euler_angles_convention
+    else:
+        convention = _lookup(str(euler_angles_convention))
+        if convention is None:
+            raise ValueError('Unknown Euler angles convention %s' % str(euler_angles_convention))
+    with open(path, 'r', encoding='latin-1') as f:
+        info = _read_header(f, format)
+        if degrees is None:
+            degrees = info['degrees']
+        names = info['columns']
+        angles_columns = info['euler_angles_columns']
+        other_columns = [i for i in range(len(names)) if i not in angles_columns]
+        lines = filter(str.strip, f)
+        for line in lines:
+            data = np.loadtxt(itertools.chain((line,), lines), dtype=np.double, ndmin=2, max_rows=chunk_size)
+            if data.shape[1] != len(names):
+                raise ValueError('Expected %d columns of data, got %d' % (len(names), data.shape[1]))
+            angles = data[:, angles_columns]
+            if degrees:
+                np.deg2rad(angles, out=angles)
+            quaternions = euler_angles_to_quaternions(angles, convention, n_threads=n_threads)
+            columns = {}
+            for i in other_columns:
+                if names[i] == 'phase':
+                    columns[names[i]] = data[:, i].astype(np.int32)
+                else:
+                    columns[names[i]] = np.ascontiguousarray(data[:, i])
+            yield quaternions, columns
@@ -0,0 +1,5 @@
+from .EulerAnglesConventions cimport AxesPlan
+
+
+cdef void euler_to_rotation_matrix(const double* euler_angles, AxesPlan* plan, double* m) nogil
+cdef void euler_from_rotation_matrix(const double* m, AxesPlan* plan, double* euler_angles) nogil
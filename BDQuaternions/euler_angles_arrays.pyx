@@ -0,0 +1,321 @@
+"""
+Vectorized conversion of arrays of Euler angles triplets of shape (..., 3) to and from
+arrays of quaternions (..., 4) and rotation matrices (..., 3, 3) for any Convention, including derived ones.
+Conversion algorithms after Ken Shoemake in Graphics Gems IV (Academic Press, 1994), p. 222
+
+All angles are in radians
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound, cdivision
+from cython.parallel cimport prange
+
+from libc.math cimport sin, cos, atan2, sqrt, floor, fabs, M_PI
+from libc.float cimport DBL_MIN
+from .EulerAnglesConventions cimport Convention, AxesPlan
+from ._kernels cimport q_to_rotation_matrix, q_from_rotation_matrix
+from .quaternion_arrays cimport _output
+from .quaternion_arrays import as_quaternions_array
+from .parallel cimport acquire_threads, release_threads
+from .instrumentation cimport timer_start, timer_stop
+
+
+cdef object _root_angles(euler_angles, Convention convention):
+    """
+    Bring array of Euler angles to the highest level parent convention
+    :return: C-contiguous (N, 3) array
+    """
+    euler_angles = np.asarray(euler_angles, dtype=np.double)
+    if euler_angles.ndim == 0 or euler_angles.shape[euler_angles.ndim - 1] != 3:
+        raise ValueError('Expected array of Euler angles of shape (..., 3), got %s' % str(euler_angles.shape))
+    euler_angles = np.ascontiguousarray(euler_angles).reshape(-1, 3)
+    return np.ascontiguousarray(convention.to_root_array(euler_angles), dtype=np.double)
+
+
+cdef void euler_to_rotation_matrix(const double* euler_angles, AxesPlan* plan, double* m) nogil:
+    """
+    Convert Euler angles triplet in the root convention to 3x3 rotation matrix stored row-major
+    """
+    cdef:
+        int i = plan.i, j = plan.j, k = plan.k
+        double a0 = euler_angles[0], a1 = euler_angles[1], a2 = euler_angles[2]
+        double ci, si, cj, sj, ck, sk, cc, ss, cs, sc
+    if plan.frame:
+        a0, a2 = a2, a0
+    if plan.parity:
+        a0, a1, a2 = -a0, -a1, -a2
+    ci = cos(a0)
+    si = sin(a0)
+    cj = cos(a1)
+    sj = sin(a1)
+    ck = cos(a2)
+    sk = sin(a2)
+    cc = ci * ck
+    ss = si * sk
+    cs = ci * sk
+    sc = si * ck
+    if plan.repetition:
+        m[3 * i + i] = cj
+        m[3 * i + j] = si * sj
+        m[3 * i + k] = ci * sj
+        m[3 * j + i] = sj * sk
+        m[3 * j + j] = cc - cj * ss
+        m[3 * j + k] = -sc - cj * cs
+        m[3 * k + i] = -sj * ck
+        m[3 * k + j] = cs + cj * sc
+        m[3 * k + k] = cj * cc - ss
+    else:
+        m[3 * i + i] = cj * ck
+        m[3 * i + j] = sj * sc - cs
+        m[3 * i + k] = sj * cc + ss
+        m[3 * j + i] = cj * sk
+        m[3 * j + j] = sj * ss + cc
+        m[3 * j + k] = sj * cs - sc
+        m[3 * k + i] = -sj
+        m[3 * k + j] = si * cj
+        m[3 * k + k] = ci * cj
+
+
+cdef void euler_from_rotation_matrix(const double* m, AxesPlan* plan, double* euler_angles) nogil:
+    """
+    Convert 3x3 rotation matrix stored row-major to Euler angles triplet in the root convention
+    """
+    cdef:
+        int i = plan.i, j = plan.j, k = plan.k
+        double sy, cy, ax, ay, az
+    if plan.repetition:
+        sy = sqrt(m[3 * i + j] * m[3 * i + j] + m[3 * i + k] * m[3 * i + k])
+        if sy > DBL_MIN * 4:
+            ax = atan2(m[3 * i + j], m[3 * i + k])
+            ay = atan2(sy, m[3 * i + i])
+            az = atan2(m[3 * j + i], -m[3 * k + i])
+        else:
+            ax = atan2(-m[3 * j + k], m[3 * j + j])
+            ay = atan2(sy, m[3 * i + i])
+            az = 0.0
+    else:
+        cy = sqrt(m[3 * i + i] * m[3 * i + i] + m[3 * j + i] * m[3 * j + i])
+        if cy > DBL_MIN * 4:
+            ax = atan2(m[3 * k + j], m[3 * k + k])
+            ay = atan2(-m[3 * k + i], cy)
+            az = atan2(m[3 * j + i], m[3 * i + i])
+        else:
+            ax = atan2(-m[3 * j + k], m[3 * j + j])
+            ay = atan2(-m[3 * k + i], cy)
+            az = 0.0
+    if plan.parity:
+        ax, ay, az = -ax, -ay, -az
+    if plan.frame:
+        ax, az = az, ax
+    euler_angles[0] = ax
+    euler_angles[1] = ay
+    euler_angles[2] = az
+
+
+cdef inline void _euler_to_quaternion(const double* euler_angles, AxesPlan* plan, double* q) nogil:
+    cdef:
+        double m[9]
+    euler_to_rotation_matrix(euler_angles, plan, m)
+    q_from_rotation_matrix(m, q)
+
+
+cdef inline void _euler_from_quaternion(const double* q, AxesPlan* plan, double* euler_angles) nogil:
+    cdef:
+        double m[9]
+    q_to_rotation_matrix(q, m)
+    euler_from_rotation_matrix(m, plan, euler_angles)
+
+
+@cdivision(True)
+cdef inline double _reduce_angle(double angle) nogil:
+    """
+    Adjusts rotation angle to be in the range [-pi; pi] the same way EulerAngles does
+    """
+    cdef:
+        double reduced_angle
+    if angle > 2 * M_PI:
+        reduced_angle = angle - 2 * M_PI * floor(angle / (2 * M_PI))
+    elif angle < -2 * M_PI:
+        reduced_angle = angle + 2 * M_PI * floor(fabs(angle) / (2 * M_PI))
+    else:
+        reduced_angle = angle
+    if reduced_angle < -M_PI:
+        reduced_angle += 2 * M_PI
+    elif reduced_angle > M_PI:
+        reduced_angle -= 2 * M_PI
+    return reduced_angle
+
+
+@boundscheck(False)
+@wraparound(False)
+def reduce_euler_angles(euler_angles, out=None, n_threads=None):
+    """
+    Reduce all angles of the array to the range [-pi; pi]
+    :param euler_angles: array-like of any shape
+    :param out: optional output array, may be euler_angles itself
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of reduced angles of the same shape
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        const double[::1] angles_v
+        double[::1] out_v
+    euler_angles = np.asarray(euler_angles, dtype=np.double)
+    result = _output(out, euler_angles.shape)
+    angles_v = np.ascontiguousarray(euler_angles).reshape(-1)
+    out_v = result.reshape(-1)
+    n = out_v.shape[0]
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            out_v[i] = _reduce_angle(angles_v[i])
+    release_threads(threads)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def euler_angles_to_rotation_matrices(euler_angles, Convention convention, out=None, n_threads=None):
+    """
+    Convert array of Euler angles to array of rotation matrices
+    :param euler_angles: array-like of shape (..., 3)
+    :param convention: Euler angles convention
+    :param out: optional output array of shape (..., 3, 3)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of rotation matrices of shape (..., 3, 3)
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        double started
+        AxesPlan plan
+        const double[:, ::1] angles_v
+        double[:, ::1] out_v
+    euler_angles = np.asarray(euler_angles, dtype=np.double)
+    shape = euler_angles.shape[:euler_angles.ndim - 1]
+    angles = _root_angles(euler_angles, convention)
+    plan = convention.__root.__plan
+    result = _output(out, shape + (3, 3))
+    angles_v = angles
+    out_v = result.reshape(-1, 9)
+    n = out_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            euler_to_rotation_matrix(&angles_v[i, 0], &plan, &out_v[i, 0])
+    release_threads(threads)
+    timer_stop('euler_angles_arrays.euler_angles_to_rotation_matrices', started)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def euler_angles_to_quaternions(euler_angles, Convention convention, out=None, n_threads=None):
+    """
+    Convert array of Euler angles to array of rotation quaternions
+    :param euler_angles: array-like of shape (..., 3)
+    :param convention: Euler angles convention
+    :param out: optional output array of shape (..., 4)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4)
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        double started
+        AxesPlan plan
+        const double[:, ::1] angles_v
+        double[:, ::1] out_v
+    euler_angles = np.asarray(euler_angles, dtype=np.double)
+    shape = euler_angles.shape[:euler_angles.ndim - 1]
+    angles = _root_angles(euler_angles, convention)
+    plan = convention.__root.__plan
+    result = _output(out, shape + (4,))
+    angles_v = angles
+    out_v = result.reshape(-1, 4)
+    n = out_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            _euler_to_quaternion(&angles_v[i, 0], &plan, &out_v[i, 0])
+    release_threads(threads)
+    timer_stop('euler_angles_arrays.euler_angles_to_quaternions', started)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def euler_angles_from_rotation_matrices(m, Convention convention, out=None, n_threads=None):
+    """
+    Convert array of rotation matrices to array of Euler angles
+    :param m: array-like of shape (..., 3, 3)
+    :param convention: Euler angles convention
+    :param out: optional output array of shape (..., 3)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of Euler angles of shape (..., 3)
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        double started
+        AxesPlan plan = convention.__root.__plan
+        const double[:, ::1] m_v
+        double[:, ::1] angles_v
+    m = np.asarray(m, dtype=np.double)
+    if m.ndim < 2 or m.shape[m.ndim - 2:] != (3, 3):
+        raise ValueError('Expected array of rotation matrices of shape (..., 3, 3), got %s' % str(m.shape))
+    shape = m.shape[:m.ndim - 2]
+    m_v = np.ascontiguousarray(m).reshape(-1, 9)
+    angles = np.empty((m_v.shape[0], 3), dtype=np.double)
+    angles_v = angles
+    n = m_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            euler_from_rotation_matrix(&m_v[i, 0], &plan, &angles_v[i, 0])
+    release_threads(threads)
+    timer_stop('euler_angles_arrays.euler_angles_from_rotation_matrices', started)
+    result = _output(out, shape + (3,))
+    result[...] = np.reshape(convention.from_root_array(angles), shape + (3,))
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def euler_angles_from_quaternions(q, Convention convention, out=None, n_threads=None):
+    """
+    Convert array of rotation quaternions to array of Euler angles
+    :param q: array-like of shape (..., 4)
+    :param convention: Euler angles convention
+    :param out: optional output array of shape (..., 3)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of Euler angles of shape (..., 3)
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        double started
+        AxesPlan plan = convention.__root.__plan
+        const double[:, ::1] q_v
+        double[:, ::1] angles_v
+    q = as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    q_v = np.ascontiguousarray(q).reshape(-1, 4)
+    angles = np.empty((q_v.shape[0], 3), dtype=np.double)
+    angles_v = angles
+    n = q_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            _euler_from_quaternion(&q_v[i, 0], &plan, &angles_v[i, 0])
+    release_threads(threads)
+    timer_stop('euler_angles_arrays.euler_angles_from_quaternions', started)
+    result = _output(out, shape + (3,))
+    result[...] = np.reshape(convention.from_root_array(angles), shape + (3,))
+    return result
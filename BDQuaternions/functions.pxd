@@ -1,2 +1,6 @@
-cpdef exp(arg)
-cpdef log(arg)
+cpdef exp(arg, bint as_quaternions=*)
+cpdef log(arg, bint as_quaternions=*)
+cpdef sqrt(arg, bint as_quaternions=*)
+cpdef pow(arg, double p, bint as_quaternions=*)
+cpdef sin(arg, bint as_quaternions=*)
+cpdef cos(arg, bint as_quaternions=*)
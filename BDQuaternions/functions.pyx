@@ -5,54 +5,145 @@ from cython import boundscheck, wraparound
 
 from .Quaternion cimport Quaternion
 from ._quaternion_operations cimport exp as q_exp, log as q_log
-from libc.math cimport exp as c_exp, log as c_log
+from libc.math cimport exp as c_exp, log as c_log, sqrt as c_sqrt, pow as c_pow, sin as c_sin, cos as c_cos
+from . import quaternion_arrays as qa
+
 
 @boundscheck(False)
 @wraparound(False)
-cpdef exp(arg):
+cdef bint _all_quaternions(objects):
+    cdef:
+        Py_ssize_t i
+    for i in range(objects.shape[0]):
+        if not isinstance(objects[i], Quaternion):
+            return False
+    return True
+
+
+cdef object _dispatch_array(arg, bint as_quaternions, quaternions_function, numbers_function, scalar_function,
+                            tuple args=()):
+    """
+    Apply function to list, tuple or ndarray argument.
+    Numeric arrays are processed in bulk either as arrays of numbers or, if as_quaternions is True,
+    as arrays of quaternions of shape (..., 4).
+    Arrays of Quaternion objects are packed once, processed in bulk and unpacked once.
+    Mixed arrays of numbers and Quaternions are processed element by element.
+    Extra args are passed to the functions after the argument.
+    """
+    cdef:
+        Py_ssize_t i
+    array = np.asarray(arg)
+    if array.dtype != object:
+        if as_quaternions:
+            return quaternions_function(array, *args)
+        return numbers_function(array, *args)
+    flat = array.ravel()
+    if _all_quaternions(flat):
+        return qa.unpack_quaternions(quaternions_function(qa.pack_quaternions(array), *args))
+    result = np.empty(flat.shape[0], dtype=object)
+    for i in range(flat.shape[0]):
+        result[i] = scalar_function(flat[i], *args)
+    return result.reshape(array.shape)
+
+
+cpdef exp(arg, bint as_quaternions=False):
     """
     Calculate exponent function on quaternions and numbers
     :param arg: Quaternion, number or array of both or mix
+    :param as_quaternions: treat numeric array of shape (..., 4) as array of quaternions
     :return: exponent of Quaternion, number or array of both or mix
     """
-    cdef:
-        int i, size
     if isinstance(arg, Quaternion):
         return Quaternion(q_exp(arg.quadruple))
     elif isinstance(arg, numbers.Number):
         return c_exp(arg)
     elif isinstance(arg, (list, tuple, np.ndarray)):
-        result = np.copy(np.array(arg))
-        shape = result.shape
-        size = result.size
-        result = result.ravel()
-        for i in range(size):
-            result[i] = exp(result[i])
-        return result.reshape(shape)
+        return _dispatch_array(arg, as_quaternions, qa.exp, np.exp, exp)
     else:
         raise ValueError('Not supported argument of type %s' % str(type(arg)))
 
-@boundscheck(False)
-@wraparound(False)
-cpdef log(arg):
+
+cpdef log(arg, bint as_quaternions=False):
     """
     Calculate logarithm function on quaternions and numbers
     :param arg: Quaternion, number or array of both or mix
+    :param as_quaternions: treat numeric array of shape (..., 4) as array of quaternions
     :return: logarithm of Quaternion, number or array of both or mix
     """
-    cdef:
-        int i, size
     if isinstance(arg, Quaternion):
         return Quaternion(q_log(arg.quadruple))
     elif isinstance(arg, numbers.Number):
         return c_log(arg)
     elif isinstance(arg, (list, tuple, np.ndarray)):
-        result = np.copy(np.array(arg))
-        shape = result.shape
-        size = result.size
-        result = result.ravel()
-        for i in range(size):
-            result[i] = log(result[i])
-        return result.reshape(shape)
+        return _dispatch_array(arg, as_quaternions, qa.log, np.log, log)
+    else:
+        raise ValueError('Not supported argument of type %s' % str(type(arg)))
+
+
+cpdef sqrt(arg, bint as_quaternions=False):
+    """
+    Calculate principal square root on quaternions and numbers
+    :param arg: Quaternion, number or array of both or mix
+    :param as_quaternions: treat numeric array of shape (..., 4) as array of quaternions
+    :return: square root of Quaternion, number or array of both or mix
+    """
+    if isinstance(arg, Quaternion):
+        return Quaternion(qa.sqrt(arg.quadruple))
+    elif isinstance(arg, numbers.Number):
+        return c_sqrt(arg)
+    elif isinstance(arg, (list, tuple, np.ndarray)):
+        return _dispatch_array(arg, as_quaternions, qa.sqrt, np.sqrt, sqrt)
+    else:
+        raise ValueError('Not supported argument of type %s' % str(type(arg)))
+
+
+cpdef pow(arg, double p, bint as_quaternions=False):
+    """
+    Raise quaternions and numbers to real power
+    :param arg: Quaternion, number or array of both or mix
+    :param p: real power
+    :param as_quaternions: treat numeric array of shape (..., 4) as array of quaternions
+    :return: power of Quaternion, number or array of both or mix
+    """
+    if isinstance(arg, Quaternion):
+        return Quaternion(qa.power(arg.quadruple, p))
+    elif isinstance(arg, numbers.Number):
+        return c_pow(arg, p)
+    elif isinstance(arg, (list, tuple, np.ndarray)):
+        return _dispatch_array(arg, as_quaternions, qa.power, np.power, pow, (p,))
+    else:
+        raise ValueError('Not supported argument of type %s' % str(type(arg)))
+
+
+cpdef sin(arg, bint as_quaternions=False):
+    """
+    Calculate sine function on quaternions and numbers
+    :param arg: Quaternion, number or array of both or mix
+    :param as_quaternions: treat numeric array of shape (..., 4) as array of quaternions
+    :return: sine of Quaternion, number or array of both or mix
+    """
+    if isinstance(arg, Quaternion):
+        return Quaternion(qa.sin(arg.quadruple))
+    elif isinstance(arg, numbers.Number):
+        return c_sin(arg)
+    elif isinstance(arg, (list, tuple, np.ndarray)):
+        return _dispatch_array(arg, as_quaternions, qa.sin, np.sin, sin)
+    else:
+        raise ValueError('Not supported argument of type %s' % str(type(arg)))
+
+
+cpdef cos(arg, bint as_quaternions=False):
+    """
+    Calculate cosine function on quaternions and numbers
+    :param arg: Quaternion, number or array of both or mix
+    :param as_quaternions: treat numeric array of shape (..., 4) as array of quaternions
+    :return: cosine of Quaternion, number or array of both or mix
+    """
+    if isinstance(arg, Quaternion):
+        return Quaternion(qa.cos(arg.quadruple))
+    elif isinstance(arg, numbers.Number):
+        return c_cos(arg)
+    elif isinstance(arg, (list, tuple, np.ndarray)):
+        return _dispatch_array(arg, as_quaternions, qa.cos, np.cos, cos)
     else:
         raise ValueError('Not supported argument of type %s' % str(type(arg)))
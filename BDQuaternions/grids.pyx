@@ -0,0 +1,159 @@
+"""
+Deterministic near-uniform grids on the rotation group after A. Yershova et al.,
+Generating uniform incremental grids on SO(3) using the Hopf fibration, Int. J. Robot. Res. 29 (2010) 801-812.
+The grid is the product of HEALPix (K. M. Gorski et al., Astrophys. J. 622 (2005) 759) pixel centres on S2
+and equally spaced points on S1. Grid of level L has 12 * 4^L * 6 * 2^L = 72 * 8^L points,
+level 0 spacing is about 60 degrees and every next level halves it.
+Grid points are generated lazily in chunks, optionally only inside of the fundamental zone of a point group.
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound, cdivision
+
+from libc.math cimport sqrt, sin, cos, acos, fabs, log2, ceil, M_PI
+from .symmetry cimport PointGroup, get_point_group, best_symmetric_equivalent
+
+
+cdef double _base_resolution = M_PI / 3
+
+
+def hopf_grid_level(double resolution):
+    """
+    Smallest grid level with spacing not larger than requested resolution
+    :param resolution: grid spacing (rotation angle) in radians
+    :return: grid level
+    """
+    if resolution <= 0:
+        raise ValueError('Resolution must be positive')
+    return max(0, int(ceil(log2(_base_resolution / resolution) - 1.0e-12)))
+
+
+def hopf_grid_size(int level):
+    """
+    Number of points of the full grid of given level
+    :param level: grid level
+    :return: number of grid points
+    """
+    return 72 * 8 ** level
+
+
+@cdivision(True)
+cdef inline void _healpix_centre(Py_ssize_t nside, Py_ssize_t p, double* theta, double* phi) nogil:
+    """
+    Spherical coordinates of the centre of HEALPix pixel p in the RING scheme
+    """
+    cdef:
+        Py_ssize_t n_pix = 12 * nside * nside, n_cap = 2 * nside * (nside - 1)
+        Py_ssize_t i_ring, i_phi, ip
+        double z, f_odd
+    if p < n_cap:
+        i_ring = <Py_ssize_t> ((1 + sqrt(<double> (1 + 2 * p))) / 2)
+        while 2 * i_ring * (i_ring - 1) > p:
+            i_ring -= 1
+        while 2 * (i_ring + 1) * i_ring <= p:
+            i_ring += 1
+        i_phi = p + 1 - 2 * i_ring * (i_ring - 1)
+        z = 1.0 - <double> (i_ring * i_ring) / (3.0 * nside * nside)
+        phi[0] = (i_phi - 0.5) * M_PI / (2.0 * i_ring)
+    elif p < n_pix - n_cap:
+        ip = p - n_cap
+        i_ring = ip / (4 * nside) + nside
+        i_phi = ip % (4 * nside) + 1
+        f_odd = 1.0 if (i_ring + nside) & 1 else 0.5
+        z = (2 * nside - i_ring) * 2.0 / (3.0 * nside)
+        phi[0] = (i_phi - f_odd) * M_PI / (2.0 * nside)
+    else:
+        ip = n_pix - p
+        i_ring = <Py_ssize_t> ((1 + sqrt(<double> (2 * ip - 1))) / 2)
+        while 2 * i_ring * (i_ring - 1) >= ip:
+            i_ring -= 1
+        while 2 * (i_ring + 1) * i_ring < ip:
+            i_ring += 1
+        i_phi = 4 * i_ring + 1 - (ip - 2 * i_ring * (i_ring - 1))
+        z = -1.0 + <double> (i_ring * i_ring) / (3.0 * nside * nside)
+        phi[0] = (i_phi - 0.5) * M_PI / (2.0 * i_ring)
+    theta[0] = acos(z)
+
+
+@cdivision(True)
+cdef inline void _hopf_point(Py_ssize_t nside, Py_ssize_t n_psi, Py_ssize_t k, double* q) nogil:
+    cdef:
+        double theta, phi, psi
+    _healpix_centre(nside, k / n_psi, &theta, &phi)
+    psi = (k % n_psi + 0.5) * 2 * M_PI / n_psi
+    q[0] = cos(theta / 2) * cos(psi / 2)
+    q[1] = cos(theta / 2) * sin(psi / 2)
+    q[2] = sin(theta / 2) * cos(phi + psi / 2)
+    q[3] = sin(theta / 2) * sin(phi + psi / 2)
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef Py_ssize_t _fill(Py_ssize_t nside, Py_ssize_t n_psi, Py_ssize_t* k, Py_ssize_t n, double[:, ::1] out,
+                      const double[:, ::1] operators, double early_exit_w) nogil:
+    """
+    Write grid points starting from index k[0] into out, skipping points outside of the fundamental zone
+    :return: number of points written, k[0] is advanced past the last examined point
+    """
+    cdef:
+        Py_ssize_t written = 0, n_out = out.shape[0], n_operators = operators.shape[0]
+        double w
+    while written < n_out and k[0] < n:
+        _hopf_point(nside, n_psi, k[0], &out[written, 0])
+        k[0] += 1
+        if n_operators > 1:
+            best_symmetric_equivalent(&out[written, 0], &operators[0, 0], n_operators, early_exit_w, &w)
+            if fabs(out[written, 0]) < w - 1.0e-12:
+                continue
+        written += 1
+    return written
+
+
+def hopf_grid(level=None, resolution=None, symmetry=None, Py_ssize_t chunk_size=65536):
+    """
+    Lazily generate near-uniform deterministic grid on the rotation group
+    :param level: grid level, alternatively the level is chosen from resolution
+    :param resolution: required grid spacing (rotation angle) in radians
+    :param symmetry: optional PointGroup or its label, only points of its fundamental zone are generated
+    :param chunk_size: number of points in every yielded block (the last one may be shorter)
+    :return: generator of unit quaternions arrays of shape (chunk_size, 4)
+    """
+    cdef:
+        Py_ssize_t nside, n_psi, n, k = 0, written
+        PointGroup point_group
+        const double[:, ::1] operators_v
+        double[:, ::1] out_v
+    if level is None:
+        if resolution is None:
+            raise ValueError('Either level or resolution must be given')
+        level = hopf_grid_level(resolution)
+    if level < 0:
+        raise ValueError('Grid level must be non-negative')
+    if chunk_size < 1:
+        raise ValueError('Chunk size must be positive')
+    point_group = get_point_group('1' if symmetry is None else symmetry)
+    operators_v = point_group.operators
+    nside = 2 ** level
+    n_psi = 6 * 2 ** level
+    n = hopf_grid_size(level)
+    while k < n:
+        chunk = np.empty((chunk_size, 4), dtype=np.double)
+        out_v = chunk
+        with nogil:
+            written = _fill(nside, n_psi, &k, n, out_v, operators_v, point_group.__early_exit_w)
+        if written == chunk_size:
+            yield chunk
+        elif written > 0:
+            yield chunk[:written]
+
+
+def hopf_grid_array(level=None, resolution=None, symmetry=None):
+    """
+    Near-uniform deterministic grid on the rotation group as a single array, see hopf_grid()
+    :return: array of unit quaternions of shape (N, 4)
+    """
+    chunks = list(hopf_grid(level, resolution, symmetry))
+    if not chunks:
+        return np.empty((0, 4), dtype=np.double)
+    return np.concatenate(chunks)
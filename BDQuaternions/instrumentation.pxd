@@ -0,0 +1,4 @@
+cdef bint enabled() nogil
+cdef void count(str counter, Py_ssize_t n=*)
+cdef double timer_start()
+cdef void timer_stop(str timer, double started)
@@ -0,0 +1,124 @@
+"""
+Opt-in instrumentation of the package.
+Counters record calls, fallbacks and allocations, timers record the wall time of the batch kernels.
+Instrumentation is disabled by default, instrumented code paths then only check a C flag.
+Counters:
+    quaternion_allocated - Quaternion, UnitQuaternion and Rotation objects created
+    array_allocated - result arrays allocated by the batch routines
+    quaternion_from_rotation_matrix - scalar matrix to quaternion conversions
+    rotation_matrix_fallback - non-orthogonal matrices converted to the quaternion of the nearest rotation
+    convention_created - Convention objects constructed
+    conventions_created - Conventions registries constructed
+Timers are named after the timed routines, e.g. quaternion_arrays.mul.
+"""
+
+from time import perf_counter
+
+
+cdef bint _enabled = False
+cdef dict _counters = {}
+cdef dict _timers = {}
+cdef object _hook = None
+
+
+cdef bint enabled() nogil:
+    return _enabled
+
+
+cdef void count(str counter, Py_ssize_t n=1):
+    """
+    Increase counter by n if instrumentation is enabled
+    """
+    if not _enabled:
+        return
+    _counters[counter] = _counters.get(counter, 0) + n
+    if _hook is not None:
+        _hook('counter', counter, n)
+
+
+cdef double timer_start():
+    """
+    :return: start time or -1 if instrumentation is disabled
+    """
+    if not _enabled:
+        return -1.0
+    return perf_counter()
+
+
+cdef void timer_stop(str timer, double started):
+    """
+    Record time elapsed since timer_start()
+    """
+    cdef:
+        double elapsed
+        list record
+    if started < 0 or not _enabled:
+        return
+    elapsed = perf_counter() - started
+    record = _timers.get(timer)
+    if record is None:
+        _timers[timer] = [1, elapsed, elapsed]
+    else:
+        record[0] += 1
+        record[1] += elapsed
+        if elapsed > record[2]:
+            record[2] = elapsed
+    if _hook is not None:
+        _hook('timer', timer, elapsed)
+
+
+def enable():
+    """
+    Enable instrumentation
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """
+    Disable instrumentation, collected statistics is kept
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """
+    :return: True if instrumentation is enabled
+    """
+    return _enabled
+
+
+def reset():
+    """
+    Clear all counters and timers
+    """
+    _counters.clear()
+    _timers.clear()
+
+
+def snapshot():
+    """
+    Copy of the collected statistics
+    :return: dict with 'counters' mapping counter names to counts
+        and 'timers' mapping timer names to dicts of calls, total and max time in seconds
+    """
+    return {'counters': dict(_counters),
+            'timers': {name: {'calls': record[0], 'total': record[1], 'max': record[2]}
+                       for name, record in _timers.items()}}
+
+
+def set_hook(hook):
+    """
+    Set callback called on every recorded event, e.g. to export statistics to a metrics system
+    :param hook: callable hook(kind, name, value) or None to remove the hook,
+        kind is 'counter' with value being the increment or 'timer' with value being elapsed time in seconds
+    :return: previous hook
+    """
+    global _hook
+    if hook is not None and not callable(hook):
+        raise TypeError('hook must be callable or None')
+    previous = _hook
+    _hook = hook
+    return previous
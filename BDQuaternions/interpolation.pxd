@@ -0,0 +1,15 @@
+cdef class KeyframeSequence(object):
+    cdef:
+        double[::1] __times
+        double[::1] __inv_durations
+        double[:, ::1] __keyframes
+        double[:, ::1] __control_points
+        double[::1] __omega
+        double[::1] __sin_omega
+        double[::1] __control_omega
+        double[::1] __control_sin_omega
+
+    cdef object __evaluate(self, t, out, bint squad)
+
+
+cdef Py_ssize_t find_segment(const double* times, Py_ssize_t n, double t) nogil
@@ -0,0 +1,199 @@
+"""
+Interpolation of rotations given as unit quaternions.
+SLERP after Ken Shoemake, Animating rotation with quaternion curves, SIGGRAPH 1985.
+SQUAD after Ken Shoemake, Quaternion calculus and fast animation, SIGGRAPH course notes 1987.
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound, cdivision
+
+from libc.math cimport sin
+from ._kernels cimport q_dot, q_slerp, q_angle_between
+from .quaternion_arrays cimport _rows, _output
+from . import quaternion_arrays as qa
+from .RotationSet cimport RotationSet
+
+
+@boundscheck(False)
+@wraparound(False)
+def slerp(q1, q2, t, out=None, bint shortest_path=True):
+    """
+    Element-wise spherical linear interpolation between two arrays of unit quaternions
+    :param q1: array-like of shape (..., 4), values at t=0
+    :param q2: array-like of shape (..., 4), values at t=1
+    :param t: interpolation parameter, number or array-like broadcastable with leading dimensions of q1 and q2
+    :param out: optional output array
+    :param shortest_path: if True q2 is negated where it is more than 90 degrees away from q1 on S3
+    :return: array of quaternions of broadcast shape (..., 4)
+    """
+    cdef:
+        Py_ssize_t i, n, s_1, s_2, s_t
+        const double[:, ::1] q1_v, q2_v, t_v
+        double[:, ::1] out_v
+        double q2_i[4]
+        double omega
+    q1 = qa.as_quaternions_array(q1)
+    q2 = qa.as_quaternions_array(q2)
+    t = np.asarray(t, dtype=np.double)
+    shape = np.broadcast_shapes(q1.shape[:q1.ndim - 1], q2.shape[:q2.ndim - 1], t.shape)
+    result = _output(out, shape + (4,))
+    q1_v, s_1 = _rows(q1, shape, 4)
+    q2_v, s_2 = _rows(q2, shape, 4)
+    t_v, s_t = _rows(t[..., np.newaxis], shape, 1)
+    out_v = result.reshape(-1, 4)
+    n = out_v.shape[0]
+    with nogil:
+        for i in range(n):
+            q2_i[0] = q2_v[i * s_2, 0]
+            q2_i[1] = q2_v[i * s_2, 1]
+            q2_i[2] = q2_v[i * s_2, 2]
+            q2_i[3] = q2_v[i * s_2, 3]
+            if shortest_path and q_dot(&q1_v[i * s_1, 0], q2_i) < 0:
+                q2_i[0] = -q2_i[0]
+                q2_i[1] = -q2_i[1]
+                q2_i[2] = -q2_i[2]
+                q2_i[3] = -q2_i[3]
+            omega = q_angle_between(&q1_v[i * s_1, 0], q2_i)
+            q_slerp(&q1_v[i * s_1, 0], q2_i, omega, sin(omega), t_v[i * s_t, 0], &out_v[i, 0])
+    return result
+
+
+cdef Py_ssize_t find_segment(const double* times, Py_ssize_t n, double t) nogil:
+    """
+    Binary search of the segment [times[k], times[k + 1]] containing t.
+    Times outside of the range are attributed to the first and the last segments.
+    """
+    cdef:
+        Py_ssize_t lo = 0, hi = n - 1, mid
+    if t <= times[0]:
+        return 0
+    if t >= times[n - 1]:
+        return n - 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if times[mid] <= t:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+cdef class KeyframeSequence(object):
+    """
+    Sequence of rotation keyframes (unit quaternions) at increasing times.
+    Per-segment angles, their sines and SQUAD control points are computed once on construction,
+    so that many query times are evaluated in one vectorized call.
+    """
+
+    def __init__(self, times, keyframes, bint shortest_path=True):
+        """
+        :param times: strictly increasing array-like of K keyframe times
+        :param keyframes: array-like of shape (K, 4) of unit quaternions or RotationSet of K rotations
+        :param shortest_path: if True signs of keyframes are flipped so that every segment is interpolated
+            along the shortest arc
+        """
+        if isinstance(keyframes, RotationSet):
+            keyframes = keyframes.quadruples
+        times = np.array(times, dtype=np.double).ravel()
+        keyframes = qa.versor(np.array(keyframes, dtype=np.double, ndmin=2))
+        if keyframes.ndim != 2:
+            raise ValueError('Expected array of quaternions of shape (K, 4), got %s' % str(keyframes.shape))
+        if times.shape[0] != keyframes.shape[0]:
+            raise ValueError('Number of times and keyframes does not match')
+        if times.shape[0] < 2:
+            raise ValueError('At least two keyframes are needed')
+        durations = np.diff(times)
+        if not (durations > 0).all():
+            raise ValueError('Keyframe times must be strictly increasing')
+        if shortest_path:
+            dots = np.sum(keyframes[:-1] * keyframes[1:], axis=1)
+            signs = np.cumprod(np.where(dots < 0, -1.0, 1.0))
+            keyframes[1:] *= signs[:, np.newaxis]
+        control_points = keyframes.copy()
+        if keyframes.shape[0] > 2:
+            q_inv = qa.conjugate(keyframes[1:-1])
+            tangent = qa.log(qa.mul(q_inv, keyframes[2:])) + qa.log(qa.mul(q_inv, keyframes[:-2]))
+            qa.mul(keyframes[1:-1], qa.exp(-tangent / 4), out=control_points[1:-1])
+        omega = np.arccos(np.clip(np.sum(keyframes[:-1] * keyframes[1:], axis=1), -1.0, 1.0))
+        control_omega = np.arccos(np.clip(np.sum(control_points[:-1] * control_points[1:], axis=1), -1.0, 1.0))
+        self.__times = times
+        self.__inv_durations = 1.0 / durations
+        self.__keyframes = keyframes
+        self.__control_points = control_points
+        self.__omega = omega
+        self.__sin_omega = np.sin(omega)
+        self.__control_omega = control_omega
+        self.__control_sin_omega = np.sin(control_omega)
+
+    def __len__(self):
+        return self.__times.shape[0]
+
+    @property
+    def times(self):
+        return np.asarray(self.__times)
+
+    @property
+    def keyframes(self):
+        return np.asarray(self.__keyframes)
+
+    @property
+    def control_points(self):
+        return np.asarray(self.__control_points)
+
+    @boundscheck(False)
+    @wraparound(False)
+    @cdivision(True)
+    cdef object __evaluate(self, t, out, bint squad):
+        cdef:
+            Py_ssize_t i, k, n, n_keys = self.__times.shape[0]
+            const double[::1] t_v
+            double[:, ::1] out_v
+            double u, h, omega
+            double p[4]
+            double s[4]
+        t = np.asarray(t, dtype=np.double)
+        result = _output(out, t.shape + (4,))
+        t_v = np.ascontiguousarray(t).reshape(-1)
+        out_v = result.reshape(-1, 4)
+        n = t_v.shape[0]
+        with nogil:
+            for i in range(n):
+                k = find_segment(&self.__times[0], n_keys, t_v[i])
+                u = (t_v[i] - self.__times[k]) * self.__inv_durations[k]
+                if u < 0.0:
+                    u = 0.0
+                elif u > 1.0:
+                    u = 1.0
+                if not squad:
+                    q_slerp(&self.__keyframes[k, 0], &self.__keyframes[k + 1, 0],
+                            self.__omega[k], self.__sin_omega[k], u, &out_v[i, 0])
+                    continue
+                q_slerp(&self.__keyframes[k, 0], &self.__keyframes[k + 1, 0],
+                        self.__omega[k], self.__sin_omega[k], u, p)
+                q_slerp(&self.__control_points[k, 0], &self.__control_points[k + 1, 0],
+                        self.__control_omega[k], self.__control_sin_omega[k], u, s)
+                h = 2 * u * (1 - u)
+                omega = q_angle_between(p, s)
+                q_slerp(p, s, omega, sin(omega), h, &out_v[i, 0])
+        return result
+
+    def slerp(self, t, out=None):
+        """
+        Piecewise SLERP interpolation of the keyframes.
+        Times outside of the keyframes range are clamped to the first and the last keyframes.
+        :param t: number or array-like of query times of any shape
+        :param out: optional output array of shape t.shape + (4,)
+        :return: array of unit quaternions of shape t.shape + (4,)
+        """
+        return self.__evaluate(t, out, False)
+
+    def squad(self, t, out=None):
+        """
+        Piecewise SQUAD interpolation of the keyframes, smooth at the keyframes.
+        Times outside of the keyframes range are clamped to the first and the last keyframes.
+        :param t: number or array-like of query times of any shape
+        :param out: optional output array of shape t.shape + (4,)
+        :return: array of unit quaternions of shape t.shape + (4,)
+        """
+        return self.__evaluate(t, out, True)
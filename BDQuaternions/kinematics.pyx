@@ -0,0 +1,181 @@
+"""
+Integration of angular velocity samples (e.g. gyroscope readings) into orientation trajectories.
+Between two samples the orientation is advanced by the exponential map of the rotation vector of the step:
+'euler' holds the angular velocity of the first sample (first order),
+'midpoint' uses the mean of the two samples (second order),
+'magnus4' is the fourth order Magnus integrator with two Gauss-Legendre points,
+where the angular velocity is interpolated by cubic polynomial through four neighbouring samples
+(S. Blanes et al., The Magnus expansion and some of its applications, Phys. Rep. 470 (2009) 151-238).
+Body frame angular velocity (as measured by a gyroscope) gives dq/dt = q * (0, omega) / 2,
+space frame angular velocity gives dq/dt = (0, omega) * q / 2.
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound, cdivision
+from cython.parallel cimport prange
+
+from libc.math cimport sqrt
+from ._kernels cimport q_mul, q_exp, q_versor
+from .quaternion_arrays cimport _rows, _output
+from . import quaternion_arrays as qa
+from .parallel cimport acquire_threads, release_threads
+from .instrumentation cimport timer_start, timer_stop
+
+
+cdef dict _methods = {'euler': 0, 'midpoint': 1, 'magnus4': 2}
+cdef double _gauss_offset = sqrt(3.0) / 6
+
+
+cdef inline double _time(const double* t, double dt, Py_ssize_t j) nogil:
+    if t == NULL:
+        return j * dt
+    return t[j]
+
+
+@cdivision(True)
+cdef inline void _interpolate(const double* t, double dt, const double* omega, Py_ssize_t n, Py_ssize_t k,
+                              double tau, double* out) nogil:
+    """
+    Angular velocity at time tau inside of interval k interpolated by Lagrange polynomial
+    through four samples around the interval (through all samples if there are fewer than four)
+    """
+    cdef:
+        Py_ssize_t i, j, m = 4 if n > 4 else n
+        Py_ssize_t first = k - 1
+        double weight
+    if first > n - m:
+        first = n - m
+    if first < 0:
+        first = 0
+    out[0] = 0.0
+    out[1] = 0.0
+    out[2] = 0.0
+    for i in range(first, first + m):
+        weight = 1.0
+        for j in range(first, first + m):
+            if j != i:
+                weight *= (tau - _time(t, dt, j)) / (_time(t, dt, i) - _time(t, dt, j))
+        out[0] += weight * omega[3 * i]
+        out[1] += weight * omega[3 * i + 1]
+        out[2] += weight * omega[3 * i + 2]
+
+
+cdef inline void _increment(const double* t, double dt, const double* omega, Py_ssize_t n, Py_ssize_t k,
+                            int method, bint body_frame, double* out) nogil:
+    """
+    Rotation quaternion of the interval k, i.e. exponent of the Magnus expansion truncated to given order
+    """
+    cdef:
+        double t_k = _time(t, dt, k)
+        double h = _time(t, dt, k + 1) - t_k
+        double omega_1[3]
+        double omega_2[3]
+        double v[4]
+        double c
+    v[0] = 0.0
+    if method == 0:
+        v[1] = omega[3 * k] * h / 2
+        v[2] = omega[3 * k + 1] * h / 2
+        v[3] = omega[3 * k + 2] * h / 2
+    elif method == 1:
+        v[1] = (omega[3 * k] + omega[3 * k + 3]) * h / 4
+        v[2] = (omega[3 * k + 1] + omega[3 * k + 4]) * h / 4
+        v[3] = (omega[3 * k + 2] + omega[3 * k + 5]) * h / 4
+    else:
+        _interpolate(t, dt, omega, n, k, t_k + (0.5 - _gauss_offset) * h, omega_1)
+        _interpolate(t, dt, omega, n, k, t_k + (0.5 + _gauss_offset) * h, omega_2)
+        c = _gauss_offset * h * h / 4
+        if not body_frame:
+            c = -c
+        v[1] = (omega_1[0] + omega_2[0]) * h / 4 + c * (omega_1[1] * omega_2[2] - omega_1[2] * omega_2[1])
+        v[2] = (omega_1[1] + omega_2[1]) * h / 4 + c * (omega_1[2] * omega_2[0] - omega_1[0] * omega_2[2])
+        v[3] = (omega_1[2] + omega_2[2]) * h / 4 + c * (omega_1[0] * omega_2[1] - omega_1[1] * omega_2[0])
+    q_exp(v, out)
+
+
+cdef inline void _accumulate(const double* q0, double* q, Py_ssize_t n, bint body_frame) nogil:
+    """
+    Replace rotations of the intervals stored in q[1:] by the orientations, q[0] is set to normalized q0
+    """
+    cdef:
+        Py_ssize_t k
+    q_versor(q0, q)
+    for k in range(1, n):
+        if body_frame:
+            q_mul(&q[4 * (k - 1)], &q[4 * k], &q[4 * k])
+        else:
+            q_mul(&q[4 * k], &q[4 * (k - 1)], &q[4 * k])
+        q_versor(&q[4 * k], &q[4 * k])
+
+
+@boundscheck(False)
+@wraparound(False)
+@cdivision(True)
+def integrate_angular_velocity(omega, dt=None, t=None, q0=None, str method='magnus4', bint body_frame=True,
+                               out=None, n_threads=None):
+    """
+    Integrate angular velocity samples into orientations
+    :param omega: array-like of angular velocities of shape (..., N, 3) in radians per unit of time,
+        leading dimensions enumerate independent sequences (e.g. devices)
+    :param dt: fixed time step between the samples, alternatively timestamps t are given
+    :param t: strictly increasing timestamps of the samples, array-like of shape (N,) or broadcastable to (..., N)
+    :param q0: orientation at the first sample, array-like of shape (4,) or broadcastable to (..., 4),
+        identity by default
+    :param method: 'euler', 'midpoint' or 'magnus4'
+    :param body_frame: True if omega is given in the body frame (gyroscope), False for the space frame
+    :param out: optional output array of shape (..., N, 4)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of unit quaternions of shape (..., N, 4), orientations at the sample times
+    """
+    cdef:
+        Py_ssize_t i, j, k, m, n, s_t, s_0
+        int threads, method_id
+        bint timestamps = t is not None
+        double started, step = 0.0
+        const double[:, :, ::1] omega_v
+        const double[:, ::1] t_v, q0_v
+        double[:, :, ::1] out_v
+    if method not in _methods:
+        raise ValueError('Method must be one of euler, midpoint or magnus4, got %s' % method)
+    method_id = _methods[method]
+    omega = np.asarray(omega, dtype=np.double)
+    if omega.ndim < 2 or omega.shape[omega.ndim - 1] != 3:
+        raise ValueError('Expected array of angular velocities of shape (..., N, 3), got %s' % str(omega.shape))
+    shape = omega.shape[:omega.ndim - 2]
+    n = omega.shape[omega.ndim - 2]
+    m = int(np.prod(shape))
+    if timestamps == (dt is not None):
+        raise ValueError('Either time step dt or timestamps t must be given')
+    if timestamps:
+        t = np.asarray(t, dtype=np.double)
+        if t.ndim == 0 or t.shape[t.ndim - 1] != n:
+            raise ValueError('Expected timestamps of shape (..., %d), got %s' % (n, str(t.shape)))
+        if np.any(np.diff(t, axis=-1) <= 0):
+            raise ValueError('Timestamps must be strictly increasing')
+        t_v, s_t = _rows(t, shape, n)
+    else:
+        step = dt
+        if step <= 0:
+            raise ValueError('Time step must be positive')
+        s_t = 0
+    q0 = qa.as_quaternions_array(np.array([1, 0, 0, 0], dtype=np.double) if q0 is None else q0)
+    q0_v, s_0 = _rows(q0, shape, 4)
+    result = _output(out, omega.shape[:omega.ndim - 1] + (4,))
+    if n == 0 or m == 0:
+        return result
+    omega_v = np.ascontiguousarray(omega).reshape(m, n, 3)
+    out_v = result.reshape(m, n, 4)
+    started = timer_start()
+    threads = acquire_threads(n_threads, m * n)
+    with nogil:
+        for j in prange(m * (n - 1), schedule='static', num_threads=threads):
+            i = j / (n - 1)
+            k = j % (n - 1)
+            _increment(&t_v[i * s_t, 0] if timestamps else NULL, step, &omega_v[i, 0, 0], n, k,
+                       method_id, body_frame, &out_v[i, k + 1, 0])
+        for i in prange(m, schedule='static', num_threads=threads):
+            _accumulate(&q0_v[i * s_0, 0], &out_v[i, 0, 0], n, body_frame)
+    release_threads(threads)
+    timer_stop('kinematics.integrate_angular_velocity', started)
+    return result
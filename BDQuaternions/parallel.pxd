@@ -0,0 +1,2 @@
+cdef int acquire_threads(n_threads, Py_ssize_t n) except -1
+cdef void release_threads(int n_threads)
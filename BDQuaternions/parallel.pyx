@@ -0,0 +1,75 @@
+"""
+Thread budget of the batch routines.
+Batch routines accept n_threads argument and split their loops with OpenMP prange using static schedule,
+so the work of every thread is fixed by the array size and the number of threads.
+n_threads=None uses the module default (1 unless changed with set_num_threads()),
+zero or negative value requests all available cores.
+Threads taken by running parallel loops are subtracted from the budget of concurrent calls,
+so calls made from user thread pools do not oversubscribe the machine.
+Without OpenMP support in the compiler all loops run serially.
+"""
+
+import os
+
+
+cdef int _max_threads = os.cpu_count() or 1
+cdef int _default_threads = 1
+cdef int _busy_threads = 0
+cdef Py_ssize_t _min_chunk = 4096
+
+
+def get_num_threads():
+    """
+    :return: default number of threads of the batch routines
+    """
+    return _default_threads
+
+
+def set_num_threads(int n_threads):
+    """
+    Set default number of threads of the batch routines
+    :param n_threads: number of threads, zero or negative value means all available cores
+    :return: previous default number of threads
+    """
+    global _default_threads
+    previous = _default_threads
+    _default_threads = _max_threads if n_threads <= 0 else min(n_threads, _max_threads)
+    return previous
+
+
+def get_busy_threads():
+    """
+    :return: number of threads currently taken by running parallel loops
+    """
+    return _busy_threads
+
+
+cdef int acquire_threads(n_threads, Py_ssize_t n) except -1:
+    """
+    Take threads from the budget for a loop of n iterations, must be called with GIL held
+    :param n_threads: requested number of threads, None for the default
+    :param n: number of iterations
+    :return: number of threads to use, at least one
+    """
+    global _busy_threads
+    cdef:
+        int requested, granted
+    if n_threads is None:
+        requested = _default_threads
+    else:
+        requested = n_threads
+        if requested <= 0:
+            requested = _max_threads
+    granted = min(requested, _max_threads - _busy_threads, (n + _min_chunk - 1) // _min_chunk)
+    if granted < 1:
+        granted = 1
+    _busy_threads += granted
+    return granted
+
+
+cdef void release_threads(int n_threads):
+    """
+    Return threads taken by acquire_threads() to the budget, must be called with GIL held
+    """
+    global _busy_threads
+    _busy_threads -= n_threads
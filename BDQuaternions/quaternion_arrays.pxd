@@ -0,0 +1,5 @@
+from ._kernels cimport unary_kernel
+
+cdef tuple _rows(q, tuple shape, int width)
+cdef object _output(out, tuple shape)
+cdef object _unary(q, out, unary_kernel kernel, n_threads=*, str name=*)
@@ -0,0 +1,841 @@
+"""
+Vectorized operations on quaternions stored as plain numpy arrays of shape (..., 4).
+Leading dimensions broadcast following the numpy rules, the last axis holds [w, x, y, z] components.
+Every routine accepts optional out= argument, which must be a C-contiguous float64 array of the result shape.
+out may be one of the inputs for in-place operation.
+Loops run without GIL, n_threads= argument splits them between OpenMP threads (see parallel module).
+"""
+
+import warnings
+import numpy as np
+
+from cython import boundscheck, wraparound
+from cython.parallel cimport prange
+
+from .Quaternion cimport Quaternion
+from ._kernels cimport unary_kernel, q_norm, q_mul, q_conjugate, q_versor, q_reciprocal, q_exp, q_log, q_power
+from ._kernels cimport q_sin, q_cos
+from ._kernels cimport q_to_rotation_matrix, q_from_rotation_matrix, matrix3_det, matrix3_is_orthogonal
+from ._quaternion_operations cimport nearest_rotation_quaternion, bind_lapack
+from .parallel cimport acquire_threads, release_threads
+from .instrumentation cimport enabled, count, timer_start, timer_stop
+from libc.math cimport fabs, floor
+
+
+def as_quaternions_array(q):
+    """
+    Convert array-like to float64 numpy array of quaternions
+    :param q: array-like of shape (..., 4)
+    :return: numpy array of shape (..., 4)
+    """
+    q = np.asarray(q, dtype=np.double)
+    if q.ndim == 0 or q.shape[q.ndim - 1] != 4:
+        raise ValueError('Expected array of quaternions of shape (..., 4), got %s' % str(q.shape))
+    return q
+
+
+cdef tuple _rows(q, tuple shape, int width):
+    """
+    Flatten operand to 2D array of rows matching broadcast shape
+    :return: tuple of C-contiguous 2D array and row step (0 for single broadcast row)
+    """
+    batch = q.shape[:q.ndim - 1]
+    if batch == shape:
+        return np.ascontiguousarray(q).reshape(-1, width), 1
+    if q.size == width:
+        return np.ascontiguousarray(q).reshape(1, width), 0
+    return np.ascontiguousarray(np.broadcast_to(q, shape + (width,))).reshape(-1, width), 1
+
+
+cdef object _output(out, tuple shape):
+    if out is None:
+        if enabled():
+            count('array_allocated')
+        return np.empty(shape, dtype=np.double)
+    if not isinstance(out, np.ndarray) or out.dtype != np.double:
+        raise TypeError('out must be a float64 numpy array')
+    if out.shape != shape:
+        raise ValueError('out has shape %s, expected %s' % (str(out.shape), str(shape)))
+    if not out.flags.c_contiguous or not out.flags.writeable:
+        raise ValueError('out must be a writeable C-contiguous array')
+    return out
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef object _unary(q, out, unary_kernel kernel, n_threads=None, str name='quaternion_arrays.unary'):
+    """
+    Apply kernel to every quaternion of array, name is the name of instrumentation timer
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        double started
+        const double[:, ::1] q_v
+        double[:, ::1] out_v
+    q = as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    result = _output(out, shape + (4,))
+    q_v = np.ascontiguousarray(q).reshape(-1, 4)
+    out_v = result.reshape(-1, 4)
+    n = q_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            kernel(&q_v[i, 0], &out_v[i, 0])
+    release_threads(threads)
+    timer_stop(name, started)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def mul(q1, q2, out=None, n_threads=None):
+    """
+    Element-wise Hamilton product of two arrays of quaternions
+    :param q1: array-like of shape (..., 4)
+    :param q2: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of products of broadcast shape (..., 4)
+    """
+    cdef:
+        Py_ssize_t i, n, s1, s2
+        int threads
+        double started
+        const double[:, ::1] q1_v, q2_v
+        double[:, ::1] out_v
+    q1 = as_quaternions_array(q1)
+    q2 = as_quaternions_array(q2)
+    shape = np.broadcast_shapes(q1.shape[:q1.ndim - 1], q2.shape[:q2.ndim - 1])
+    result = _output(out, shape + (4,))
+    q1_v, s1 = _rows(q1, shape, 4)
+    q2_v, s2 = _rows(q2, shape, 4)
+    out_v = result.reshape(-1, 4)
+    n = out_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            q_mul(&q1_v[i * s1, 0], &q2_v[i * s2, 0], &out_v[i, 0])
+    release_threads(threads)
+    timer_stop('quaternion_arrays.mul', started)
+    return result
+
+
+def conjugate(q, out=None, n_threads=None):
+    """
+    Element-wise conjugate of array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of conjugate quaternions of shape (..., 4)
+    """
+    return _unary(q, out, q_conjugate, n_threads, 'quaternion_arrays.conjugate')
+
+
+def versor(q, out=None, n_threads=None):
+    """
+    Element-wise versor (unit quaternion) of array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of versors of shape (..., 4)
+    """
+    return _unary(q, out, q_versor, n_threads, 'quaternion_arrays.versor')
+
+
+def reciprocal(q, out=None, n_threads=None):
+    """
+    Element-wise reciprocal of array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of reciprocal quaternions of shape (..., 4)
+    """
+    return _unary(q, out, q_reciprocal, n_threads, 'quaternion_arrays.reciprocal')
+
+
+def exp(q, out=None, n_threads=None):
+    """
+    Element-wise exp() function on array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4)
+    """
+    return _unary(q, out, q_exp, n_threads, 'quaternion_arrays.exp')
+
+
+def log(q, out=None, n_threads=None):
+    """
+    Element-wise log() function on array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4)
+    """
+    return _unary(q, out, q_log, n_threads, 'quaternion_arrays.log')
+
+
+def sin(q, out=None, n_threads=None):
+    """
+    Element-wise sin() function on array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4)
+    """
+    return _unary(q, out, q_sin, n_threads, 'quaternion_arrays.sin')
+
+
+def cos(q, out=None, n_threads=None):
+    """
+    Element-wise cos() function on array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4)
+    """
+    return _unary(q, out, q_cos, n_threads, 'quaternion_arrays.cos')
+
+
+@boundscheck(False)
+@wraparound(False)
+def norm(q, out=None, n_threads=None):
+    """
+    Element-wise norm of array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array of shape (...)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of norms of shape (...)
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        const double[:, ::1] q_v
+        double[::1] out_v
+    q = as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    result = _output(out, shape)
+    q_v = np.ascontiguousarray(q).reshape(-1, 4)
+    out_v = result.reshape(-1)
+    n = q_v.shape[0]
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            out_v[i] = q_norm(&q_v[i, 0])
+    release_threads(threads)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def power(q, p, out=None, n_threads=None):
+    """
+    Element-wise real power of array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param p: real power, number or array-like broadcastable with the leading dimensions of q
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of broadcast shape (..., 4)
+    """
+    cdef:
+        Py_ssize_t i, n, s_q, s_p
+        int threads
+        double started
+        const double[:, ::1] q_v, p_v
+        double[:, ::1] out_v
+    q = as_quaternions_array(q)
+    p = np.asarray(p, dtype=np.double)
+    shape = np.broadcast_shapes(q.shape[:q.ndim - 1], p.shape)
+    result = _output(out, shape + (4,))
+    q_v, s_q = _rows(q, shape, 4)
+    p_v, s_p = _rows(p[..., np.newaxis], shape, 1)
+    out_v = result.reshape(-1, 4)
+    n = out_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            q_power(&q_v[i * s_q, 0], p_v[i * s_p, 0], &out_v[i, 0])
+    release_threads(threads)
+    timer_stop('quaternion_arrays.power', started)
+    return result
+
+
+def sqrt(q, out=None, n_threads=None):
+    """
+    Element-wise principal square root of array of quaternions
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4)
+    """
+    return power(q, 0.5, out=out, n_threads=n_threads)
+
+
+@boundscheck(False)
+@wraparound(False)
+def rotation_matrices(q, out=None, n_threads=None):
+    """
+    Convert array of quaternions to array of rotation matrices of corresponding versors
+    :param q: array-like of shape (..., 4)
+    :param out: optional output array of shape (..., 3, 3)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of rotation matrices of shape (..., 3, 3)
+    """
+    cdef:
+        Py_ssize_t i, n
+        int threads
+        double started
+        const double[:, ::1] q_v
+        double[:, ::1] out_v
+    q = as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    result = _output(out, shape + (3, 3))
+    q_v = np.ascontiguousarray(q).reshape(-1, 4)
+    out_v = result.reshape(-1, 9)
+    n = q_v.shape[0]
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            q_to_rotation_matrix(&q_v[i, 0], &out_v[i, 0])
+    release_threads(threads)
+    timer_stop('quaternion_arrays.rotation_matrices', started)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def quaternions_from_rotation_matrices(m, out=None, bint return_mask=False, double tol=1.0e-12, n_threads=None):
+    """
+    Convert array of rotation matrices to array of quaternions.
+    Exact rotation matrices are converted with Shepperd's method. Matrices which are not orthogonal
+    or have determinant different from 1 within tol are flagged and converted in the second pass to the quaternion
+    of the nearest rotation (Bar-Itzhack method), LAPACK is bound only if there are such matrices.
+    :param m: array-like of shape (..., 3, 3)
+    :param out: optional output array of shape (..., 4)
+    :param return_mask: if True return boolean mask of flagged matrices instead of issuing a warning
+    :param tol: tolerance of orthogonality and determinant checks
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of quaternions of shape (..., 4) or tuple of quaternions and mask of shape (...)
+    """
+    cdef:
+        Py_ssize_t i, n, n_invalid, n_flagged
+        int threads
+        double started
+        double det_m
+        const double[:, ::1] m_v
+        double[:, ::1] out_v
+        unsigned char[::1] mask_v
+    m = np.asarray(m, dtype=np.double)
+    if m.ndim < 2 or m.shape[m.ndim - 2:] != (3, 3):
+        raise ValueError('Expected array of rotation matrices of shape (..., 3, 3), got %s' % str(m.shape))
+    shape = m.shape[:m.ndim - 2]
+    result = _output(out, shape + (4,))
+    m_v = np.ascontiguousarray(m).reshape(-1, 9)
+    out_v = result.reshape(-1, 4)
+    n = m_v.shape[0]
+    mask = np.zeros(n, dtype=np.uint8)
+    mask_v = mask
+    started = timer_start()
+    threads = acquire_threads(n_threads, n)
+    with nogil:
+        for i in prange(n, schedule='static', num_threads=threads):
+            det_m = matrix3_det(&m_v[i, 0])
+            if fabs(1 - det_m * det_m) > 1e-6:
+                mask_v[i] = 2
+            elif matrix3_is_orthogonal(&m_v[i, 0], tol) and fabs(det_m - 1.0) < tol:
+                q_from_rotation_matrix(&m_v[i, 0], &out_v[i, 0])
+            else:
+                mask_v[i] = 1
+    release_threads(threads)
+    n_flagged = np.count_nonzero(mask == 1)
+    if n_flagged > 0:
+        bind_lapack()
+        threads = acquire_threads(n_threads, n_flagged)
+        with nogil:
+            for i in prange(n, schedule='static', num_threads=threads):
+                if mask_v[i] == 1 and nearest_rotation_quaternion(&m_v[i, 0], &out_v[i, 0]) != 0:
+                    mask_v[i] = 3
+        release_threads(threads)
+    timer_stop('quaternion_arrays.quaternions_from_rotation_matrices', started)
+    n_invalid = np.count_nonzero(mask == 2)
+    if n_invalid > 0:
+        first_invalid = np.argmax(mask == 2)
+        raise ValueError('%d of %d matrices are not rotation matrices, first at %d with det M = %2.2g'
+                         % (n_invalid, n, first_invalid, np.linalg.det(m.reshape(-1, 3, 3)[first_invalid])))
+    n_failed = np.count_nonzero(mask == 3)
+    if n_failed > 0:
+        raise RuntimeError('Eigen decomposition failed for %d of %d matrices, first at %d'
+                           % (n_failed, n, np.argmax(mask == 3)))
+    n_flagged = np.count_nonzero(mask)
+    if n_flagged > 0 and enabled():
+        count('rotation_matrix_fallback', n_flagged)
+    if return_mask:
+        return result, mask.view(np.bool_).reshape(shape)
+    if n_flagged > 0:
+        warnings.warn('%d of %d matrices are not rotation matrices, nearest rotations are used' % (n_flagged, n))
+    return result
+
+
+cdef Py_ssize_t _block = 4096
+
+
+cdef inline void _scan(const double* q, double* out, Py_ssize_t n, Py_ssize_t renormalize) nogil:
+    """
+    Prefix products of n contiguous quaternions, out may be the same memory as q
+    """
+    cdef:
+        Py_ssize_t i
+    if n == 0:
+        return
+    for i in range(4):
+        out[i] = q[i]
+    for i in range(1, n):
+        q_mul(&out[4 * (i - 1)], &q[4 * i], &out[4 * i])
+        if renormalize > 0 and i % renormalize == 0:
+            q_versor(&out[4 * i], &out[4 * i])
+
+
+cdef inline void _product(const double* q, Py_ssize_t n, Py_ssize_t renormalize, double* out) nogil:
+    """
+    Product of n contiguous quaternions, identity for n = 0
+    """
+    cdef:
+        Py_ssize_t i
+    out[0] = 1.0
+    out[1] = 0.0
+    out[2] = 0.0
+    out[3] = 0.0
+    for i in range(n):
+        q_mul(out, &q[4 * i], out)
+        if renormalize > 0 and (i + 1) % renormalize == 0:
+            q_versor(out, out)
+
+
+cdef inline void _left_mul(const double* c, double* q, Py_ssize_t n) nogil:
+    cdef:
+        Py_ssize_t i
+    for i in range(n):
+        q_mul(c, &q[4 * i], &q[4 * i])
+
+
+cdef void _tree_scan(const double* q, double* out, Py_ssize_t n, Py_ssize_t renormalize,
+                     double* carry, int threads) nogil:
+    """
+    Parallel prefix products: blocks are scanned independently, then every block is multiplied
+    from the left by the product of all preceding blocks
+    :param carry: scratch memory for the block carries, 4 doubles per block
+    """
+    cdef:
+        Py_ssize_t b, start, n_blocks = (n + _block - 1) // _block
+    for b in prange(n_blocks, schedule='static', num_threads=threads):
+        start = b * _block
+        _scan(&q[4 * start], &out[4 * start], min(_block, n - start), renormalize)
+    if n_blocks > 0:
+        carry[0] = 1.0
+        carry[1] = 0.0
+        carry[2] = 0.0
+        carry[3] = 0.0
+    for b in range(1, n_blocks):
+        q_mul(&carry[4 * (b - 1)], &out[4 * (b * _block - 1)], &carry[4 * b])
+        if renormalize > 0:
+            q_versor(&carry[4 * b], &carry[4 * b])
+    for b in prange(1, n_blocks, schedule='static', num_threads=threads):
+        start = b * _block
+        _left_mul(&carry[4 * b], &out[4 * start], min(_block, n - start))
+
+
+cdef void _tree_product(const double* q, Py_ssize_t n, Py_ssize_t renormalize,
+                        double* partial, int threads, double* out) nogil:
+    """
+    Parallel product: blocks are multiplied independently, then the block products are combined pairwise
+    :param partial: scratch memory for the block products, 4 doubles per block
+    """
+    cdef:
+        Py_ssize_t b, start, step, n_blocks = (n + _block - 1) // _block
+    for b in prange(n_blocks, schedule='static', num_threads=threads):
+        start = b * _block
+        _product(&q[4 * start], min(_block, n - start), renormalize, &partial[4 * b])
+    step = 1
+    while step < n_blocks:
+        b = 0
+        while b + step < n_blocks:
+            q_mul(&partial[4 * b], &partial[4 * (b + step)], &partial[4 * b])
+            if renormalize > 0:
+                q_versor(&partial[4 * b], &partial[4 * b])
+            b += 2 * step
+        step *= 2
+    if n_blocks > 0:
+        for b in range(4):
+            out[b] = partial[b]
+    else:
+        _product(q, 0, renormalize, out)
+
+
+cdef tuple _sequences(q, axis, Py_ssize_t renormalize, str method):
+    """
+    Check arguments of the sequence routines and move the sequence axis next to the last one
+    :return: tuple of input array, normalized axis and C-contiguous array of sequences of shape (M, N, 4)
+    """
+    cdef:
+        int n_dim
+    if method not in ('auto', 'sequential', 'tree'):
+        raise ValueError('Method must be one of auto, sequential or tree, got %s' % method)
+    if renormalize < 0:
+        raise ValueError('Renormalization period must be non-negative')
+    q = as_quaternions_array(q)
+    n_dim = q.ndim - 1
+    if n_dim == 0:
+        raise ValueError('Expected array of quaternion sequences of shape (..., N, 4), got %s' % str(q.shape))
+    if not -n_dim <= axis < n_dim:
+        raise ValueError('Axis %d is out of bounds for array of %d quaternion dimension(s)' % (axis, n_dim))
+    axis %= n_dim
+    moved = np.moveaxis(q, axis, n_dim - 1)
+    n_sequences = int(np.prod(moved.shape[:n_dim - 1]))
+    return q, axis, np.ascontiguousarray(moved).reshape(n_sequences, moved.shape[n_dim - 1], 4)
+
+
+@boundscheck(False)
+@wraparound(False)
+def cumprod(q, int axis=-1, out=None, Py_ssize_t renormalize=0, str method='auto', n_threads=None):
+    """
+    Cumulative Hamilton product along a sequence axis: out[k] = q[0] * q[1] * ... * q[k]
+    Independent sequences are split between threads, in tree mode the blocks of every sequence are
+    scanned in parallel and combined with the products of preceding blocks.
+    :param q: array-like of shape (..., 4)
+    :param axis: sequence axis counted over the leading dimensions of q, the last one by default
+    :param out: optional output array of the same shape as q, may be q itself
+    :param renormalize: running product is normalized every renormalize steps to keep rotations unit, 0 to disable
+    :param method: 'sequential', 'tree' or 'auto' (tree when there are fewer sequences than threads)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of prefix products of the same shape as q
+    """
+    cdef:
+        Py_ssize_t i, m, n
+        int threads
+        double started
+        const double[:, :, ::1] q_v
+        double[:, :, ::1] out_v
+        double[:, ::1] carry_v
+    q, axis, sequences = _sequences(q, axis, renormalize, method)
+    result = _output(out, q.shape)
+    if axis == q.ndim - 2:
+        scanned = result.reshape(sequences.shape)
+    else:
+        scanned = np.empty(sequences.shape, dtype=np.double)
+    q_v = sequences
+    out_v = scanned
+    m = q_v.shape[0]
+    n = q_v.shape[1]
+    started = timer_start()
+    carry_v = np.empty(((n + _block - 1) // _block + 1, 4), dtype=np.double)
+    threads = acquire_threads(n_threads, m * n)
+    if method == 'tree' or (method == 'auto' and m < threads):
+        with nogil:
+            for i in range(m):
+                _tree_scan(&q_v[i, 0, 0], &out_v[i, 0, 0], n, renormalize, &carry_v[0, 0], threads)
+    elif n > 0:
+        with nogil:
+            for i in prange(m, schedule='static', num_threads=threads):
+                _scan(&q_v[i, 0, 0], &out_v[i, 0, 0], n, renormalize)
+    release_threads(threads)
+    if axis != q.ndim - 2:
+        result[...] = np.moveaxis(scanned.reshape(np.moveaxis(q, axis, -2).shape), -2, axis)
+    timer_stop('quaternion_arrays.cumprod', started)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+def reduce(q, int axis=-1, out=None, Py_ssize_t renormalize=0, str method='auto', n_threads=None):
+    """
+    Hamilton product of quaternions along a sequence axis: q[0] * q[1] * ... * q[N - 1], identity for N = 0
+    Independent sequences are split between threads, in tree mode the blocks of every sequence are
+    multiplied in parallel and the block products are combined pairwise.
+    :param q: array-like of shape (..., 4)
+    :param axis: sequence axis counted over the leading dimensions of q, the last one by default
+    :param out: optional output array of the shape of q without the sequence axis
+    :param renormalize: running product is normalized every renormalize steps to keep rotations unit, 0 to disable
+    :param method: 'sequential', 'tree' or 'auto' (tree when there are fewer sequences than threads)
+    :param n_threads: number of threads, None for the default (see parallel module)
+    :return: array of products of shape of q without the sequence axis
+    """
+    cdef:
+        Py_ssize_t i, m, n
+        int threads
+        double started
+        const double[:, :, ::1] q_v
+        double[:, ::1] out_v
+        double[:, ::1] partial_v
+    q, axis, sequences = _sequences(q, axis, renormalize, method)
+    result = _output(out, q.shape[:axis] + q.shape[axis + 1:])
+    q_v = sequences
+    out_v = result.reshape(-1, 4)
+    m = q_v.shape[0]
+    n = q_v.shape[1]
+    started = timer_start()
+    partial_v = np.empty(((n + _block - 1) // _block + 1, 4), dtype=np.double)
+    threads = acquire_threads(n_threads, m * n)
+    if method == 'tree' or (method == 'auto' and m < threads):
+        with nogil:
+            for i in range(m):
+                _tree_product(&q_v[i, 0, 0], n, renormalize, &partial_v[0, 0], threads, &out_v[i, 0])
+    else:
+        with nogil:
+            for i in prange(m, schedule='static', num_threads=threads):
+                _product(&q_v[i, 0, 0], n, renormalize, &out_v[i, 0])
+    release_threads(threads)
+    timer_stop('quaternion_arrays.reduce', started)
+    return result
+
+
+cdef struct _CellTable:
+    Py_ssize_t* slots  # representative heading the chain of the cell, -1 for empty slot
+    Py_ssize_t* chain  # next representative in the same cell, -1 at the end of the chain
+    Py_ssize_t mask
+    const double* q
+    double inv_size
+    bint antipodal
+
+
+cdef inline void _canonical(const double* q, bint antipodal, double* out) nogil:
+    """
+    Fold q and -q together by choosing the sign with non-negative scalar part
+    """
+    cdef:
+        int i
+        double sign = -1.0 if antipodal and q[0] < 0 else 1.0
+    for i in range(4):
+        out[i] = sign * q[i]
+
+
+cdef inline void _cell(const double* c, double inv_size, long long* cell) nogil:
+    cdef:
+        int i
+    for i in range(4):
+        cell[i] = <long long> floor(c[i] * inv_size)
+
+
+cdef inline Py_ssize_t _find_cell(const _CellTable* table, const long long* cell) nogil:
+    """
+    Open addressing lookup of the cell
+    :return: slot of the cell or the empty slot where the cell is to be inserted
+    """
+    cdef:
+        Py_ssize_t r, slot
+        unsigned long long h
+        double c[4]
+        long long other[4]
+    h = (<unsigned long long> cell[0] * 73856093ULL) ^ (<unsigned long long> cell[1] * 19349663ULL)
+    h ^= (<unsigned long long> cell[2] * 83492791ULL) ^ (<unsigned long long> cell[3] * 2654435761ULL)
+    h ^= h >> 31
+    h *= 0xbf58476d1ce4e5b9ULL
+    h ^= h >> 29
+    slot = <Py_ssize_t> (h & <unsigned long long> table.mask)
+    while True:
+        r = table.slots[slot]
+        if r < 0:
+            return slot
+        _canonical(&table.q[4 * r], table.antipodal, c)
+        _cell(c, table.inv_size, other)
+        if other[0] == cell[0] and other[1] == cell[1] and other[2] == cell[2] and other[3] == cell[3]:
+            return slot
+        slot = (slot + 1) & table.mask
+
+
+cdef inline void _nearest(const _CellTable* table, const double* x, double* best_d2, Py_ssize_t* best) nogil:
+    """
+    Search representatives closer to x than sqrt(best_d2) updating the nearest one.
+    Cells are 2 * tol wide, so besides the own cell only the neighbours across the closer boundary
+    in every dimension (16 cells in total) may hold points within tol, cells which are farther than
+    the current best distance are skipped.
+    """
+    cdef:
+        int i, neighbour
+        Py_ssize_t r
+        double f, d, d2, bound2
+        double size = 1.0 / table.inv_size
+        double margin2[4]
+        double c[4]
+        long long base[4]
+        long long offset[4]
+        long long cell[4]
+    for i in range(4):
+        f = x[i] * table.inv_size
+        base[i] = <long long> floor(f)
+        f -= base[i]
+        if f < 0.5:
+            offset[i] = -1
+            margin2[i] = f * f * size * size
+        else:
+            offset[i] = 1
+            margin2[i] = (1.0 - f) * (1.0 - f) * size * size
+    for neighbour in range(16):
+        bound2 = 0.0
+        for i in range(4):
+            if neighbour & (1 << i):
+                bound2 += margin2[i]
+                cell[i] = base[i] + offset[i]
+            else:
+                cell[i] = base[i]
+        if bound2 > best_d2[0]:
+            continue
+        r = table.slots[_find_cell(table, cell)]
+        while r >= 0:
+            _canonical(&table.q[4 * r], table.antipodal, c)
+            d2 = 0.0
+            for i in range(4):
+                d = c[i] - x[i]
+                d2 += d * d
+            if d2 < best_d2[0] or (d2 == best_d2[0] and (best[0] < 0 or r < best[0])):
+                best_d2[0] = d2
+                best[0] = r
+            r = table.chain[r]
+
+
+cdef Py_ssize_t _unique(_CellTable* table, Py_ssize_t n, double tol,
+                        Py_ssize_t* inverse, Py_ssize_t* index, Py_ssize_t* counts) nogil:
+    """
+    Greedy single pass clustering: every quaternion is assigned to the nearest representative within tol
+    or becomes a new representative
+    :return: number of representatives
+    """
+    cdef:
+        int j
+        Py_ssize_t i, best, slot, m = 0
+        double best_d2
+        double c[4]
+        long long cell[4]
+    for i in range(n):
+        _canonical(&table.q[4 * i], table.antipodal, c)
+        best = -1
+        best_d2 = tol * tol
+        _nearest(table, c, &best_d2, &best)
+        if table.antipodal and c[0] <= tol:
+            # -q may be close to representatives on the other side of the fold
+            for j in range(4):
+                c[j] = -c[j]
+            _nearest(table, c, &best_d2, &best)
+            for j in range(4):
+                c[j] = -c[j]
+        if best < 0:
+            _cell(c, table.inv_size, cell)
+            slot = _find_cell(table, cell)
+            table.chain[i] = table.slots[slot]
+            table.slots[slot] = i
+            index[m] = i
+            counts[m] = 1
+            inverse[i] = m
+            m += 1
+        else:
+            inverse[i] = inverse[best]
+            counts[inverse[best]] += 1
+    return m
+
+
+@boundscheck(False)
+@wraparound(False)
+def unique(q, double tol=1.0e-8, bint antipodal=True, bint return_index=False, bint return_inverse=False,
+           bint return_counts=False):
+    """
+    Find unique quaternions up to tolerance, analogous to numpy.unique.
+    Quaternions are canonicalized (q and -q are folded together for rotations) and hashed into the cells
+    of a grid of 2 * tol spacing, so every quaternion is compared only to the representatives in the
+    neighbouring cells. Quaternions are processed in order, each one is assigned to the nearest already found
+    representative within tol or becomes a new representative, thus representatives are the first occurrences
+    and are pairwise farther than tol. Working memory including the outputs is 48 to 64 bytes per quaternion.
+    :param q: array-like of shape (..., 4), flattened over the leading dimensions
+    :param tol: positive distance tolerance, Euclidean distance between quadruples,
+        for unit quaternions min(|p - q|, |p + q|) = 2 * sin(angle / 4), where angle is the misorientation angle
+    :param antipodal: if True q and -q are considered equal (the same rotation)
+    :param return_index: if True also return indices of the representatives in the flattened q
+    :param return_inverse: if True also return indices of the representatives of all quaternions
+    :param return_counts: if True also return the number of quaternions assigned to every representative
+    :return: array of representatives of shape (M, 4) in order of the first occurrence, optionally followed by
+        index array of shape (M,), inverse array of shape of q without the last dimension and counts array (M,)
+    """
+    cdef:
+        Py_ssize_t n, m = 0, size = 16
+        double started
+        _CellTable table
+        const double[:, ::1] q_v
+        Py_ssize_t[::1] slots_v, chain_v, inverse_v, index_v, counts_v
+    if not tol > 0:
+        raise ValueError('Tolerance must be positive, got %g' % tol)
+    q = as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    flat_q = np.ascontiguousarray(q).reshape(-1, 4)
+    q_v = flat_q
+    n = q_v.shape[0]
+    while size < 2 * n:
+        size *= 2
+    slots_v = np.full(size, -1, dtype=np.intp)
+    chain_v = np.empty(n + 1, dtype=np.intp)
+    inverse_v = np.empty(n + 1, dtype=np.intp)
+    index_v = np.empty(n + 1, dtype=np.intp)
+    counts_v = np.empty(n + 1, dtype=np.intp)
+    started = timer_start()
+    if n > 0:
+        table.slots = &slots_v[0]
+        table.chain = &chain_v[0]
+        table.mask = size - 1
+        table.q = &q_v[0, 0]
+        table.inv_size = 1.0 / (2.0000001 * tol)
+        table.antipodal = antipodal
+        with nogil:
+            m = _unique(&table, n, tol, &inverse_v[0], &index_v[0], &counts_v[0])
+    timer_stop('quaternion_arrays.unique', started)
+    index = np.asarray(index_v)[:m].copy()
+    result = flat_q[index]
+    if not (return_index or return_inverse or return_counts):
+        return result
+    result = (result,)
+    if return_index:
+        result += (index,)
+    if return_inverse:
+        result += (np.asarray(inverse_v)[:n].reshape(shape),)
+    if return_counts:
+        result += (np.asarray(counts_v)[:m].copy(),)
+    return result
+
+
+def pack_quaternions(quaternions):
+    """
+    Pack Quaternion objects into numpy array of quaternions
+    :param quaternions: Quaternion or array-like of Quaternion objects of any shape
+    :return: float64 array of shape (..., 4)
+    """
+    cdef:
+        Py_ssize_t i
+        Quaternion q
+    objects = np.asarray(quaternions, dtype=object)
+    result = np.empty(objects.shape + (4,), dtype=np.double)
+    flat_objects = objects.ravel()
+    flat_result = result.reshape(-1, 4)
+    for i in range(flat_objects.shape[0]):
+        q = flat_objects[i]
+        flat_result[i] = q.quadruple
+    return result
+
+
+def unpack_quaternions(q, quaternion_class=Quaternion):
+    """
+    Unpack numpy array of quaternions into object array of Quaternion objects
+    :param q: array-like of shape (..., 4)
+    :param quaternion_class: class of the resulting objects, Quaternion by default
+    :return: numpy object array of shape (...)
+    """
+    cdef:
+        Py_ssize_t i
+    q = as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    flat_q = np.ascontiguousarray(q).reshape(-1, 4)
+    result = np.empty(flat_q.shape[0], dtype=object)
+    for i in range(flat_q.shape[0]):
+        result[i] = quaternion_class(flat_q[i])
+    return result.reshape(shape)
@@ -0,0 +1,117 @@
+"""
+Binary storage of large rotation collections which can be opened memory-mapped.
+File layout: 8 bytes magic, 8 bytes little-endian length of the header,
+UTF-8 JSON header with metadata (number of rotations, Euler angles convention label) padded with spaces
+so that the data starts at 64 bytes boundary, then N x 4 little-endian float64 quadruples in C order.
+"""
+
+import json
+import struct
+import numpy as np
+
+from .EulerAnglesConventions cimport Conventions, Convention, _lookup
+from .RotationSet cimport RotationSet, _wrap
+from ._version import __version__
+
+
+cdef bytes _magic = b'BDQROT01'
+cdef Py_ssize_t _alignment = 64
+conventions = Conventions()
+
+
+cdef Convention _convention(euler_angles_convention):
+    cdef:
+        Convention convention
+    if euler_angles_convention is None:
+        return conventions.get_convention('Bunge')
+    if isinstance(euler_angles_convention, Convention):
+        convention = euler_angles_convention
+    else:
+        convention = _lookup(str(euler_angles_convention))
+        if convention is None:
+            raise ValueError('Unknown Euler angles convention %s' % str(euler_angles_convention))
+    if _lookup(convention.label) is not convention:
+        raise ValueError('Only registered Euler angles conventions can be stored, got %s' % convention.label)
+    return convention
+
+
+def save_rotations(path, rotations, euler_angles_convention=None, Py_ssize_t chunk_size=1048576):
+    """
+    Save rotations to a binary file which can be opened memory-mapped by load_rotations()
+    :param path: file name
+    :param rotations: RotationSet or array of unit quaternions of shape (N, 4)
+    :param euler_angles_convention: Convention or its label, defaults to the convention of RotationSet or Bunge
+    :param chunk_size: number of quadruples converted and written at once
+    """
+    cdef:
+        Py_ssize_t start, n
+        Convention convention
+    if isinstance(rotations, RotationSet):
+        if euler_angles_convention is None:
+            euler_angles_convention = rotations.euler_angles_convention
+        quadruples = rotations.quadruples
+    else:
+        quadruples = np.asarray(rotations)
+        if quadruples.ndim != 2 or quadruples.shape[1] != 4:
+            raise ValueError('Expected array of quaternions of shape (N, 4), got %s' % str(quadruples.shape))
+    if chunk_size < 1:
+        raise ValueError('Chunk size must be positive')
+    convention = _convention(euler_angles_convention)
+    n = quadruples.shape[0]
+    header = json.dumps({'format_version': 1,
+                         'count': n,
+                         'dtype': '<f8',
+                         'euler_angles_convention': convention.label,
+                         'package_version': __version__}).encode('utf-8')
+    header += b' ' * (-(len(_magic) + 8 + len(header)) % _alignment)
+    with open(path, 'wb') as f:
+        f.write(_magic)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for start in range(0, n, chunk_size):
+            np.ascontiguousarray(quadruples[start:start + chunk_size], dtype='<f8').tofile(f)
+
+
+cdef tuple _read_header(f):
+    if f.read(len(_magic)) != _magic:
+        raise ValueError('Not a rotations file')
+    header_length, = struct.unpack('<Q', f.read(8))
+    metadata = json.loads(f.read(header_length).decode('utf-8'))
+    if metadata.get('format_version') != 1:
+        raise ValueError('Unsupported rotations file version %s' % str(metadata.get('format_version')))
+    return metadata, len(_magic) + 8 + header_length
+
+
+def rotations_file_info(path):
+    """
+    Read metadata of rotations file without reading the data
+    :param path: file name
+    :return: dict with the number of rotations, Euler angles convention label and file format details
+    """
+    with open(path, 'rb') as f:
+        metadata, _ = _read_header(f)
+    return metadata
+
+
+def load_rotations(path, mmap_mode='r'):
+    """
+    Open rotations file saved by save_rotations()
+    :param path: file name
+    :param mmap_mode: numpy.memmap mode ('r', 'r+' or 'c'), if None the data is read into memory
+    :return: RotationSet sharing memory with the file when memory-mapped
+    """
+    cdef:
+        Py_ssize_t n = 0
+        Convention convention
+    with open(path, 'rb') as f:
+        metadata, offset = _read_header(f)
+        n = metadata['count']
+        convention = _convention(metadata['euler_angles_convention'])
+        if mmap_mode is None or n == 0:
+            f.seek(offset)
+            quadruples = np.fromfile(f, dtype='<f8', count=4 * n)
+            if quadruples.shape[0] != 4 * n:
+                raise ValueError('Rotations file is truncated')
+            return _wrap(quadruples.astype(np.double, copy=False).reshape(n, 4), convention)
+    quadruples = np.memmap(path, dtype='<f8', mode=mmap_mode, offset=offset, shape=(n, 4))
+    return _wrap(quadruples, convention)
@@ -0,0 +1,12 @@
+cdef class PointGroup(object):
+    cdef:
+        str __label
+        str __schoenflies
+        str __description
+        double[:, ::1] __operators
+        double __early_exit_w
+
+
+cpdef PointGroup get_point_group(symmetry)
+cdef Py_ssize_t best_symmetric_equivalent(const double* q, const double* operators, Py_ssize_t n_operators,
+                                          double early_exit_w, double* best_w) nogil
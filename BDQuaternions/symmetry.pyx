@@ -0,0 +1,320 @@
+"""
+Proper crystallographic point groups (Laue classes without inversion) as arrays of unit quaternions
+and batched misorientation, disorientation and fundamental zone reduction kernels.
+Crystal symmetry acts on orientation q from the right (q * s), sample symmetry from the left (p * q).
+Misorientation between orientations q1 and q2 is dq = q1^-1 * q2.
+Crystal axes are taken along x, y, z; the main axis of uniaxial groups is z,
+the monoclinic two-fold axis is y (b unique), the first two-fold axis of dihedral groups is x.
+"""
+
+import numpy as np
+
+from cython import boundscheck, wraparound
+
+from libc.math cimport fabs, acos, cos
+from ._kernels cimport q_mul, q_conjugate
+from .quaternion_arrays cimport _rows, _output
+from .instrumentation cimport timer_start, timer_stop
+from . import quaternion_arrays as qa
+
+
+def _cyclic(int n, axis=(0.0, 0.0, 1.0)):
+    cdef:
+        int k
+    axis = np.asarray(axis, dtype=np.double)
+    result = np.zeros((n, 4), dtype=np.double)
+    for k in range(n):
+        result[k, 0] = np.cos(np.pi * k / n)
+        result[k, 1:] = np.sin(np.pi * k / n) * axis
+    return result
+
+
+def _dihedral(int n):
+    cdef:
+        int k
+    result = np.zeros((n, 4), dtype=np.double)
+    for k in range(n):
+        result[k, 1] = np.cos(np.pi * k / n)
+        result[k, 2] = np.sin(np.pi * k / n)
+    return np.concatenate((_cyclic(n), result))
+
+
+def _tetrahedral():
+    three_fold = np.array([[0.5, x, y, z] for x in (0.5, -0.5) for y in (0.5, -0.5) for z in (0.5, -0.5)])
+    return np.concatenate((_dihedral(2), three_fold))
+
+
+def _octahedral():
+    s = np.sqrt(0.5)
+    four_fold = np.array([[s, s, 0, 0], [s, -s, 0, 0], [s, 0, s, 0], [s, 0, -s, 0], [s, 0, 0, s], [s, 0, 0, -s]])
+    two_fold = np.array([[0, s, s, 0], [0, s, -s, 0], [0, s, 0, s], [0, s, 0, -s], [0, 0, s, s], [0, 0, s, -s]])
+    return np.concatenate((_tetrahedral(), four_fold, two_fold))
+
+
+cdef class PointGroup(object):
+    """
+    Proper point group given by the array of its G rotation operators as unit quaternions of shape (G, 4).
+    The identity is always the first operator.
+    """
+
+    def __init__(self, str label, operators, str schoenflies='', str description=''):
+        cdef:
+            double min_angle
+        operators = qa.versor(np.array(operators, dtype=np.double, ndmin=2))
+        if operators.ndim != 2 or not np.allclose(operators[0], [1, 0, 0, 0]):
+            raise ValueError('Expected (G, 4) array of operators starting with identity')
+        self.__label = label
+        self.__schoenflies = schoenflies
+        self.__description = description
+        self.__operators = operators
+        if operators.shape[0] > 1:
+            min_angle = 2 * acos(min(np.max(np.abs(operators[1:, 0])), 1.0))
+            self.__early_exit_w = cos(min_angle / 4)
+        else:
+            self.__early_exit_w = 0.0
+
+    def __reduce__(self):
+        if _point_groups.get(self.__label) is self:
+            return get_point_group, (self.__label,)
+        return PointGroup, (self.__label, self.operators, self.__schoenflies, self.__description)
+
+    def __str__(self):
+        return 'Point group %s (%s) of order %d' % (self.__label, self.__schoenflies, len(self))
+
+    def __repr__(self):
+        return str(self)
+
+    def __len__(self):
+        return self.__operators.shape[0]
+
+    @property
+    def label(self):
+        return self.__label
+
+    @property
+    def schoenflies(self):
+        return self.__schoenflies
+
+    @property
+    def description(self):
+        return self.__description
+
+    @property
+    def operators(self):
+        result = np.asarray(self.__operators)
+        result.flags.writeable = False
+        return result
+
+
+cdef dict _point_groups = {}
+cdef dict _point_groups_aliases = {}
+
+
+cdef void _register(PointGroup point_group, list aliases):
+    _point_groups[point_group.label] = point_group
+    _point_groups_aliases[point_group.label.lower()] = point_group.label
+    _point_groups_aliases[point_group.schoenflies.lower()] = point_group.label
+    for alias in aliases:
+        _point_groups_aliases[alias.lower()] = point_group.label
+
+
+_register(PointGroup('1', _cyclic(1), 'C1', 'Triclinic'), ['triclinic'])
+_register(PointGroup('2', _cyclic(2, (0.0, 1.0, 0.0)), 'C2', 'Monoclinic'), ['monoclinic'])
+_register(PointGroup('222', _dihedral(2), 'D2', 'Orthorhombic'), ['orthorhombic', 'mmm'])
+_register(PointGroup('4', _cyclic(4), 'C4', 'Tetragonal low'), ['4/m'])
+_register(PointGroup('422', _dihedral(4), 'D4', 'Tetragonal high'), ['tetragonal', '4/mmm'])
+_register(PointGroup('3', _cyclic(3), 'C3', 'Trigonal low'), ['-3'])
+_register(PointGroup('32', _dihedral(3), 'D3', 'Trigonal high'), ['trigonal', '321', '-3m'])
+_register(PointGroup('6', _cyclic(6), 'C6', 'Hexagonal low'), ['6/m'])
+_register(PointGroup('622', _dihedral(6), 'D6', 'Hexagonal high'), ['hexagonal', '6/mmm'])
+_register(PointGroup('23', _tetrahedral(), 'T', 'Cubic low'), ['m-3'])
+_register(PointGroup('432', _octahedral(), 'O', 'Cubic high'), ['cubic', 'm-3m'])
+
+
+cpdef PointGroup get_point_group(symmetry):
+    """
+    Look up predefined point group
+    :param symmetry: PointGroup or its label, Schoenflies symbol, Laue class or crystal system name
+    :return: PointGroup
+    """
+    if isinstance(symmetry, PointGroup):
+        return symmetry
+    try:
+        return _point_groups[_point_groups_aliases[str(symmetry).lower()]]
+    except KeyError:
+        raise ValueError('Unknown point group %s' % str(symmetry))
+
+
+def point_groups():
+    """
+    :return: list of labels of predefined point groups
+    """
+    return list(_point_groups.keys())
+
+
+cdef Py_ssize_t best_symmetric_equivalent(const double* q, const double* operators, Py_ssize_t n_operators,
+                                          double early_exit_w, double* best_w) nogil:
+    """
+    Find operator s maximizing |w| of q * s (i.e. minimizing the rotation angle of q * s).
+    Only the scalar part of the products is evaluated. The search stops as soon as |w| >= early_exit_w,
+    which for early_exit_w = cos(alpha_min / 4) guarantees the minimum, alpha_min being the smallest
+    rotation angle of the group.
+    :return: index of the best operator, its |w| is stored in best_w
+    """
+    cdef:
+        Py_ssize_t g, best = 0
+        double w, max_w = -1.0
+        const double* s
+    for g in range(n_operators):
+        s = &operators[4 * g]
+        w = fabs(q[0] * s[0] - q[1] * s[1] - q[2] * s[2] - q[3] * s[3])
+        if w > max_w:
+            max_w = w
+            best = g
+            if w >= early_exit_w:
+                break
+    best_w[0] = max_w
+    return best
+
+
+cdef inline double _angle(double w) nogil:
+    if w > 1.0:
+        w = 1.0
+    return 2 * acos(w)
+
+
+cdef inline void _positive_w(double* q) nogil:
+    if q[0] < 0:
+        q[0] = -q[0]
+        q[1] = -q[1]
+        q[2] = -q[2]
+        q[3] = -q[3]
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef object _misorientations(q1, q2, symmetry, out, bint angles):
+    cdef:
+        Py_ssize_t i, n, s_1, s_2, best
+        double started = timer_start()
+        PointGroup point_group = get_point_group(symmetry)
+        const double[:, ::1] q1_v, q2_v
+        const double[:, ::1] ops_v = point_group.__operators
+        double[::1] angles_v
+        double[:, ::1] out_v
+        Py_ssize_t n_operators = ops_v.shape[0]
+        double early_exit_w = point_group.__early_exit_w
+        double d[4]
+        double w
+    q1 = qa.as_quaternions_array(q1)
+    q2 = qa.as_quaternions_array(q2)
+    shape = np.broadcast_shapes(q1.shape[:q1.ndim - 1], q2.shape[:q2.ndim - 1])
+    q1_v, s_1 = _rows(q1, shape, 4)
+    q2_v, s_2 = _rows(q2, shape, 4)
+    if angles:
+        result = _output(out, shape)
+        angles_v = result.reshape(-1)
+        n = angles_v.shape[0]
+    else:
+        result = _output(out, shape + (4,))
+        out_v = result.reshape(-1, 4)
+        n = out_v.shape[0]
+    with nogil:
+        for i in range(n):
+            q_conjugate(&q1_v[i * s_1, 0], d)
+            q_mul(d, &q2_v[i * s_2, 0], d)
+            best = best_symmetric_equivalent(d, &ops_v[0, 0], n_operators, early_exit_w, &w)
+            if angles:
+                angles_v[i] = _angle(w)
+            else:
+                q_mul(d, &ops_v[best, 0], &out_v[i, 0])
+                _positive_w(&out_v[i, 0])
+    timer_stop('symmetry.misorientations', started)
+    return result
+
+
+def misorientation_angles(q1, q2, symmetry, out=None):
+    """
+    Minimal rotation angles between orientations q1 and q2 over all crystal symmetric equivalents
+    :param q1: array-like of unit quaternions of shape (..., 4)
+    :param q2: array-like of unit quaternions of shape (..., 4), broadcastable with q1
+    :param symmetry: crystal PointGroup or its label
+    :param out: optional output array of shape (...)
+    :return: array of angles in radians of shape (...)
+    """
+    return _misorientations(q1, q2, symmetry, out, True)
+
+
+def disorientations(q1, q2, symmetry, out=None):
+    """
+    Misorientations q1^-1 * q2 * s of the minimal rotation angle among crystal symmetric equivalents
+    :param q1: array-like of unit quaternions of shape (..., 4)
+    :param q2: array-like of unit quaternions of shape (..., 4), broadcastable with q1
+    :param symmetry: crystal PointGroup or its label
+    :param out: optional output array of shape (..., 4)
+    :return: array of unit quaternions with non-negative scalar part of shape (..., 4)
+    """
+    return _misorientations(q1, q2, symmetry, out, False)
+
+
+@boundscheck(False)
+@wraparound(False)
+def reduce_to_fundamental_zone(q, crystal_symmetry, sample_symmetry=None, out=None):
+    """
+    Reduce orientations to the fundamental zone, i.e. replace every orientation q
+    by its symmetric equivalent p * q * s of the minimal rotation angle
+    :param q: array-like of unit quaternions of shape (..., 4)
+    :param crystal_symmetry: crystal PointGroup or its label
+    :param sample_symmetry: optional sample PointGroup or its label
+    :param out: optional output array of shape (..., 4), may be q itself
+    :return: array of unit quaternions with non-negative scalar part of shape (..., 4)
+    """
+    cdef:
+        Py_ssize_t i, j, n, best, best_sample, best_crystal
+        PointGroup crystal = get_point_group(crystal_symmetry)
+        PointGroup sample = get_point_group('1' if sample_symmetry is None else sample_symmetry)
+        const double[:, ::1] q_v
+        const double[:, ::1] crystal_v = crystal.__operators
+        const double[:, ::1] sample_v = sample.__operators
+        double[:, ::1] out_v
+        Py_ssize_t n_crystal = crystal_v.shape[0], n_sample = sample_v.shape[0]
+        double early_exit_w = crystal.__early_exit_w if n_sample == 1 else 2.0
+        double d[4]
+        double w, max_w
+    q = qa.as_quaternions_array(q)
+    shape = q.shape[:q.ndim - 1]
+    result = _output(out, shape + (4,))
+    q_v = np.ascontiguousarray(q).reshape(-1, 4)
+    out_v = result.reshape(-1, 4)
+    n = q_v.shape[0]
+    with nogil:
+        for i in range(n):
+            max_w = -1.0
+            best_sample = 0
+            best_crystal = 0
+            for j in range(n_sample):
+                q_mul(&sample_v[j, 0], &q_v[i, 0], d)
+                best = best_symmetric_equivalent(d, &crystal_v[0, 0], n_crystal, early_exit_w, &w)
+                if w > max_w:
+                    max_w = w
+                    best_sample = j
+                    best_crystal = best
+            q_mul(&sample_v[best_sample, 0], &q_v[i, 0], d)
+            q_mul(d, &crystal_v[best_crystal, 0], &out_v[i, 0])
+            _positive_w(&out_v[i, 0])
+    return result
+
+
+def map_misorientation_angles(q_map, symmetry):
+    """
+    Misorientation angles between neighbouring pixels of 2D orientation map
+    :param q_map: array-like of unit quaternions of shape (H, W, 4)
+    :param symmetry: crystal PointGroup or its label
+    :return: tuple of angles to the right neighbours of shape (H, W - 1)
+        and to the bottom neighbours of shape (H - 1, W)
+    """
+    q_map = qa.as_quaternions_array(q_map)
+    if q_map.ndim != 3:
+        raise ValueError('Expected orientation map of shape (H, W, 4), got %s' % str(q_map.shape))
+    return (misorientation_angles(q_map[:, :-1], q_map[:, 1:], symmetry),
+            misorientation_angles(q_map[:-1], q_map[1:], symmetry))
@@ -1,131 +1,158 @@
+"""
+Random quaternions uniformly distributed on S3 (i.e. rotations distributed by Haar measure)
+after Ken Shoemake, Uniform random rotations, Graphics Gems III (Academic Press, 1992), p. 124.
+All generators accept seed which may be None, an integer, numpy SeedSequence or numpy Generator.
+With seed=None the module-level generator is used.
+"""
+
+import numbers
 import numpy as np
 
 from cython import boundscheck, wraparound
 
-from cpython.array cimport array, clone
-from libc.stdlib cimport rand, RAND_MAX
-from ._quaternion_operations cimport norm
+from libc.math cimport sqrt, sin, cos, fabs, M_PI
 from .Quaternion cimport Quaternion
 from .UnitQuaternion cimport UnitQuaternion
 from .Rotation cimport Rotation
+from .quaternion_arrays cimport _output
+from .quaternion_arrays import unpack_quaternions
+
+
+cdef Py_ssize_t _chunk_size = 65536
+_default_generator = np.random.default_rng()
+
+
+cdef object _generator(seed):
+    if seed is None:
+        return _default_generator
+    return np.random.default_rng(seed)
+
+
+def spawn_generators(seed, Py_ssize_t n_streams):
+    """
+    Create independent random generators for parallel streams
+    :param seed: None, an integer or numpy SeedSequence
+    :param n_streams: number of streams
+    :return: list of numpy Generators
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(n_streams)]
+
+
+cdef inline void _shoemake(const double* u, double scale, double* q) nogil:
+    cdef:
+        double r1 = sqrt(1.0 - u[0]) * scale, r2 = sqrt(u[0]) * scale
+        double theta1 = 2 * M_PI * u[1], theta2 = 2 * M_PI * u[2]
+    q[0] = r2 * cos(theta2)
+    q[1] = r1 * sin(theta1)
+    q[2] = r1 * cos(theta1)
+    q[3] = r2 * sin(theta2)
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef object _uniform_quadruples(shape, seed, out, double scale):
+    """
+    Fill array of shape (..., 4) with random quaternions uniformly distributed on the sphere of radius scale.
+    Uniform numbers are drawn in chunks, so that no more than a chunk of extra memory is used.
+    """
+    cdef:
+        Py_ssize_t i, start, m, n
+        double[:, ::1] u_v
+        double[:, ::1] out_v
+    generator = _generator(seed)
+    if shape is None:
+        shape = () if out is None else out.shape[:out.ndim - 1]
+    elif isinstance(shape, numbers.Integral):
+        shape = (shape,)
+    result = _output(out, tuple(shape) + (4,))
+    out_v = result.reshape(-1, 4)
+    n = out_v.shape[0]
+    scratch = np.empty((min(n, _chunk_size), 3), dtype=np.double)
+    start = 0
+    while start < n:
+        m = min(_chunk_size, n - start)
+        u = scratch[:m]
+        generator.random(out=u)
+        u_v = u
+        with nogil:
+            for i in range(m):
+                _shoemake(&u_v[i, 0], scale, &out_v[start + i, 0])
+        start += m
+    return result
+
+
+def random_rotations_quadruples(shape=None, seed=None, out=None):
+    """
+    Calculates array of random rotation quaternions uniformly distributed over the rotation group,
+    which is the same as uniform distribution of unit quaternions on S3
+    :param shape: int or tuple, shape of the array of quaternions, taken from out if None
+    :param seed: None, an integer, numpy SeedSequence or Generator
+    :param out: optional output float64 array of shape shape + (4,)
+    :return: array of shape shape + (4,)
+    """
+    return _uniform_quadruples(shape, seed, out, 1.0)
+
 
+random_unit_quaternions_quadruples = random_rotations_quadruples
 
-cpdef Rotation random_rotation():
+
+def random_quaternions_quadruples(shape=None, double quadruple_norm=1.0, seed=None, out=None):
+    """
+    Calculates array of random quaternions of given norm uniformly distributed in direction
+    :param shape: int or tuple, shape of the array of quaternions, taken from out if None
+    :param quadruple_norm: norm of the quaternions
+    :param seed: None, an integer, numpy SeedSequence or Generator
+    :param out: optional output float64 array of shape shape + (4,)
+    :return: array of shape shape + (4,)
+    """
+    return _uniform_quadruples(shape, seed, out, fabs(quadruple_norm))
+
+
+cpdef Rotation random_rotation(seed=None):
     """
     Calculates random rotation quaternion
     :return: random Rotation
     """
-    cdef:
-        double random_quadruple_norm
-        array[double] quadruple, template = array('d')
-    quadruple = clone(template, 4, zero=False)
-    while True:
-        quadruple[0] = rand()
-        quadruple[1] = rand()
-        quadruple[2] = rand()
-        quadruple[3] = rand()
-        random_quadruple_norm = norm(quadruple)
-        if random_quadruple_norm > 0:
-            break
-    quadruple[0] /= random_quadruple_norm
-    quadruple[1] /= random_quadruple_norm
-    quadruple[2] /= random_quadruple_norm
-    quadruple[3] /= random_quadruple_norm
-    return Rotation(quadruple)
-
-
-cpdef UnitQuaternion random_unit_quaternion():
+    return Rotation(_uniform_quadruples(None, seed, None, 1.0))
+
+
+cpdef UnitQuaternion random_unit_quaternion(seed=None):
     """
     Calculates random unit quaternion
     :return: random UnitQuaternion
     """
-    cdef:
-        double random_quadruple_norm
-        array[double] quadruple, template = array('d')
-    quadruple = clone(template, 4, zero=False)
-    while True:
-        quadruple[0] = (rand() / RAND_MAX - 0.5) * 2
-        quadruple[1] = (rand() / RAND_MAX - 0.5) * 2
-        quadruple[2] = (rand() / RAND_MAX - 0.5) * 2
-        quadruple[3] = (rand() / RAND_MAX - 0.5) * 2
-        random_quadruple_norm = norm(quadruple)
-        if random_quadruple_norm > 0:
-            break
-    quadruple[0] /= random_quadruple_norm
-    quadruple[1] /= random_quadruple_norm
-    quadruple[2] /= random_quadruple_norm
-    quadruple[3] /= random_quadruple_norm
-    return UnitQuaternion(quadruple)
-
-
-cpdef Quaternion random_quaternion(double quadruple_norm=1.0):
+    return UnitQuaternion(_uniform_quadruples(None, seed, None, 1.0))
+
+
+cpdef Quaternion random_quaternion(double quadruple_norm=1.0, seed=None):
     """
     Calculates random quaternion
     :return: random Quaternion
     """
-    cdef:
-        double random_quadruple_norm
-        array[double] quadruple, template = array('d')
-    quadruple = clone(template, 4, zero=False)
-    while True:
-        quadruple[0] = (rand() / RAND_MAX - 0.5) * 2
-        quadruple[1] = (rand() / RAND_MAX - 0.5) * 2
-        quadruple[2] = (rand() / RAND_MAX - 0.5) * 2
-        quadruple[3] = (rand() / RAND_MAX - 0.5) * 2
-        random_quadruple_norm = norm(quadruple)
-        if abs(quadruple_norm) > 0.0:
-            if random_quadruple_norm > 0:
-                break
-        else:
-            break
-    if random_quadruple_norm > 0:
-        quadruple[0] = quadruple[0] / random_quadruple_norm * abs(quadruple_norm)
-        quadruple[1] = quadruple[1] / random_quadruple_norm * abs(quadruple_norm)
-        quadruple[2] = quadruple[2] / random_quadruple_norm * abs(quadruple_norm)
-        quadruple[3] = quadruple[3] / random_quadruple_norm * abs(quadruple_norm)
-    return Quaternion(quadruple)
+    return Quaternion(_uniform_quadruples(None, seed, None, fabs(quadruple_norm)))
 
 
-@boundscheck(False)
-@wraparound(False)
-cpdef random_rotations_array(shape):
+cpdef random_rotations_array(shape, seed=None):
     """
     Calculates random rotation quaternions array
     :return: random Rotation array of given shape
     """
-    rotations = np.empty(shape, dtype=object)
-    size = rotations.size
-    rotations = rotations.ravel()
-    for i in range(size):
-        rotations[i] = random_rotation()
-    return rotations.reshape(shape)
+    return unpack_quaternions(_uniform_quadruples(shape, seed, None, 1.0), Rotation)
 
 
-@boundscheck(False)
-@wraparound(False)
-cpdef random_unit_quaternions_array(shape):
+cpdef random_unit_quaternions_array(shape, seed=None):
     """
     Calculates random unit quaternions array
     :return: random UnitQuaternion array of given shape
     """
-    unit_quaternions = np.empty(shape, dtype=object)
-    size = unit_quaternions.size
-    unit_quaternions = unit_quaternions.ravel()
-    for i in range(size):
-        unit_quaternions[i] = random_unit_quaternion()
-    return unit_quaternions.reshape(shape)
+    return unpack_quaternions(_uniform_quadruples(shape, seed, None, 1.0), UnitQuaternion)
 
 
-@boundscheck(False)
-@wraparound(False)
-cpdef random_quaternions_array(shape, double quadruple_norm=1.0):
+cpdef random_quaternions_array(shape, double quadruple_norm=1.0, seed=None):
     """
     Calculates random quaternions array
     :return: random Quaternion array of given shape
     """
-    quaternions = np.empty(shape, dtype=object)
-    size = quaternions.size
-    quaternions = quaternions.ravel()
-    for i in range(size):
-        quaternions[i] = random_quaternion(quadruple_norm=quadruple_norm)
-    return quaternions.reshape(shape)
+    return unpack_quaternions(_uniform_quadruples(shape, seed, None, fabs(quadruple_norm)), Quaternion)
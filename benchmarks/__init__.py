@@ -0,0 +1,21 @@
+"""
+Benchmarks suite for airspeed velocity (asv), see README.md for usage.
+Benchmarks of features missing in older commits raise NotImplementedError in setup() and are skipped.
+"""
+import numpy as np
+
+
+def random_versors(n, seed=0):
+    q = np.random.default_rng(seed).normal(size=(n, 4))
+    return q / np.linalg.norm(q, axis=1)[:, np.newaxis]
+
+
+def require(module, name):
+    """
+    Get attribute of BDQuaternions module or skip the benchmark if it does not exist in benchmarked commit
+    """
+    try:
+        package = __import__('BDQuaternions.' + module, fromlist=[name])
+        return getattr(package, name)
+    except (ImportError, AttributeError):
+        raise NotImplementedError('%s.%s is not available' % (module, name))
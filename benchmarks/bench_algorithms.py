@@ -0,0 +1,105 @@
+import numpy as np
+
+from . import random_versors, require
+
+
+class Symmetry(object):
+    params = [1000, 100000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.misorientation_angles = require('symmetry', 'misorientation_angles')
+        self.reduce_to_fundamental_zone = require('symmetry', 'reduce_to_fundamental_zone')
+        self.q1 = random_versors(n, 1)
+        self.q2 = random_versors(n, 2)
+
+    def time_misorientation_cubic(self, n):
+        self.misorientation_angles(self.q1, self.q2, 'cubic')
+
+    def time_misorientation_hexagonal(self, n):
+        self.misorientation_angles(self.q1, self.q2, 'hexagonal')
+
+    def time_fundamental_zone(self, n):
+        self.reduce_to_fundamental_zone(self.q1, 'cubic')
+
+
+class NearestNeighbours(object):
+    params = [10000, 100000]
+    param_names = ['n']
+
+    def setup(self, n):
+        orientation_tree = require('OrientationTree', 'OrientationTree')
+        self.q = random_versors(n, 1)
+        self.queries = random_versors(1000, 2)
+        self.orientation_tree = orientation_tree
+        self.tree = orientation_tree(self.q)
+
+    def time_build(self, n):
+        self.orientation_tree(self.q)
+
+    def time_query(self, n):
+        self.tree.query(self.queries, k=5)
+
+    def time_query_radius(self, n):
+        self.tree.query_radius(self.queries, 0.1)
+
+
+class Averaging(object):
+    params = [1000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.mean_rotation = require('averaging', 'mean_rotation')
+        self.grouped_mean_rotations = require('averaging', 'grouped_mean_rotations')
+        self.q = random_versors(n)
+        self.labels = np.random.default_rng(0).integers(0, 100, size=n)
+
+    def time_mean(self, n):
+        self.mean_rotation(self.q)
+
+    def time_grouped_mean(self, n):
+        self.grouped_mean_rotations(self.q, self.labels)
+
+
+class Interpolation(object):
+    params = [1000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.slerp = require('interpolation', 'slerp')
+        keyframe_sequence = require('interpolation', 'KeyframeSequence')
+        self.q1 = random_versors(n, 1)
+        self.q2 = random_versors(n, 2)
+        self.t = np.linspace(0, 1, n)
+        self.sequence = keyframe_sequence(np.arange(100, dtype=np.double), random_versors(100))
+        self.times = np.linspace(0, 99, n)
+
+    def time_slerp(self, n):
+        self.slerp(self.q1, self.q2, self.t)
+
+    def time_squad(self, n):
+        self.sequence.squad(self.times)
+
+
+class RandomRotations(object):
+    params = [1000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.random_rotations_quadruples = require('utils', 'random_rotations_quadruples')
+
+    def time_random_rotations(self, n):
+        self.random_rotations_quadruples(n, seed=0)
+
+
+class AngularVelocityIntegration(object):
+    params = ([1000, 1000000], ['euler', 'midpoint', 'magnus4'])
+    param_names = ['n', 'method']
+
+    def setup(self, n, method):
+        self.integrate_angular_velocity = require('kinematics', 'integrate_angular_velocity')
+        self.omega = np.random.default_rng(0).normal(size=(n, 3))
+        self.out = np.empty((n, 4))
+
+    def time_integrate(self, n, method):
+        self.integrate_angular_velocity(self.omega, dt=1.0e-3, method=method, out=self.out)
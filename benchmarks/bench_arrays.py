@@ -0,0 +1,108 @@
+import numpy as np
+
+from BDQuaternions import Rotation
+from BDQuaternions import quaternion_arrays as qa
+
+from . import random_versors, require
+
+
+class ArrayOperations(object):
+    params = [100, 10000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.q1 = random_versors(n, 1)
+        self.q2 = random_versors(n, 2)
+        self.out = np.empty_like(self.q1)
+
+    def time_mul(self, n):
+        qa.mul(self.q1, self.q2, out=self.out)
+
+    def time_mul_broadcast(self, n):
+        qa.mul(self.q1, self.q2[0], out=self.out)
+
+    def time_conjugate(self, n):
+        qa.conjugate(self.q1, out=self.out)
+
+    def time_exp(self, n):
+        qa.exp(self.q1, out=self.out)
+
+    def time_log(self, n):
+        qa.log(self.q1, out=self.out)
+
+    def time_power(self, n):
+        qa.power(self.q1, 0.3, out=self.out)
+
+    def time_norm(self, n):
+        qa.norm(self.q1)
+
+    def peakmem_mul(self, n):
+        qa.mul(self.q1, self.q2)
+
+
+class MatrixConversions(object):
+    params = [100, 10000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.q = random_versors(n)
+        self.m = qa.rotation_matrices(self.q)
+        self.m_distorted = self.m + np.random.default_rng(0).normal(scale=1.0e-8, size=self.m.shape)
+
+    def time_to_matrices(self, n):
+        qa.rotation_matrices(self.q)
+
+    def time_from_matrices(self, n):
+        qa.quaternions_from_rotation_matrices(self.m)
+
+    def time_from_distorted_matrices(self, n):
+        qa.quaternions_from_rotation_matrices(self.m_distorted, return_mask=True)
+
+
+class RotateVectors(object):
+    params = ([100, 10000, 1000000], ['float32', 'float64'])
+    param_names = ['n', 'dtype']
+
+    def setup(self, n, dtype):
+        self.rotation = Rotation(random_versors(1)[0])
+        self.xyz = np.random.default_rng(0).random((n, 3)).astype(dtype)
+        self.out = np.empty_like(self.xyz)
+
+    def time_rotate(self, n, dtype):
+        self.rotation.rotate(self.xyz, out=self.out)
+
+    def time_rotate_in_place(self, n, dtype):
+        self.rotation.rotate(self.xyz, out=self.xyz)
+
+
+class SequenceProducts(object):
+    params = ([(1, 1000000), (1000, 1000)], ['sequential', 'tree'])
+    param_names = ['shape', 'method']
+
+    def setup(self, shape, method):
+        self.cumprod = require('quaternion_arrays', 'cumprod')
+        self.reduce = require('quaternion_arrays', 'reduce')
+        self.q = random_versors(shape[0] * shape[1]).reshape(shape + (4,))
+        self.out = np.empty_like(self.q)
+
+    def time_cumprod(self, shape, method):
+        self.cumprod(self.q, out=self.out, renormalize=1024, method=method)
+
+    def time_reduce(self, shape, method):
+        self.reduce(self.q, renormalize=1024, method=method)
+
+
+class UniqueRotations(object):
+    params = [10000, 1000000]
+    param_names = ['n']
+
+    def setup(self, n):
+        self.unique = require('quaternion_arrays', 'unique')
+        q = random_versors(n // 2)
+        self.q = np.concatenate([q, -q + 1e-10])
+
+    def time_unique(self, n):
+        self.unique(self.q, tol=1e-6, return_inverse=True, return_counts=True)
+
+    def peakmem_unique(self, n):
+        self.unique(self.q, tol=1e-6, return_inverse=True, return_counts=True)
@@ -0,0 +1,78 @@
+import warnings
+import numpy as np
+
+from BDQuaternions import Conventions, EulerAngles, Rotation
+from BDQuaternions import euler_angles_arrays as ea
+from BDQuaternions._quaternion_operations import quaternion_from_rotation_matrix
+
+from . import random_versors
+
+
+class ConventionLookup(object):
+    params = ['Bunge', 'xyzs', 'ZXZr', 'Kocks']
+    param_names = ['label']
+
+    def setup(self, label):
+        self.conventions = Conventions()
+
+    def time_get_convention(self, label):
+        self.conventions.get_convention(label)
+
+    def time_conventions(self, label):
+        Conventions()
+
+
+class EulerAnglesConversions(object):
+    params = ['Bunge', 'XYZs', 'Kocks']
+    param_names = ['label']
+
+    def setup(self, label):
+        conventions = Conventions()
+        self.convention = conventions.get_convention(label)
+        self.other = conventions.get_convention('Roe' if label != 'Roe' else 'Bunge')
+        self.angles = np.array([0.1, 0.2, 0.3])
+        self.rotation = Rotation(random_versors(1)[0])
+
+    def time_change_convention(self, label):
+        euler_angles = EulerAngles(self.angles, self.convention)
+        euler_angles.change_convention(self.other)
+
+    def time_to_quaternion(self, label):
+        EulerAngles(self.angles, self.convention).to_quaternion()
+
+    def time_from_quaternion(self, label):
+        euler_angles = EulerAngles(self.angles, self.convention)
+        euler_angles.from_quaternion(self.rotation, self.convention)
+
+
+class EulerAnglesArrays(object):
+    params = ([100, 1000000], ['Bunge', 'Kocks'])
+    param_names = ['n', 'label']
+
+    def setup(self, n, label):
+        self.convention = Conventions().get_convention(label)
+        self.q = random_versors(n)
+        self.angles = ea.euler_angles_from_quaternions(self.q, self.convention)
+
+    def time_to_quaternions(self, n, label):
+        ea.euler_angles_to_quaternions(self.angles, self.convention)
+
+    def time_from_quaternions(self, n, label):
+        ea.euler_angles_from_quaternions(self.q, self.convention)
+
+
+class ScalarMatrixConversion(object):
+    params = ['orthogonal', 'distorted']
+    param_names = ['matrix']
+
+    def setup(self, matrix):
+        self.m = np.asarray(Rotation(random_versors(1)[0]).rotation_matrix)
+        if matrix == 'distorted':
+            self.m = self.m + 1.0e-8
+            warnings.simplefilter('ignore', UserWarning)
+
+    def teardown(self, matrix):
+        warnings.resetwarnings()
+
+    def time_quaternion_from_rotation_matrix(self, matrix):
+        quaternion_from_rotation_matrix(self.m)
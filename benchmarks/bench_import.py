@@ -0,0 +1,25 @@
+class ImportTime(object):
+    """
+    Import time measured in a fresh interpreter
+    """
+
+    def timeraw_import_package(self):
+        return 'import BDQuaternions'
+
+    def timeraw_import_rotation(self):
+        return 'from BDQuaternions import Rotation'
+
+    def timeraw_first_convention(self):
+        return """
+        from BDQuaternions import Conventions
+        Conventions().get_convention('Bunge')
+        """
+
+    def timeraw_import_arrays(self):
+        return 'import BDQuaternions.quaternion_arrays'
+
+    def timeraw_first_rotation(self):
+        return """
+        from BDQuaternions import Rotation
+        Rotation()
+        """
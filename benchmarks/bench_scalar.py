@@ -0,0 +1,80 @@
+import numpy as np
+
+from BDQuaternions import Quaternion, UnitQuaternion, Rotation
+
+from . import random_versors
+
+
+class QuaternionOperations(object):
+
+    def setup(self):
+        q = random_versors(2)
+        self.a = np.array([1.0, 2.0, 3.0, 4.0])
+        self.q1 = Quaternion(self.a)
+        self.q2 = Quaternion(q[1] * 2)
+        self.u1 = UnitQuaternion(q[0])
+        self.u2 = UnitQuaternion(q[1])
+
+    def time_construct(self):
+        Quaternion(self.a)
+
+    def time_mul(self):
+        self.q1 * self.q2
+
+    def time_mul_scalar(self):
+        self.q1 * 2.0
+
+    def time_add(self):
+        self.q1 + self.q2
+
+    def time_div_scalar(self):
+        self.q1 / 2.0
+
+    def time_conjugate(self):
+        self.q1.conjugate()
+
+    def time_norm(self):
+        self.q1.norm
+
+    def time_quadruple(self):
+        self.q1.quadruple
+
+    def time_unit_mul(self):
+        self.u1 * self.u2
+
+    def time_pow(self):
+        self.q1 ** 0.5
+
+
+class RotationOperations(object):
+
+    def setup(self):
+        q = random_versors(2)
+        self.r1 = Rotation(q[0])
+        self.r2 = Rotation(q[1])
+        self.m = np.asarray(self.r1.rotation_matrix)
+        self.v = np.array([1.0, 2.0, 3.0])
+
+    def time_construct(self):
+        Rotation(self.r1.quadruple)
+
+    def time_mul(self):
+        self.r1 * self.r2
+
+    def time_conjugate(self):
+        self.r1.conjugate()
+
+    def time_rotation_matrix(self):
+        self.r1.rotation_matrix
+
+    def time_from_rotation_matrix(self):
+        self.r2.rotation_matrix = self.m
+
+    def time_euler_angles(self):
+        self.r1.euler_angles
+
+    def time_axis_angle(self):
+        self.r1.axis_angle
+
+    def time_rotate_vector(self):
+        self.r1.rotate_vector(self.v)
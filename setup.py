@@ -27,9 +27,9 @@ with open(readme_file, encoding='utf-8') as f:
 
 extensions = [
     Extension(
-        'BDQuaternions._helpers',
-        ['BDQuaternions/_helpers.pyx'],
-        depends=['BDQuaternions._helpers.pxd'],
+        'BDQuaternions.instrumentation',
+        ['BDQuaternions/instrumentation.pyx'],
+        depends=['BDQuaternions/instrumentation.pxd'],
     ),
     Extension(
         'BDQuaternions._quaternion_operations',
@@ -61,6 +61,67 @@ extensions = [
         ['BDQuaternions/Rotation.pyx'],
         depends=['BDQuaternions/Rotation.pxd'],
     ),
+    Extension(
+        'BDQuaternions.parallel',
+        ['BDQuaternions/parallel.pyx'],
+        depends=['BDQuaternions/parallel.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.quaternion_arrays',
+        ['BDQuaternions/quaternion_arrays.pyx'],
+        depends=['BDQuaternions/quaternion_arrays.pxd', 'BDQuaternions/_kernels.pxd', 'BDQuaternions/parallel.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.euler_angles_arrays',
+        ['BDQuaternions/euler_angles_arrays.pyx'],
+        depends=['BDQuaternions/euler_angles_arrays.pxd', 'BDQuaternions/_kernels.pxd',
+                 'BDQuaternions/parallel.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.RotationSet',
+        ['BDQuaternions/RotationSet.pyx'],
+        depends=['BDQuaternions/RotationSet.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.interpolation',
+        ['BDQuaternions/interpolation.pyx'],
+        depends=['BDQuaternions/interpolation.pxd', 'BDQuaternions/_kernels.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.kinematics',
+        ['BDQuaternions/kinematics.pyx'],
+        depends=['BDQuaternions/_kernels.pxd', 'BDQuaternions/quaternion_arrays.pxd', 'BDQuaternions/parallel.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.averaging',
+        ['BDQuaternions/averaging.pyx'],
+        depends=['BDQuaternions/averaging.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.symmetry',
+        ['BDQuaternions/symmetry.pyx'],
+        depends=['BDQuaternions/symmetry.pxd', 'BDQuaternions/_kernels.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.OrientationTree',
+        ['BDQuaternions/OrientationTree.pyx'],
+        depends=['BDQuaternions/OrientationTree.pxd', 'BDQuaternions/_kernels.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.grids',
+        ['BDQuaternions/grids.pyx'],
+        depends=['BDQuaternions/symmetry.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.storage',
+        ['BDQuaternions/storage.pyx'],
+        depends=['BDQuaternions/RotationSet.pxd'],
+    ),
+    Extension(
+        'BDQuaternions.ebsd',
+        ['BDQuaternions/ebsd.pyx'],
+        depends=['BDQuaternions/EulerAnglesConventions.pxd'],
+    ),
     Extension(
         'BDQuaternions.functions',
         ['BDQuaternions/functions.pyx'],
@@ -73,11 +134,11 @@ extensions = [
     ),
 ]
 
-copt = {'msvc': [],
-        'mingw32': [],
-        'unix': []}
-lopt = {'mingw32': [],
-        'unix': []}
+copt = {'msvc': ['/openmp'],
+        'mingw32': ['-fopenmp'],
+        'unix': ['-fopenmp']}
+lopt = {'mingw32': ['-fopenmp'],
+        'unix': ['-fopenmp']}
 
 
 # check whether compiler supports a flag
@@ -147,7 +208,7 @@ setup(
 
     keywords='Quaternion 3D rotations',
 
-    packages=find_packages(exclude=['demo', 'tests', 'docs', 'contrib', 'venv']),
+    packages=find_packages(exclude=['demo', 'tests', 'benchmarks', 'docs', 'contrib', 'venv']),
     ext_modules=cythonize(extensions, compiler_directives={'language_level': sys.version_info[0]}),
     package_data={'BDQuaternions': ['*.pxd']},
     install_requires=['numpy', 'scipy'],
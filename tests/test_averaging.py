@@ -0,0 +1,96 @@
+import numpy as np
+
+from BDQuaternions import RotationSet
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions.averaging import RotationAccumulator, GroupedRotationAccumulator
+from BDQuaternions.averaging import mean_rotation, grouped_mean_rotations
+
+import unittest
+
+
+def scatter(q, n, spread):
+    noise = np.zeros((n, 4))
+    noise[:, 1:] = (np.random.random((n, 3)) - 0.5) * spread
+    result = qa.mul(q, qa.exp(noise))
+    signs = np.where(np.random.random(n) < 0.5, -1.0, 1.0)
+    return result * signs[:, np.newaxis]
+
+
+class TestAveraging(unittest.TestCase):
+
+    def setUp(self):
+        self.q = qa.versor(np.random.random(4) - 0.5)
+        self.q *= np.sign(self.q[0])
+        self.samples = scatter(self.q, 1000, 0.2)
+
+    def test_mean(self):
+        mean = mean_rotation(self.samples)
+        self.assertTrue(mean[0] >= 0)
+        self.assertAlmostEqual(np.linalg.norm(mean), 1.0)
+        self.assertTrue(np.dot(mean, self.q) > 0.999)
+        eigenvalues, eigenvectors = np.linalg.eigh(np.einsum('ni,nj->ij', self.samples, self.samples))
+        np.testing.assert_allclose(np.abs(np.dot(mean, eigenvectors[:, -1])), 1.0)
+        np.testing.assert_allclose(mean_rotation(np.tile(self.q, (5, 1))), self.q, atol=1e-12)
+        np.testing.assert_allclose(mean_rotation(RotationSet(self.samples)), mean)
+
+    def test_weights(self):
+        q = qa.versor(np.random.random((2, 4)) - 0.5)
+        mean = mean_rotation(q, weights=[1.0, 0.0])
+        np.testing.assert_allclose(np.abs(np.dot(mean, q[0])), 1.0)
+        with self.assertRaises(ValueError):
+            mean_rotation(q, weights=[1.0])
+
+    def test_accumulator(self):
+        accumulator = RotationAccumulator()
+        with self.assertRaises(ValueError):
+            accumulator.mean()
+        for chunk in np.array_split(self.samples, 7):
+            accumulator.add(chunk)
+        self.assertEqual(accumulator.count, 1000)
+        self.assertEqual(accumulator.weight, 1000)
+        np.testing.assert_allclose(accumulator.matrix, np.einsum('ni,nj->ij', self.samples, self.samples))
+        np.testing.assert_allclose(accumulator.mean(), mean_rotation(self.samples))
+        first = RotationAccumulator().add(self.samples[:300])
+        second = RotationAccumulator().add(self.samples[300:])
+        np.testing.assert_allclose(first.merge(second).matrix, accumulator.matrix)
+        dots = np.dot(self.samples, accumulator.mean())
+        self.assertAlmostEqual(accumulator.dispersion, np.mean(1 - dots ** 2))
+        self.assertTrue(RotationAccumulator().add(np.tile(self.q, (3, 1))).dispersion < 1e-12)
+        accumulator.reset()
+        self.assertEqual(accumulator.count, 0)
+
+    def test_grouped(self):
+        centers = qa.versor(np.random.random((3, 4)) - 0.5)
+        centers *= np.sign(centers[:, :1])
+        samples = np.concatenate([scatter(centers[g], 200, 0.1) for g in range(3)])
+        labels = np.repeat([0, 1, 3], 200)
+        labels[:10] = -1
+        accumulator = GroupedRotationAccumulator()
+        for chunk, chunk_labels in zip(np.array_split(samples, 5), np.array_split(labels, 5)):
+            accumulator.add(chunk, chunk_labels)
+        self.assertEqual(len(accumulator), 4)
+        np.testing.assert_array_equal(accumulator.counts, [190, 200, 0, 200])
+        means = accumulator.means()
+        self.assertTrue(np.isnan(means[2]).all())
+        for g, label in enumerate([0, 1, 3]):
+            np.testing.assert_allclose(means[label], mean_rotation(samples[labels == label]))
+            self.assertTrue(np.dot(means[label], centers[g]) > 0.999)
+        np.testing.assert_allclose(grouped_mean_rotations(samples, labels), means)
+        dispersions = accumulator.dispersions()
+        self.assertAlmostEqual(dispersions[1], RotationAccumulator().add(samples[labels == 1]).dispersion)
+        first = GroupedRotationAccumulator(2).add(samples[:300], labels[:300])
+        second = GroupedRotationAccumulator().add(samples[300:], labels[300:])
+        self.assertEqual(len(first), 2)
+        np.testing.assert_allclose(first.merge(second).means(), means)
+        with self.assertRaises(ValueError):
+            accumulator.add(samples, labels[:10])
+
+    def test_eigen_failure(self):
+        invalid = np.array([[np.nan, 0.0, 0.0, 0.0]])
+        accumulator = RotationAccumulator().add(invalid)
+        with self.assertRaises(RuntimeError):
+            accumulator.mean()
+        with self.assertRaises(RuntimeError):
+            _ = accumulator.dispersion
+        with self.assertRaises(RuntimeError):
+            grouped_mean_rotations(np.concatenate([[[1.0, 0.0, 0.0, 0.0]], invalid]), [0, 1])
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import numpy as np
+
+from BDQuaternions import Conventions
+from BDQuaternions.ebsd import read_ebsd, ebsd_file_info
+from BDQuaternions.euler_angles_arrays import euler_angles_to_quaternions
+
+import unittest
+
+
+ang_header = """# TEM_PIXperUM          1.000000
+# WorkingDistance       15.000000
+#
+# Phase 1
+# MaterialName  	Nickel
+# Formula     	Ni
+# Symmetry              43
+# LatticeConstants      3.560 3.560 3.560  90.000  90.000  90.000
+# NumberFamilies        4
+#
+# GRID: SqrGrid
+# XSTEP: 0.500000
+# YSTEP: 0.500000
+# NCOLS_ODD: 7
+# NCOLS_EVEN: 7
+# NROWS: 5
+#
+"""
+
+ctf_header = """Channel Text File
+Prj\tC:\\maps\\map.cpr
+Author\t[Unknown]
+JobMode\tGrid
+XCells\t7
+YCells\t5
+XStep\t0.5
+YStep\t0.5
+Euler angles refer to Sample Coordinate system (CS0)!\tMag\t100\tCoverage\t100\tDevice\t0\tKV\t20
+Phases\t1
+3.524;3.524;3.524\t90.000;90.000;90.000\tNickel\t11\t225
+Phase\tX\tY\tBands\tError\tEuler1\tEuler2\tEuler3\tMAD\tBC\tBS
+"""
+
+
+class TestEBSD(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.n = 35
+        self.angles = np.random.default_rng(0).uniform(0, [2 * np.pi, np.pi, 2 * np.pi], size=(self.n, 3))
+        self.x = np.arange(self.n) % 7 * 0.5
+        self.y = np.arange(self.n) // 7 * 0.5
+        self.ang_path = os.path.join(self.directory.name, 'map.ang')
+        with open(self.ang_path, 'w') as f:
+            f.write(ang_header)
+            for i in range(self.n):
+                f.write('  %.8f %.8f %.8f  %.5f %.5f  %.1f %.3f  %d  %d  %.3f\n'
+                        % (tuple(self.angles[i]) + (self.x[i], self.y[i], 100.0 + i, 0.5, i % 2, 1000, 0.8)))
+            f.write('\n')
+        self.ctf_path = os.path.join(self.directory.name, 'map.ctf')
+        with open(self.ctf_path, 'w', encoding='latin-1') as f:
+            f.write(ctf_header)
+            for i in range(self.n):
+                f.write('%d\t%.4f\t%.4f\t8\t0\t%.8f\t%.8f\t%.8f\t0.5\t120\t130\n'
+                        % ((i % 2, self.x[i], self.y[i]) + tuple(np.rad2deg(self.angles[i]))))
+        self.expected = euler_angles_to_quaternions(self.angles, Conventions().get_convention('Bunge'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_info(self):
+        info = ebsd_file_info(self.ang_path)
+        self.assertEqual(info['format'], 'ang')
+        self.assertFalse(info['degrees'])
+        self.assertEqual(info['count'], self.n)
+        self.assertEqual(info['x_step'], 0.5)
+        self.assertEqual(info['phases'][0]['MaterialName'], 'Nickel')
+        self.assertEqual(info['phases'][0]['Symmetry'], 43)
+        self.assertEqual(len(info['columns']), 10)
+        info = ebsd_file_info(self.ctf_path)
+        self.assertEqual(info['format'], 'ctf')
+        self.assertTrue(info['degrees'])
+        self.assertEqual(info['count'], self.n)
+        self.assertEqual(info['phases'][0]['name'], 'Nickel')
+        self.assertEqual(info['phases'][0]['laue_group'], 11)
+        self.assertEqual(info['euler_angles_columns'], [5, 6, 7])
+
+    def test_read(self):
+        for path, columns in [(self.ang_path, ['ci', 'fit', 'iq', 'phase', 'sem_signal', 'x', 'y']),
+                              (self.ctf_path, ['bands', 'bc', 'bs', 'error', 'mad', 'phase', 'x', 'y'])]:
+            for chunk_size in [1, 10, 35, 100]:
+                chunks = list(read_ebsd(path, chunk_size=chunk_size))
+                self.assertEqual(len(chunks), -(-self.n // chunk_size))
+                self.assertTrue(all(len(q) <= chunk_size for q, _ in chunks))
+                self.assertEqual(sorted(chunks[0][1]), columns)
+                q = np.concatenate([q for q, _ in chunks])
+                np.testing.assert_allclose(q, self.expected, atol=1e-7)
+                np.testing.assert_allclose(np.concatenate([c['x'] for _, c in chunks]), self.x)
+                phase = np.concatenate([c['phase'] for _, c in chunks])
+                self.assertEqual(phase.dtype, np.int32)
+                np.testing.assert_array_equal(phase, np.arange(self.n) % 2)
+
+    def test_convention_and_units(self):
+        conventions = Conventions()
+        q, _ = next(read_ebsd(self.ang_path, euler_angles_convention='ZYZr'))
+        np.testing.assert_allclose(q, euler_angles_to_quaternions(self.angles, conventions.get_convention('ZYZr')),
+                                   atol=1e-7)
+        q, _ = next(read_ebsd(self.ctf_path, euler_angles_convention=conventions.get_convention('Bunge'),
+                              degrees=False))
+        np.testing.assert_allclose(q, euler_angles_to_quaternions(np.rad2deg(self.angles),
+                                                                  conventions.get_convention('Bunge')), atol=1e-7)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            ebsd_file_info(self.ang_path, format='osc')
+        with self.assertRaises(ValueError):
+            next(read_ebsd(self.ang_path, chunk_size=0))
+        with self.assertRaises(ValueError):
+            next(read_ebsd(self.ang_path, euler_angles_convention='abc'))
+        with self.assertRaises(ValueError):
+            ebsd_file_info(self.ang_path, format='ctf')
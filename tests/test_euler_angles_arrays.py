@@ -0,0 +1,97 @@
+import numpy as np
+
+from BDQuaternions import Conventions, EulerAngles, RotationSet
+from BDQuaternions.EulerAnglesConventions import Convention, Function
+from BDQuaternions import euler_angles_arrays as eaa
+
+import unittest
+
+
+class Synth2Parent(Function):
+    def evaluate(self, euler_angles):
+        result = np.zeros(3, dtype=np.double)
+        result[0] = euler_angles[0] - 0.32
+        result[1] = euler_angles[1] / 2
+        result[2] = euler_angles[2] - 0.75
+        return result
+
+
+class Parent2Synth(Function):
+    def evaluate(self, euler_angles):
+        result = np.zeros(3, dtype=np.double)
+        result[0] = euler_angles[0] + 0.32
+        result[1] = euler_angles[1] * 2
+        result[2] = euler_angles[2] + 0.75
+        return result
+
+
+class TestEulerAnglesArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.conventions = Conventions()
+        self.conventions_list = ['XYZs', 'XZYr', 'XYXs', 'ZXZr', 'ZYZs',
+                                 'Nautical', 'Bunge', 'Rhoe', 'Matthies', 'Kocks', 'Canova']
+        self.angles = np.deg2rad(np.random.random((20, 3)) * 360 - 180)
+
+    def all_conventions(self):
+        result = [self.conventions.get_convention(label) for label in self.conventions_list]
+        result.append(Convention('Synthetic 1', 'ZYZr', ['Phi', 'Theta', 'rho'], ['alpha', 'beta', 'gamma'],
+                                 [2, 1, 0, 1], description='', parent='Canova',
+                                 to_parent=Synth2Parent(), from_parent=Parent2Synth()))
+        return result
+
+    def test_reduce_euler_angles(self):
+        angles = (np.random.random((10, 3)) - 0.5) * 40
+        reduced = eaa.reduce_euler_angles(angles)
+        for i in range(10):
+            np.testing.assert_allclose(reduced[i], EulerAngles(angles[i], self.conventions.get_convention('Bunge'))
+                                       .euler_angles)
+        eaa.reduce_euler_angles(angles, out=angles)
+        np.testing.assert_allclose(angles, reduced)
+
+    def test_to_rotation_matrices(self):
+        for convention in self.all_conventions():
+            matrices = eaa.euler_angles_to_rotation_matrices(self.angles, convention)
+            self.assertEqual(matrices.shape, (20, 3, 3))
+            for i in range(20):
+                m = EulerAngles(self.angles[i], convention).rotation_matrix()
+                np.testing.assert_allclose(matrices[i], m, atol=1e-12)
+
+    def test_to_quaternions(self):
+        for convention in self.all_conventions():
+            q = eaa.euler_angles_to_quaternions(self.angles.reshape(4, 5, 3), convention)
+            self.assertEqual(q.shape, (4, 5, 4))
+            q = q.reshape(20, 4)
+            for i in range(20):
+                q_i = EulerAngles(self.angles[i], convention).to_quaternion().quadruple
+                np.testing.assert_allclose(q[i], q_i, atol=1e-12)
+
+    def test_from_rotation_matrices_and_quaternions(self):
+        for convention in self.all_conventions():
+            matrices = eaa.euler_angles_to_rotation_matrices(self.angles, convention)
+            q = eaa.euler_angles_to_quaternions(self.angles, convention)
+            angles_m = eaa.euler_angles_from_rotation_matrices(matrices, convention)
+            angles_q = eaa.euler_angles_from_quaternions(q, convention)
+            ea = EulerAngles(np.zeros(3), convention)
+            for i in range(20):
+                ea.from_rotation_matrix(matrices[i], convention)
+                np.testing.assert_allclose(angles_m[i], ea.euler_angles, atol=1e-10)
+            np.testing.assert_allclose(angles_q, angles_m, atol=1e-10)
+            np.testing.assert_allclose(eaa.euler_angles_to_rotation_matrices(angles_q, convention), matrices,
+                                       atol=1e-10)
+
+    def test_rotation_set(self):
+        convention = self.conventions.get_convention('Kocks')
+        rotation_set = RotationSet.from_euler_angles(self.angles, convention)
+        self.assertEqual(rotation_set.euler_angles_convention.label, 'Kocks')
+        np.testing.assert_allclose(rotation_set.rotation_matrix,
+                                   eaa.euler_angles_to_rotation_matrices(self.angles, convention), atol=1e-12)
+        np.testing.assert_allclose(RotationSet.from_euler_angles(rotation_set.euler_angles, convention).quadruples,
+                                   rotation_set.quadruples, atol=1e-10)
+
+    def test_raises(self):
+        convention = self.conventions.get_convention('Bunge')
+        with self.assertRaises(ValueError):
+            eaa.euler_angles_to_quaternions(np.zeros((3, 4)), convention)
+        with self.assertRaises(ValueError):
+            eaa.euler_angles_from_rotation_matrices(np.zeros((3, 4)), convention)
@@ -53,3 +53,32 @@ class TestEulerAnglesConventions(unittest.TestCase):
         np.testing.assert_allclose(euler_angles_p, np.array([np.pi / 2, np.pi / 3 - 1, np.pi / 12]))
         euler_angles_b = synthetic_convention.from_parent(euler_angles_p)
         np.testing.assert_allclose(euler_angles_b, np.array([np.pi, np.pi / 3, np.pi / 4]))
+
+    def test_interned_conventions(self):
+        bunge = self.conventions.get_convention('Bunge')
+        self.assertIs(bunge, self.conventions.get_convention(' bunge '))
+        self.assertIs(bunge, Conventions().get_convention('BUNGE'))
+        self.assertIs(self.conventions.get_convention('xyzs'), self.conventions.get_convention('sxyz'))
+        self.assertIs(self.conventions.get_convention('Kocks').parent, self.conventions.get_convention('Roe'))
+        self.assertIs(self.conventions.get_convention('asdf'),
+                      self.conventions.get_convention(self.conventions.default_convention))
+        self.assertFalse(self.conventions.check(''))
+        for label in self.conventions.list_euler_angles_conventions():
+            self.assertTrue(self.conventions.check(label))
+            self.assertEqual(self.conventions.get_convention(label).label, label)
+
+    def test_convention_root(self):
+        roe = self.conventions.get_convention('Roe')
+        canova = self.conventions.get_convention('Canova')
+        self.assertIs(roe.root, roe)
+        self.assertIs(canova.root, roe)
+        synthetic_convention = Convention('Synthetic 1', 'XYZr', ['Phi', 'Theta', 'rho'], ['alpha', 'beta', 'gamma'],
+                                          [2, 1, 0, 1], description='', parent='Canova')
+        self.assertIs(synthetic_convention.root, roe)
+        euler_angles = np.array([np.pi, np.pi / 3, np.pi / 4])
+        np.testing.assert_allclose(synthetic_convention.to_root(euler_angles), canova.to_parent(euler_angles))
+        np.testing.assert_allclose(synthetic_convention.from_root(synthetic_convention.to_root(euler_angles)),
+                                   euler_angles)
+        euler_angles = np.random.random((5, 3))
+        np.testing.assert_allclose(synthetic_convention.from_root_array(synthetic_convention.to_root_array(euler_angles)),
+                                   euler_angles)
@@ -1,7 +1,8 @@
 import numpy as np
 
 from BDQuaternions import Quaternion, UnitQuaternion
-from BDQuaternions.functions import exp, log
+from BDQuaternions.functions import exp, log, sqrt, pow, sin, cos
+from BDQuaternions import quaternion_arrays as qa
 from BDQuaternions.utils import random_unit_quaternion
 
 import unittest
@@ -51,6 +52,43 @@ class TestFunctions(unittest.TestCase):
         ns = check_log_exp_number([np.random.random(1)[0] for _ in range(5)])
         self.assertTrue(ns)
 
+    def test_numeric_arrays(self):
+        q = (np.random.random((6, 4)) - 0.5) * 2
+        np.testing.assert_allclose(exp(q), np.exp(q))
+        np.testing.assert_allclose(log(np.abs(q)), np.log(np.abs(q)))
+        np.testing.assert_allclose(pow(np.abs(q), 1.5), np.abs(q) ** 1.5)
+        np.testing.assert_allclose(exp(q, as_quaternions=True), qa.exp(q))
+        np.testing.assert_allclose(log(q, as_quaternions=True), qa.log(q))
+        np.testing.assert_allclose(sqrt(q, as_quaternions=True), qa.power(q, 0.5))
+        np.testing.assert_allclose(qa.mul(sqrt(q, as_quaternions=True), sqrt(q, as_quaternions=True)), q)
+        np.testing.assert_allclose(pow(q, 3, as_quaternions=True), qa.mul(q, qa.mul(q, q)))
+        sin_q = sin(q, as_quaternions=True)
+        cos_q = cos(q, as_quaternions=True)
+        np.testing.assert_allclose(qa.mul(sin_q, sin_q) + qa.mul(cos_q, cos_q),
+                                   np.broadcast_to([1.0, 0, 0, 0], q.shape), atol=1e-12)
+        np.testing.assert_allclose(sin(q[:, 0]), np.sin(q[:, 0]))
+        np.testing.assert_allclose(cos(q[:, 0]), np.cos(q[:, 0]))
+        self.assertAlmostEqual(sin(0.3), np.sin(0.3))
+        self.assertAlmostEqual(sqrt(4.0), 2.0)
+
+    def test_quaternion_objects(self):
+        q = (np.random.random((2, 3, 4)) - 0.5) * 2
+        objects = qa.unpack_quaternions(q)
+        for function in [exp, log, sqrt, sin, cos]:
+            result = function(objects)
+            self.assertEqual(result.shape, (2, 3))
+            self.assertIsInstance(result[0, 0], Quaternion)
+            for i in range(2):
+                for j in range(3):
+                    np.testing.assert_allclose(result[i, j].quadruple, function(objects[i, j]).quadruple)
+            np.testing.assert_allclose(qa.pack_quaternions(result), function(q, as_quaternions=True))
+        result = pow(list(objects[0]), 2)
+        for j in range(3):
+            np.testing.assert_allclose(result[j].quadruple, (objects[0, j] ** 2).quadruple)
+        mixed = exp([objects[0, 0], 1.0])
+        self.assertIsInstance(mixed[0], Quaternion)
+        self.assertAlmostEqual(mixed[1], np.e)
+
     def test_raises(self):
         with self.assertRaises(ValueError):
             exp('a')
@@ -0,0 +1,53 @@
+import numpy as np
+
+from BDQuaternions import OrientationTree
+from BDQuaternions.grids import hopf_grid, hopf_grid_array, hopf_grid_level, hopf_grid_size
+from BDQuaternions.symmetry import reduce_to_fundamental_zone
+from BDQuaternions.utils import random_rotations_quadruples
+
+import unittest
+
+
+class TestGrids(unittest.TestCase):
+
+    def test_level(self):
+        self.assertEqual(hopf_grid_level(np.deg2rad(60)), 0)
+        self.assertEqual(hopf_grid_level(np.deg2rad(30)), 1)
+        self.assertEqual(hopf_grid_level(np.deg2rad(20)), 2)
+        self.assertEqual(hopf_grid_level(10.0), 0)
+        self.assertEqual(hopf_grid_size(2), 4608)
+        with self.assertRaises(ValueError):
+            hopf_grid_level(0)
+
+    def test_grid(self):
+        for level in range(3):
+            grid = hopf_grid_array(level)
+            self.assertEqual(grid.shape, (hopf_grid_size(level), 4))
+            np.testing.assert_allclose(np.linalg.norm(grid, axis=1), np.ones(grid.shape[0]))
+            tree = OrientationTree(grid)
+            distances, indices = tree.query(grid, k=2)
+            spacing = np.deg2rad(60) / 2 ** level
+            self.assertTrue(2 * distances[:, 1].max() <= spacing * (1 + 1e-9))
+            self.assertTrue(2 * distances[:, 1].min() >= spacing * 0.8)
+            distances, indices = tree.query(random_rotations_quadruples(1000, seed=level))
+            self.assertTrue(2 * distances.max() <= spacing)
+        np.testing.assert_array_equal(hopf_grid_array(resolution=np.deg2rad(30)), hopf_grid_array(1))
+
+    def test_chunks(self):
+        chunks = list(hopf_grid(1, chunk_size=100))
+        self.assertEqual(len(chunks), 6)
+        for chunk in chunks[:-1]:
+            self.assertEqual(chunk.shape, (100, 4))
+        self.assertEqual(chunks[-1].shape, (76, 4))
+        np.testing.assert_array_equal(np.concatenate(chunks), hopf_grid_array(1))
+        with self.assertRaises(ValueError):
+            next(hopf_grid())
+
+    def test_fundamental_zone(self):
+        full = hopf_grid_array(2)
+        reduced = hopf_grid_array(2, symmetry='cubic')
+        self.assertTrue(0.8 * full.shape[0] / 24 < reduced.shape[0] < 1.2 * full.shape[0] / 24)
+        np.testing.assert_allclose(np.abs(reduce_to_fundamental_zone(reduced, 'cubic')[:, 0]), np.abs(reduced[:, 0]))
+        chunks = list(hopf_grid(2, symmetry='cubic', chunk_size=50))
+        self.assertTrue(all(chunk.shape == (50, 4) for chunk in chunks[:-1]))
+        np.testing.assert_array_equal(np.concatenate(chunks), reduced)
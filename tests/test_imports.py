@@ -0,0 +1,55 @@
+import os
+import sys
+import subprocess
+
+import unittest
+
+
+def run(code):
+    """
+    Run code in a fresh interpreter and return its standard output
+    """
+    environment = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment['PYTHONPATH'] = os.pathsep.join([root] + environment.get('PYTHONPATH', '').split(os.pathsep))
+    return subprocess.run([sys.executable, '-c', code], env=environment, check=True,
+                          stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+
+
+class TestImports(unittest.TestCase):
+
+    def test_lazy_package(self):
+        loaded = run('import sys, BDQuaternions\n'
+                     'print(len([m for m in sys.modules if m.startswith("BDQuaternions.")]))\n'
+                     'print("scipy" in sys.modules)')
+        self.assertEqual(loaded, ['1', 'False'])
+
+    def test_classes(self):
+        import BDQuaternions
+        from BDQuaternions import Rotation, RotationSet, EulerAngles
+        from BDQuaternions.Rotation import Rotation as rotation_class
+        self.assertIs(Rotation, rotation_class)
+        self.assertIsInstance(Rotation, type)
+        self.assertIsInstance(RotationSet, type)
+        self.assertIsInstance(EulerAngles, type)
+        self.assertIs(BDQuaternions.Rotation, Rotation)
+        self.assertIn('PointGroup', dir(BDQuaternions))
+        with self.assertRaises(AttributeError):
+            _ = BDQuaternions.Missing
+        classes = run('import BDQuaternions.RotationSet, BDQuaternions.OrientationTree\n'
+                      'from BDQuaternions import Rotation, OrientationTree, Quaternion\n'
+                      'print(type(Rotation).__name__, type(OrientationTree).__name__, type(Quaternion).__name__)')
+        self.assertEqual(classes, ['type', 'type', 'type'])
+
+    def test_deferred_lapack(self):
+        loaded = run('import sys\n'
+                     'import numpy as np\n'
+                     'from BDQuaternions import Rotation\n'
+                     'Rotation().rotation_matrix = np.eye(3)\n'
+                     'print("scipy" in sys.modules)\n'
+                     'from BDQuaternions.quaternion_arrays import quaternions_from_rotation_matrices\n'
+                     'quaternions_from_rotation_matrices(np.stack([np.eye(3)] * 100))\n'
+                     'print("scipy" in sys.modules)\n'
+                     'q, mask = quaternions_from_rotation_matrices(np.diag([1.0, 1.0, 1.0 + 1e-9]), return_mask=True)\n'
+                     'print("scipy" in sys.modules, mask, np.allclose(q, [1, 0, 0, 0]))')
+        self.assertEqual(loaded, ['False', 'False', 'True', 'True', 'True'])
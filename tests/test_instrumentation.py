@@ -0,0 +1,73 @@
+import warnings
+import numpy as np
+
+from BDQuaternions import Quaternion, Rotation, Conventions
+from BDQuaternions import instrumentation
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions._quaternion_operations import quaternion_from_rotation_matrix
+from BDQuaternions.utils import random_rotations_quadruples
+
+import unittest
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.set_hook(None)
+        instrumentation.reset()
+
+    def test_disabled(self):
+        self.assertFalse(instrumentation.is_enabled())
+        Quaternion() * Quaternion()
+        qa.exp(np.zeros((3, 4)))
+        self.assertEqual(instrumentation.snapshot(), {'counters': {}, 'timers': {}})
+
+    def test_counters(self):
+        instrumentation.enable()
+        self.assertTrue(instrumentation.is_enabled())
+        q = Quaternion() * Quaternion()
+        q *= 2
+        Rotation().conjugate()
+        Conventions()
+        q = random_rotations_quadruples(10, seed=0)
+        m = qa.rotation_matrices(q)
+        m[[2, 4]] += 1.0e-9
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            qa.quaternions_from_rotation_matrices(m)
+            quaternion_from_rotation_matrix(m[2])
+        quaternion_from_rotation_matrix(m[0])
+        counters = instrumentation.snapshot()['counters']
+        self.assertEqual(counters['quaternion_allocated'], 5)
+        self.assertEqual(counters['conventions_created'], 1)
+        self.assertEqual(counters['quaternion_from_rotation_matrix'], 2)
+        self.assertEqual(counters['rotation_matrix_fallback'], 3)
+        self.assertEqual(counters['array_allocated'], 3)
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot(), {'counters': {}, 'timers': {}})
+
+    def test_timers_and_hook(self):
+        events = []
+        self.assertIsNone(instrumentation.set_hook(lambda kind, name, value: events.append((kind, name, value))))
+        instrumentation.enable()
+        q = np.zeros((100, 4))
+        qa.mul(q, q)
+        qa.mul(q, q)
+        qa.log(q + 1)
+        Rotation().rotate(np.zeros((5, 3)))
+        timers = instrumentation.snapshot()['timers']
+        self.assertEqual(timers['quaternion_arrays.mul']['calls'], 2)
+        self.assertGreaterEqual(timers['quaternion_arrays.mul']['total'], timers['quaternion_arrays.mul']['max'])
+        self.assertEqual(timers['quaternion_arrays.log']['calls'], 1)
+        self.assertEqual(timers['Rotation.rotate']['calls'], 1)
+        self.assertIn(('timer', 'quaternion_arrays.log'), [event[:2] for event in events])
+        self.assertIn(('counter', 'array_allocated', 1), events)
+        instrumentation.disable()
+        qa.mul(q, q)
+        self.assertEqual(instrumentation.snapshot()['timers']['quaternion_arrays.mul']['calls'], 2)
+        with self.assertRaises(TypeError):
+            instrumentation.set_hook(1)
@@ -0,0 +1,99 @@
+import numpy as np
+
+from BDQuaternions import Quaternion, KeyframeSequence, RotationSet
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions.interpolation import slerp
+
+import unittest
+
+
+def random_versors(shape):
+    return qa.versor(np.random.random(shape + (4,)) - 0.5)
+
+
+class TestInterpolation(unittest.TestCase):
+
+    def setUp(self):
+        self.q1 = random_versors((10,))
+        self.q2 = random_versors((10,))
+
+    def test_slerp(self):
+        np.testing.assert_allclose(slerp(self.q1, self.q2, 0.0), self.q1, atol=1e-12)
+        end = slerp(self.q1, self.q2, 1.0)
+        np.testing.assert_allclose(np.abs(np.sum(end * self.q2, axis=-1)), np.ones(10), atol=1e-12)
+        for i in range(10):
+            q1 = Quaternion(self.q1[i])
+            q2 = Quaternion(self.q2[i])
+            if np.dot(self.q1[i], self.q2[i]) < 0:
+                q2 = Quaternion(-self.q2[i])
+            expected = q1 * (q1.conjugate() * q2) ** 0.3
+            np.testing.assert_allclose(slerp(self.q1[i], self.q2[i], 0.3), expected.quadruple, atol=1e-12)
+        np.testing.assert_allclose(qa.norm(slerp(self.q1, self.q2, np.random.random(10))), np.ones(10))
+
+    def test_slerp_broadcast(self):
+        t = np.linspace(0, 1, 7)
+        result = slerp(self.q1[0], self.q2[0], t)
+        self.assertEqual(result.shape, (7, 4))
+        for j in range(7):
+            np.testing.assert_allclose(result[j], slerp(self.q1[0], self.q2[0], t[j]))
+        np.testing.assert_allclose(slerp(self.q1[0], self.q1[0], 0.5), self.q1[0])
+
+    def test_keyframes_slerp(self):
+        times = np.array([0.0, 0.5, 2.0, 3.0])
+        keyframes = random_versors((4,))
+        sequence = KeyframeSequence(times, keyframes)
+        self.assertEqual(len(sequence), 4)
+        for k in range(4):
+            np.testing.assert_allclose(np.abs(np.dot(sequence.slerp(times[k]), keyframes[k])), 1.0)
+            np.testing.assert_allclose(np.abs(np.dot(sequence.squad(times[k]), keyframes[k])), 1.0)
+        t = np.random.random(100) * 3
+        result = sequence.slerp(t)
+        for i in range(100):
+            k = min(np.searchsorted(times, t[i], side='right') - 1, 2)
+            u = (t[i] - times[k]) / (times[k + 1] - times[k])
+            np.testing.assert_allclose(result[i], slerp(sequence.keyframes[k], sequence.keyframes[k + 1], u),
+                                       atol=1e-12)
+        np.testing.assert_allclose(sequence.slerp([-1.0, 4.0]), sequence.keyframes[[0, -1]])
+        out = np.empty((2, 50, 4))
+        self.assertIs(sequence.squad(t.reshape(2, 50), out=out), out)
+        np.testing.assert_allclose(qa.norm(out), np.ones((2, 50)))
+
+    def test_squad_smooth(self):
+        times = np.arange(5, dtype=np.double)
+        sequence = KeyframeSequence(times, random_versors((5,)))
+        dt = 1e-6
+        for k in range(1, 4):
+            left = (sequence.squad(times[k]) - sequence.squad(times[k] - dt)) / dt
+            right = (sequence.squad(times[k] + dt) - sequence.squad(times[k])) / dt
+            np.testing.assert_allclose(left, right, atol=1e-4)
+
+    def test_shortest_path(self):
+        keyframes = random_versors((3,))
+        keyframes[1] *= -np.sign(np.dot(keyframes[0], keyframes[1]))
+        sequence = KeyframeSequence([0, 1, 2], keyframes)
+        self.assertTrue(np.dot(sequence.keyframes[0], sequence.keyframes[1]) >= 0)
+        self.assertTrue(np.dot(sequence.keyframes[1], sequence.keyframes[2]) >= 0)
+        sequence = KeyframeSequence([0, 1, 2], RotationSet(keyframes))
+        self.assertEqual(len(sequence), 3)
+
+    def test_antipodal(self):
+        q = random_versors(())
+        t = np.linspace(0, 1, 11)
+        result = slerp(q, -q, t, shortest_path=False)
+        np.testing.assert_allclose(qa.norm(result), np.ones(11))
+        np.testing.assert_allclose(result[0], q, atol=1e-12)
+        np.testing.assert_allclose(result[-1], -q, atol=1e-12)
+        np.testing.assert_allclose(np.sum(result[5] * q), 0, atol=1e-12)
+        sequence = KeyframeSequence([0, 1], [q, -q], shortest_path=False)
+        for result in (sequence.slerp(t), sequence.squad(t)):
+            np.testing.assert_allclose(qa.norm(result), np.ones(11))
+            np.testing.assert_allclose(result[0], q, atol=1e-12)
+            np.testing.assert_allclose(result[-1], -q, atol=1e-12)
+
+    def test_raises(self):
+        with self.assertRaises(ValueError):
+            KeyframeSequence([0, 1], random_versors((3,)))
+        with self.assertRaises(ValueError):
+            KeyframeSequence([0], random_versors((1,)))
+        with self.assertRaises(ValueError):
+            KeyframeSequence([0, 1, 1], random_versors((3,)))
@@ -0,0 +1,76 @@
+import numpy as np
+
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions.kinematics import integrate_angular_velocity
+
+import unittest
+
+
+class TestKinematics(unittest.TestCase):
+
+    def setUp(self):
+        # orientation q(t) = exp(a t z / 2) * exp(b t x / 2) with known body and space frame angular velocities
+        self.a = 1.3
+        self.b = 2.1
+
+    def trajectory(self, t):
+        first = np.zeros((t.size, 4))
+        first[:, 0] = np.cos(self.a * t / 2)
+        first[:, 3] = np.sin(self.a * t / 2)
+        second = np.zeros((t.size, 4))
+        second[:, 0] = np.cos(self.b * t / 2)
+        second[:, 1] = np.sin(self.b * t / 2)
+        q = qa.mul(first, second)
+        omega_body = np.stack([np.full(t.size, self.b), self.a * np.sin(self.b * t), self.a * np.cos(self.b * t)], 1)
+        omega_space = np.stack([self.b * np.cos(self.a * t), self.b * np.sin(self.a * t), np.full(t.size, self.a)], 1)
+        return q, omega_body, omega_space
+
+    def error(self, q1, q2):
+        return np.minimum(np.abs(q1 - q2).max(axis=-1), np.abs(q1 + q2).max(axis=-1)).max()
+
+    def test_convergence(self):
+        for method, order, tolerance in [('euler', 1, 3e-2), ('midpoint', 2, 3e-4), ('magnus4', 4, 1e-7)]:
+            errors = []
+            for n in [101, 201]:
+                t = np.linspace(0, 2, n)
+                q, omega_body, omega_space = self.trajectory(t)
+                body = integrate_angular_velocity(omega_body, dt=t[1], method=method)
+                space = integrate_angular_velocity(omega_space, t=t, method=method, body_frame=False)
+                np.testing.assert_allclose(qa.norm(body), np.ones(n))
+                errors.append(max(self.error(body, q), self.error(space, q)))
+            self.assertLess(errors[0], tolerance)
+            self.assertAlmostEqual(np.log2(errors[0] / errors[1]), order, delta=0.1)
+
+    def test_batch(self):
+        t = np.cumsum(np.random.default_rng(0).uniform(0.5e-2, 1.5e-2, 300))
+        q, omega_body, _ = self.trajectory(t)
+        q0 = q[0]
+        omega = np.stack([omega_body, omega_body[:, [1, 2, 0]]])
+        result = integrate_angular_velocity(omega, t=t - t[0], q0=q0)
+        self.assertEqual(result.shape, (2, 300, 4))
+        self.assertLess(self.error(result[0], q), 1e-7)
+        np.testing.assert_allclose(result[1], integrate_angular_velocity(omega[1], t=t, q0=q0))
+        out = np.empty((2, 300, 4))
+        self.assertIs(integrate_angular_velocity(omega, t=np.stack([t, t]), q0=np.stack([q0, q0]), out=out), out)
+        np.testing.assert_allclose(out, result)
+        constant = integrate_angular_velocity(np.tile([0.0, 0.0, np.pi], (3, 1)), dt=0.5, method='euler')
+        np.testing.assert_allclose(constant, [[1, 0, 0, 0], [np.sqrt(0.5), 0, 0, np.sqrt(0.5)], [0, 0, 0, 1]],
+                                   atol=1e-15)
+        self.assertEqual(integrate_angular_velocity(np.empty((0, 3)), dt=1.0).shape, (0, 4))
+
+    def test_errors(self):
+        omega = np.zeros((10, 3))
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(omega)
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(omega, dt=1.0, t=np.arange(10))
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(omega, dt=-1.0)
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(omega, t=np.zeros(10))
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(omega, t=np.arange(9))
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(np.zeros((10, 4)), dt=1.0)
+        with self.assertRaises(ValueError):
+            integrate_angular_velocity(omega, dt=1.0, method='rk45')
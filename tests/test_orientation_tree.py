@@ -0,0 +1,67 @@
+import numpy as np
+
+from BDQuaternions import OrientationTree, RotationSet
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions.symmetry import get_point_group
+
+import unittest
+
+
+def random_versors(shape):
+    return qa.versor(np.random.random(shape + (4,)) - 0.5)
+
+
+def brute_force_distances(q, points, symmetry='1'):
+    operators = get_point_group(symmetry).operators
+    copies = qa.mul(q[:, np.newaxis], operators)
+    dots = np.abs(np.einsum('mgi,ni->mgn', copies, points)).max(axis=1)
+    return np.arccos(np.clip(dots, -1, 1))
+
+
+class TestOrientationTree(unittest.TestCase):
+
+    def setUp(self):
+        self.points = random_versors((500,))
+        self.queries = random_versors((20,))
+
+    def test_knn(self):
+        tree = OrientationTree(self.points)
+        self.assertEqual(len(tree), 500)
+        distances, indices = tree.query(self.queries, k=5)
+        self.assertEqual(distances.shape, (20, 5))
+        expected = brute_force_distances(self.queries, self.points)
+        np.testing.assert_allclose(distances, np.sort(expected, axis=1)[:, :5], atol=1e-12)
+        np.testing.assert_allclose(np.take_along_axis(expected, indices, axis=1), distances, atol=1e-12)
+        distances, indices = tree.query(-self.points[:10])
+        np.testing.assert_array_equal(indices[:, 0], np.arange(10))
+        np.testing.assert_allclose(distances[:, 0], np.zeros(10), atol=1e-7)
+        distances, indices = tree.query(self.queries.reshape(4, 5, 4), k=2)
+        self.assertEqual(indices.shape, (4, 5, 2))
+        with self.assertRaises(ValueError):
+            tree.query(self.queries, k=501)
+
+    def test_radius(self):
+        tree = OrientationTree(RotationSet(self.points))
+        r = 0.4
+        offsets, distances, indices = tree.query_radius(self.queries, r)
+        self.assertEqual(offsets.shape, (21,))
+        expected = brute_force_distances(self.queries, self.points)
+        for i in range(20):
+            found = indices[offsets[i]:offsets[i + 1]]
+            np.testing.assert_array_equal(np.sort(found), np.nonzero(expected[i] <= r)[0])
+            self.assertTrue((np.diff(distances[offsets[i]:offsets[i + 1]]) >= 0).all())
+
+    def test_symmetry(self):
+        tree = OrientationTree(self.points, symmetry='cubic')
+        self.assertEqual(tree.symmetry.label, '432')
+        expected = brute_force_distances(self.queries, self.points, 'cubic')
+        distances, indices = tree.query(self.queries, k=3)
+        np.testing.assert_allclose(distances, np.sort(expected, axis=1)[:, :3], atol=1e-12)
+        self.assertEqual(len(np.unique(indices[0])), 3)
+        offsets, distances, indices = tree.query_radius(self.queries, 0.1)
+        for i in range(20):
+            found = indices[offsets[i]:offsets[i + 1]]
+            np.testing.assert_array_equal(found[np.argsort(found)], np.nonzero(expected[i] <= 0.1)[0])
+        operators = get_point_group('cubic').operators
+        distances, indices = tree.query(qa.mul(self.points[7], operators[5]))
+        self.assertEqual(indices[0], 7)
@@ -0,0 +1,64 @@
+import numpy as np
+
+from BDQuaternions import Rotation, Conventions
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions import euler_angles_arrays as ea
+from BDQuaternions.parallel import get_num_threads, set_num_threads, get_busy_threads
+from BDQuaternions.utils import random_rotations_quadruples
+
+import unittest
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.q = random_rotations_quadruples(20000, seed=3)
+        self.convention = Conventions().get_convention('Bunge')
+
+    def test_default(self):
+        previous = set_num_threads(0)
+        self.assertGreaterEqual(get_num_threads(), 1)
+        set_num_threads(2)
+        self.assertLessEqual(get_num_threads(), 2)
+        set_num_threads(previous)
+        self.assertEqual(get_num_threads(), previous)
+
+    def test_results(self):
+        for n_threads in [None, 1, 2, -1]:
+            np.testing.assert_array_equal(qa.mul(self.q, self.q[::-1], n_threads=n_threads),
+                                          qa.mul(self.q, self.q[::-1]))
+            np.testing.assert_array_equal(qa.log(self.q, n_threads=n_threads), qa.log(self.q))
+            np.testing.assert_array_equal(qa.rotation_matrices(self.q, n_threads=n_threads),
+                                          qa.rotation_matrices(self.q))
+            m = qa.rotation_matrices(self.q)
+            np.testing.assert_array_equal(qa.quaternions_from_rotation_matrices(m, n_threads=n_threads),
+                                          qa.quaternions_from_rotation_matrices(m))
+            angles = ea.euler_angles_from_quaternions(self.q, self.convention, n_threads=n_threads)
+            np.testing.assert_array_equal(angles, ea.euler_angles_from_quaternions(self.q, self.convention))
+            np.testing.assert_allclose(np.abs(np.sum(ea.euler_angles_to_quaternions(angles, self.convention,
+                                                                                     n_threads=n_threads) * self.q,
+                                                     axis=1)), np.ones(20000))
+            xyz = np.random.random((20000, 3))
+            np.testing.assert_array_equal(Rotation(self.q[0]).rotate(xyz, n_threads=n_threads),
+                                          Rotation(self.q[0]).rotate(xyz))
+
+    def test_invalid_matrices(self):
+        m = qa.rotation_matrices(self.q)
+        m[[5, 7]] *= 2
+        with self.assertRaises(ValueError) as context:
+            qa.quaternions_from_rotation_matrices(m, n_threads=-1)
+        self.assertIn('2 of 20000', str(context.exception))
+        self.assertIn('first at 5', str(context.exception))
+
+    def test_budget_released_on_errors(self):
+        busy = get_busy_threads()
+        xyz = np.random.random((20000, 3))
+        for dtype in [np.double, np.float32]:
+            out = np.empty(xyz.shape, dtype=dtype)
+            out.flags.writeable = False
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    Rotation(self.q[0]).rotate(xyz.astype(dtype), out=out, n_threads=-1)
+        self.assertEqual(get_busy_threads(), busy)
+        np.testing.assert_array_equal(qa.cumprod(self.q, n_threads=-1), qa.cumprod(self.q))
+        self.assertEqual(get_busy_threads(), busy)
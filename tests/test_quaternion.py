@@ -2,7 +2,7 @@ import sys
 import unittest
 import numpy as np
 
-from BDQuaternions import Quaternion
+from BDQuaternions import Quaternion, UnitQuaternion
 from BDQuaternions import functions as qf
 
 
@@ -129,3 +129,63 @@ class TestQuaternion(unittest.TestCase):
         cm = self.q1.complex_matrix()
         self.assertEqual(rm.shape, (4, 4))
         self.assertEqual(cm.shape, (2, 2))
+
+    def test_in_place(self):
+        q = Quaternion(np.array([1, 2, 3, 4], dtype=np.double))
+        p = Quaternion(np.array([-1, 0.5, 2, 1], dtype=np.double))
+        expected = q * p
+        q_id = id(q)
+        q *= p
+        self.assertEqual(id(q), q_id)
+        self.assertEqual(q, expected)
+        q += p
+        q -= 2
+        q /= 4
+        self.assertEqual(id(q), q_id)
+        self.assertEqual(q, (expected + p - 2) / 4)
+        q *= 2
+        self.assertEqual(q, (expected + p - 2) / 2)
+        uq = UnitQuaternion(np.array([0, 1, 0, 0], dtype=np.double))
+        uq_id = id(uq)
+        uq *= UnitQuaternion(np.array([0, 0, 1, 0], dtype=np.double))
+        uq *= -1
+        self.assertEqual(id(uq), uq_id)
+        self.assertEqual(uq, UnitQuaternion(np.array([0, 0, 0, -1], dtype=np.double)))
+        uq *= 2
+        self.assertNotEqual(id(uq), uq_id)
+        self.assertIsInstance(uq, Quaternion)
+        self.assertNotIsInstance(uq, UnitQuaternion)
+
+    def test_into(self):
+        q = Quaternion(np.array([1, 2, 3, 4], dtype=np.double))
+        p = Quaternion(np.array([-1, 0.5, 2, 1], dtype=np.double))
+        out = Quaternion()
+        self.assertIs(q.mul_into(p, out), out)
+        self.assertEqual(out, q * p)
+        self.assertEqual(q.add_into(p, out), q + p)
+        self.assertEqual(q.sub_into(p, out), q - p)
+        self.assertEqual(q.conjugate_into(out), q.conjugate())
+        expected = q * q
+        q.mul_into(q, q)
+        self.assertEqual(q, expected)
+        uq = UnitQuaternion(np.array([0, 1, 0, 0], dtype=np.double))
+        with self.assertRaises(TypeError):
+            q.mul_into(uq, uq)
+        with self.assertRaises(TypeError):
+            uq.add_into(uq, uq)
+        self.assertEqual(uq.mul_into(uq, uq), UnitQuaternion(np.array([-1, 0, 0, 0], dtype=np.double)))
+
+    def test_quadruple_view(self):
+        q = Quaternion(np.array([1, 2, 3, 4], dtype=np.double))
+        quadruple = q.quadruple
+        self.assertEqual(quadruple.dtype, np.double)
+        self.assertEqual(quadruple.shape, (4,))
+        quadruple[0] = 5
+        np.testing.assert_allclose(q.quadruple, np.array([5, 2, 3, 4]))
+        np.testing.assert_allclose(q.vector_part(), np.array([2, 3, 4]))
+        del q
+        np.testing.assert_allclose(quadruple, np.array([5, 2, 3, 4]))
+        uq = UnitQuaternion(np.array([0, 1, 0, 0], dtype=np.double))
+        self.assertIsInstance(uq * -1, UnitQuaternion)
+        self.assertNotIsInstance(uq * 2, UnitQuaternion)
+        self.assertIsInstance(uq.conjugate(), UnitQuaternion)
@@ -0,0 +1,176 @@
+import numpy as np
+
+from BDQuaternions import Quaternion
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions import _quaternion_operations as qo
+
+import unittest
+
+
+class TestQuaternionArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.q1 = (np.random.random((5, 3, 4)) - 0.5) * 2
+        self.q2 = (np.random.random((5, 3, 4)) - 0.5) * 2
+
+    def test_mul(self):
+        result = qa.mul(self.q1, self.q2)
+        self.assertEqual(result.shape, (5, 3, 4))
+        for i in range(5):
+            for j in range(3):
+                np.testing.assert_allclose(result[i, j], qo.mul(self.q1[i, j], self.q2[i, j]))
+
+    def test_mul_broadcast(self):
+        result = qa.mul(self.q1, self.q2[0, 0])
+        for i in range(5):
+            for j in range(3):
+                np.testing.assert_allclose(result[i, j], qo.mul(self.q1[i, j], self.q2[0, 0]))
+        result = qa.mul(self.q1[:, :1], self.q2[0])
+        self.assertEqual(result.shape, (5, 3, 4))
+        for i in range(5):
+            for j in range(3):
+                np.testing.assert_allclose(result[i, j], qo.mul(self.q1[i, 0], self.q2[0, j]))
+
+    def test_mul_out(self):
+        expected = qa.mul(self.q1, self.q2)
+        out = np.empty((5, 3, 4))
+        result = qa.mul(self.q1, self.q2, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(out, expected)
+        qa.mul(self.q1, self.q2, out=self.q1)
+        np.testing.assert_allclose(self.q1, expected)
+        with self.assertRaises(ValueError):
+            qa.mul(self.q1, self.q2, out=np.empty((5, 4)))
+        with self.assertRaises(TypeError):
+            qa.mul(self.q1, self.q2, out=np.empty((5, 3, 4), dtype=np.float32))
+        with self.assertRaises(ValueError):
+            qa.mul(self.q1, self.q2, out=np.empty((5, 3, 8))[..., ::2])
+        with self.assertRaises(ValueError):
+            qa.mul(np.zeros((5, 3)), self.q2)
+
+    def test_unary(self):
+        for i in range(5):
+            for j in range(3):
+                q = Quaternion(self.q1[i, j])
+                np.testing.assert_allclose(qa.conjugate(self.q1)[i, j], q.conjugate().quadruple)
+                np.testing.assert_allclose(qa.norm(self.q1)[i, j], q.norm)
+                np.testing.assert_allclose(qa.versor(self.q1)[i, j], q.versor().quadruple)
+                np.testing.assert_allclose(qa.reciprocal(self.q1)[i, j], q.reciprocal().quadruple)
+                np.testing.assert_allclose(qa.exp(self.q1)[i, j], qo.exp(self.q1[i, j]))
+                np.testing.assert_allclose(qa.log(self.q1)[i, j], qo.log(self.q1[i, j]))
+                np.testing.assert_allclose(qa.power(self.q1, 2.5)[i, j], (q ** 2.5).quadruple)
+        np.testing.assert_allclose(qa.power(self.q1, 2), qa.mul(self.q1, self.q1))
+        np.testing.assert_allclose(qa.exp(qa.log(self.q1)), self.q1)
+        np.testing.assert_allclose(qa.mul(self.q1, qa.reciprocal(self.q1)),
+                                   np.broadcast_to([1.0, 0, 0, 0], self.q1.shape), atol=1e-12)
+
+    def test_power_broadcast(self):
+        p = np.array([0.5, 1.0, 2.0])
+        result = qa.power(self.q1, p)
+        for j in range(3):
+            np.testing.assert_allclose(result[:, j], qa.power(self.q1[:, j], p[j]))
+        np.testing.assert_allclose(qa.power(np.zeros(4), 0.5), np.zeros(4))
+
+    def test_pack_unpack(self):
+        objects = qa.unpack_quaternions(self.q1)
+        self.assertEqual(objects.shape, (5, 3))
+        self.assertIsInstance(objects[0, 0], Quaternion)
+        np.testing.assert_allclose(qa.pack_quaternions(objects), self.q1)
+        np.testing.assert_allclose(qa.pack_quaternions(list(objects[0])), self.q1[0])
+
+    def test_rotation_matrices(self):
+        result = qa.rotation_matrices(self.q1)
+        self.assertEqual(result.shape, (5, 3, 3, 3))
+        for i in range(5):
+            for j in range(3):
+                np.testing.assert_allclose(result[i, j], qo.quaternion_to_rotation_matrix(self.q1[i, j]))
+
+    def test_quaternions_from_rotation_matrices(self):
+        q = qa.versor(self.q1)
+        m = qa.rotation_matrices(q)
+        result = qa.quaternions_from_rotation_matrices(m)
+        self.assertEqual(result.shape, (5, 3, 4))
+        for i in range(5):
+            for j in range(3):
+                np.testing.assert_allclose(result[i, j], qo.quaternion_from_rotation_matrix(m[i, j]), atol=1e-12)
+        np.testing.assert_allclose(qa.rotation_matrices(result), m, atol=1e-12)
+        noisy = m + np.random.random(m.shape) * 1e-8
+        with self.assertWarns(UserWarning):
+            qa.quaternions_from_rotation_matrices(noisy)
+        result, mask = qa.quaternions_from_rotation_matrices(noisy, return_mask=True)
+        self.assertEqual(mask.shape, (5, 3))
+        self.assertTrue(mask.all())
+        np.testing.assert_allclose(np.abs(np.sum(result * q, axis=-1)), np.ones((5, 3)), atol=1e-6)
+        result, mask = qa.quaternions_from_rotation_matrices(m, return_mask=True)
+        self.assertFalse(mask.any())
+        m[2, 1] *= 2
+        with self.assertRaises(ValueError):
+            qa.quaternions_from_rotation_matrices(m)
+        with self.assertRaises(ValueError):
+            qa.quaternions_from_rotation_matrices(np.eye(4))
+
+    def test_cumprod_reduce(self):
+        q = qa.versor(np.random.random((3, 9000, 4)) - 0.5)
+        expected = np.empty_like(q)
+        expected[:, 0] = q[:, 0]
+        for i in range(1, 9000):
+            expected[:, i] = qa.mul(expected[:, i - 1], q[:, i])
+        for method in ['auto', 'sequential', 'tree']:
+            np.testing.assert_allclose(qa.cumprod(q, method=method), expected, atol=1e-12)
+            np.testing.assert_allclose(qa.reduce(q, method=method), expected[:, -1], atol=1e-12)
+        result = qa.cumprod(q, renormalize=100, method='tree')
+        np.testing.assert_allclose(qa.norm(result), np.ones((3, 9000)))
+        np.testing.assert_allclose(result, expected, atol=1e-12)
+        transposed = np.swapaxes(q, 0, 1)
+        np.testing.assert_allclose(qa.cumprod(transposed, axis=0), np.swapaxes(expected, 0, 1), atol=1e-12)
+        np.testing.assert_allclose(qa.reduce(transposed, axis=0), expected[:, -1], atol=1e-12)
+        qa.cumprod(q, out=q)
+        np.testing.assert_allclose(q, expected, atol=1e-12)
+        np.testing.assert_allclose(qa.reduce(np.empty((2, 0, 4))), [[1, 0, 0, 0], [1, 0, 0, 0]])
+        self.assertEqual(qa.cumprod(np.empty((2, 0, 4))).shape, (2, 0, 4))
+        with self.assertRaises(ValueError):
+            qa.cumprod(q, axis=2)
+        with self.assertRaises(ValueError):
+            qa.reduce(q, method='parallel')
+        with self.assertRaises(ValueError):
+            qa.reduce(q, renormalize=-1)
+        with self.assertRaises(ValueError):
+            qa.reduce(np.zeros(4))
+
+    def test_unique(self):
+        rng = np.random.default_rng(0)
+        centers = qa.versor(rng.normal(size=(50, 4)))
+        centers[:10, 0] = 1e-4 * rng.normal(size=10)
+        centers = qa.versor(centers)
+        labels = rng.integers(0, 50, 2000)
+        q = centers[labels] + 1e-4 * rng.normal(size=(2000, 4))
+        signs = rng.choice([-1.0, 1.0], 2000)[:, np.newaxis]
+        q *= signs
+        u, index, inverse, counts = qa.unique(q.reshape(40, 50, 4), tol=1e-2, return_index=True,
+                                              return_inverse=True, return_counts=True)
+        self.assertEqual(inverse.shape, (40, 50))
+        inverse = inverse.ravel()
+        self.assertEqual(len(u), len(np.unique(labels)))
+        np.testing.assert_array_equal(u, q[index])
+        np.testing.assert_array_equal(index, np.sort(np.unique(labels, return_index=True)[1]))
+        np.testing.assert_array_equal(inverse[index], np.arange(len(u)))
+        self.assertEqual(counts.sum(), 2000)
+        np.testing.assert_array_equal(counts, np.bincount(inverse))
+        for i in range(len(u)):
+            self.assertTrue(np.all(labels[inverse == i] == labels[index[i]]))
+        # without folding q and -q are different
+        u_signed = qa.unique(q, tol=1e-2, antipodal=False)
+        self.assertEqual(len(u_signed), len(np.unique(np.stack([labels, signs[:, 0]]), axis=1).T))
+        # pairs across cell boundaries are found
+        p = np.array([[0.5, 0.5, 0.5, 0.5]])
+        for distance, n_unique in [(0.5e-8, 1), (0.99e-8, 1), (1.01e-8, 2)]:
+            for direction in [1, -1]:
+                pairs = np.concatenate([p, p + direction * distance / 2])
+                self.assertEqual(len(qa.unique(pairs, tol=1e-8)), n_unique)
+        self.assertEqual(len(qa.unique(np.array([[0, 1, 0, 0], [0, -1, 1e-12, 0]]))), 1)
+        self.assertEqual(len(qa.unique(np.array([[1e-9, 0, 1, 0], [1e-9, 0, -1, 0]]))), 1)
+        u, counts = qa.unique(np.empty((0, 4)), return_counts=True)
+        self.assertEqual(u.shape, (0, 4))
+        self.assertEqual(counts.shape, (0,))
+        with self.assertRaises(ValueError):
+            qa.unique(q, tol=0)
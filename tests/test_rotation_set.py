@@ -0,0 +1,122 @@
+import numpy as np
+
+from BDQuaternions import Rotation, RotationSet, Conventions
+from BDQuaternions.utils import random_rotation
+
+import unittest
+
+
+class TestRotationSet(unittest.TestCase):
+
+    def setUp(self):
+        self.conventions = Conventions()
+        self.rotations = [random_rotation() for _ in range(10)]
+        self.rotation_set = RotationSet.from_rotations(self.rotations)
+
+    def test_constructor(self):
+        self.assertEqual(len(RotationSet()), 1)
+        default_set = RotationSet(copy=False)
+        default_set.quadruples[0] = [0, 1, 0, 0]
+        np.testing.assert_allclose(RotationSet(copy=False).quadruples, [[1, 0, 0, 0]])
+        np.testing.assert_allclose(RotationSet().quadruples, [[1, 0, 0, 0]])
+        self.assertEqual(len(self.rotation_set), 10)
+        self.assertEqual(self.rotation_set.euler_angles_convention.label, 'Bunge')
+        with self.assertRaises(ValueError):
+            RotationSet(np.ones((3, 4)))
+        with self.assertRaises(ValueError):
+            RotationSet(np.ones((3, 3)))
+        quadruples = self.rotation_set.quadruples.copy()
+        rotation_set = RotationSet(quadruples, copy=False)
+        self.assertTrue(np.shares_memory(rotation_set.quadruples, quadruples))
+        rotation_set = RotationSet(quadruples, self.conventions.get_convention('Roe'))
+        self.assertFalse(np.shares_memory(rotation_set.quadruples, quadruples))
+        self.assertEqual(rotation_set.euler_angles_convention.label, 'Roe')
+
+    def test_conversion(self):
+        for rotation, rotation_back in zip(self.rotations, self.rotation_set.to_rotations()):
+            self.assertEqual(rotation, rotation_back)
+        for i, rotation in enumerate(self.rotation_set):
+            self.assertIsInstance(rotation, Rotation)
+            self.assertEqual(rotation, self.rotations[i])
+        self.assertEqual(len(RotationSet.from_rotations([])), 0)
+
+    def test_indexing(self):
+        self.assertEqual(self.rotation_set[3], self.rotations[3])
+        self.assertEqual(self.rotation_set[-1], self.rotations[-1])
+        subset = self.rotation_set[2:8:2]
+        self.assertIsInstance(subset, RotationSet)
+        self.assertEqual(len(subset), 3)
+        self.assertTrue(np.shares_memory(subset.quadruples, self.rotation_set.quadruples))
+        self.assertEqual(subset[1], self.rotations[4])
+        self.rotation_set[0] = Rotation()
+        np.testing.assert_allclose(self.rotation_set.quadruples[0], [1, 0, 0, 0])
+        with self.assertRaises(TypeError):
+            self.rotation_set[0] = 1
+        with self.assertRaises(IndexError):
+            _ = self.rotation_set[0, 0]
+
+    def test_composition(self):
+        product = self.rotation_set * self.rotation_set
+        for i in range(10):
+            self.assertEqual(product[i], self.rotations[i] * self.rotations[i])
+        product = self.rotation_set * self.rotations[0]
+        for i in range(10):
+            self.assertEqual(product[i], self.rotations[i] * self.rotations[0])
+        product = self.rotations[0] * self.rotation_set
+        for i in range(10):
+            self.assertEqual(product[i], self.rotations[0] * self.rotations[i])
+        identity = self.rotation_set * self.rotation_set.reciprocal()
+        np.testing.assert_allclose(np.abs(identity.quadruples[:, 0]), np.ones(10))
+        with self.assertRaises(TypeError):
+            _ = self.rotation_set * 2
+
+    def test_cumprod_reduce(self):
+        product = self.rotations[0]
+        cumulative = self.rotation_set.cumprod()
+        self.assertIsInstance(cumulative, RotationSet)
+        self.assertIs(cumulative.euler_angles_convention, self.rotation_set.euler_angles_convention)
+        self.assertEqual(cumulative[0], product)
+        for i in range(1, 10):
+            product = product * self.rotations[i]
+            self.assertEqual(cumulative[i], product)
+        total = self.rotation_set.reduce(method='tree')
+        self.assertIsInstance(total, Rotation)
+        self.assertEqual(total, product)
+        self.assertEqual(RotationSet(np.empty((0, 4))).reduce(), Rotation())
+
+    def test_unique(self):
+        duplicated = RotationSet(np.concatenate([self.rotation_set.quadruples, -self.rotation_set.quadruples]))
+        duplicated.euler_angles_convention = self.rotation_set.euler_angles_convention
+        unique = duplicated.unique()
+        self.assertIsInstance(unique, RotationSet)
+        self.assertIs(unique.euler_angles_convention, self.rotation_set.euler_angles_convention)
+        np.testing.assert_array_equal(unique.quadruples, self.rotation_set.quadruples)
+        unique, inverse, counts = duplicated.unique(return_inverse=True, return_counts=True)
+        np.testing.assert_array_equal(inverse, np.tile(np.arange(10), 2))
+        np.testing.assert_array_equal(counts, np.full(10, 2))
+
+    def test_rotation_matrix(self):
+        matrices = self.rotation_set.rotation_matrix
+        self.assertEqual(matrices.shape, (10, 3, 3))
+        for i in range(10):
+            np.testing.assert_allclose(matrices[i], self.rotations[i].rotation_matrix)
+
+    def test_euler_angles(self):
+        for label in ['Bunge', 'Kocks', 'XYZs']:
+            self.rotation_set.euler_angles_convention = label
+            euler_angles = self.rotation_set.euler_angles
+            self.assertEqual(euler_angles.shape, (10, 3))
+            for i in range(10):
+                self.rotations[i].euler_angles_convention = label
+                np.testing.assert_allclose(euler_angles[i], self.rotations[i].euler_angles.euler_angles)
+
+    def test_from_rotation_matrices(self):
+        rotation_set = RotationSet.from_rotation_matrices(self.rotation_set.rotation_matrix)
+        np.testing.assert_allclose(rotation_set.rotation_matrix, self.rotation_set.rotation_matrix, atol=1e-12)
+        self.assertEqual(len(rotation_set), 10)
+
+    def test_random(self):
+        rotation_set = RotationSet.random(100, seed=5)
+        self.assertEqual(len(rotation_set), 100)
+        np.testing.assert_allclose(RotationSet.random(100, seed=5).quadruples, rotation_set.quadruples)
+        np.testing.assert_allclose(np.linalg.norm(rotation_set.quadruples, axis=1), np.ones(100))
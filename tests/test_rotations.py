@@ -1,11 +1,16 @@
 import sys
 import unittest
 import numpy as np
+from array import array
 
-from BDQuaternions import Rotation
+from BDQuaternions import Quaternion, Rotation
 from BDQuaternions import Conventions, EulerAngles
 
 
+class OrientedRotation(Rotation):
+    pass
+
+
 class TestRotation(unittest.TestCase):
 
     def setUp(self):
@@ -34,12 +39,41 @@ class TestRotation(unittest.TestCase):
             _ = self.q1 + 3
         with self.assertRaises(TypeError):
             _ = self.q1 - 3
+        q = Rotation()
+        with self.assertRaises(TypeError):
+            q += 3
+        with self.assertRaises(TypeError):
+            q -= q
 
     def test_mul(self):
         self.assertEqual(self.q1 * self.q1, self.q1)
         with self.assertRaises(TypeError):
             _ = self.q1 * 'x'
 
+    def test_subclass(self):
+        r = OrientedRotation(np.array([0.5, 0.5, 0.5, 0.5]))
+        for result in [r * r, r * self.q1, r * 1, -1 * r, r.conjugate(), r.reciprocal()]:
+            self.assertIs(type(result), OrientedRotation)
+        self.assertIs(type(self.q1 * r), Rotation)
+        self.assertIs(type(r * 2), Quaternion)
+
+    def test_in_place_mul(self):
+        convention = Conventions().get_convention('Bunge')
+        q = Rotation(np.array([np.cos(0.3), np.sin(0.3), 0, 0]), euler_angles_convention=convention)
+        p = Rotation(np.array([np.cos(0.2), 0, np.sin(0.2), 0]))
+        expected = q * p
+        q_id = id(q)
+        q *= p
+        self.assertEqual(id(q), q_id)
+        self.assertIsInstance(q, Rotation)
+        self.assertEqual(q, expected)
+        self.assertIs(q.euler_angles_convention, convention)
+        out = Rotation()
+        self.assertEqual(q.mul_into(p, out), q * p)
+        q *= 0.5
+        self.assertNotEqual(id(q), q_id)
+        self.assertNotIsInstance(q, Rotation)
+
     def test_axis_angle(self):
         axis, angle = self.q1.axis_angle
         np.testing.assert_allclose(axis, np.zeros(3))
@@ -81,7 +115,12 @@ class TestRotation(unittest.TestCase):
         self.q1.euler_angles = EulerAngles(np.array([np.pi / 2, 0, 0]), self.q1.euler_angles_convention)
         np.testing.assert_allclose(self.q1.rotate_vector(np.array([1.0, 0.0, 0.0])),
                                    np.array([0.0, 1.0, 0.0]), atol=np.finfo(float).eps * 4)
-        with self.assertRaises(TypeError):
+        np.testing.assert_allclose(self.q1.rotate_vector([1, 0, 0]), [0.0, 1.0, 0.0], atol=1e-15)
+        np.testing.assert_allclose(self.q1.rotate_vector(array('d', [1.0, 0.0, 0.0])), [0.0, 1.0, 0.0], atol=1e-15)
+        vector_part = Quaternion(np.array([0.0, 1.0, 0.0, 0.0])).vector_part()
+        self.assertNotIsInstance(vector_part, np.ndarray)
+        np.testing.assert_allclose(self.q1.rotate_vector(vector_part), [0.0, 1.0, 0.0], atol=1e-15)
+        with self.assertRaises(ValueError):
             self.q1.rotate([0, 1])
         with self.assertRaises(TypeError):
             self.q1.rotate('x')
@@ -96,7 +135,11 @@ class TestRotation(unittest.TestCase):
         self.q1.euler_angles = EulerAngles(np.array([np.pi/2, 0, 0]), self.q1.euler_angles_convention)
         np.testing.assert_allclose(self.q1.rotate(np.array([[1.0, 0.0, 0.0]])),
                                    np.array([[0.0, 1.0, 0.0]]), atol=np.finfo(float).eps * 4)
-        with self.assertRaises(TypeError):
+        np.testing.assert_allclose(self.q1.rotate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]),
+                                   [[0.0, 1.0, 0.0], [-1.0, 0.0, 0.0]], atol=1e-15)
+        xyz = np.array([[1.0, 0.0, 0.0]])
+        np.testing.assert_allclose(self.q1.rotate(memoryview(xyz)), [[0.0, 1.0, 0.0]], atol=1e-15)
+        with self.assertRaises(ValueError):
             self.q1.rotate([0, 1])
         with self.assertRaises(TypeError):
             self.q1.rotate('x')
@@ -121,3 +164,66 @@ class TestRotation(unittest.TestCase):
         elapsed1 = time.time() - t0
         print('Cy:', elapsed1, 'np:', elapsed2)
         np.testing.assert_allclose(result1, result2)
+
+    def test_rotate_out(self):
+        self.q1.axis_angle = ([1, 2, 3], np.pi / 3)
+        m = np.asarray(self.q1.rotation_matrix)
+        xyz = (np.random.random((100, 3)) - 0.5) * 100
+        expected = np.dot(m, xyz.T).T
+        out = np.empty_like(xyz)
+        result = self.q1.rotate(xyz, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(out, expected)
+        xyz_strided = np.asfortranarray(np.repeat(xyz, 2, axis=0)[::2])
+        np.testing.assert_allclose(self.q1.rotate(xyz_strided), expected)
+        xyz_f = xyz.astype(np.float32)
+        result_f = self.q1.rotate(xyz_f)
+        self.assertEqual(result_f.dtype, np.float32)
+        np.testing.assert_allclose(result_f, expected, rtol=1e-5, atol=1e-4)
+        xyz_ro = xyz.copy()
+        xyz_ro.flags.writeable = False
+        np.testing.assert_allclose(self.q1.rotate(xyz_ro), expected)
+        np.testing.assert_allclose(self.q1.rotate(xyz.astype(int)), np.dot(m, xyz.astype(int).T).T)
+        self.q1.rotate(xyz, out=xyz)
+        np.testing.assert_allclose(xyz, expected)
+        v = np.array([1.0, 2.0, 3.0])
+        self.q1.rotate_vector(v, out=v)
+        np.testing.assert_allclose(v, np.dot(m, [1.0, 2.0, 3.0]))
+        with self.assertRaises(ValueError):
+            self.q1.rotate(xyz, out=np.empty((10, 3)))
+        with self.assertRaises(TypeError):
+            self.q1.rotate(xyz, out=np.empty((100, 3), dtype=np.float32))
+        with self.assertRaises(ValueError):
+            self.q1.rotate(np.zeros((10, 2)))
+        with self.assertRaises(ValueError):
+            self.q1.rotate_vector(np.zeros((10, 3)))
+
+    def test_cached_representations(self):
+        conventions = Conventions()
+        self.q1.axis_angle = ([0, 0, 1], np.pi / 2)
+        m = self.q1.rotation_matrix
+        m[:] = 0
+        np.testing.assert_allclose(self.q1.rotation_matrix, [[0, -1, 0], [1, 0, 0], [0, 0, 1]], atol=1e-15)
+        ea = self.q1.euler_angles
+        expected = np.array(ea.euler_angles)
+        ea.euler_angles = np.zeros(3)
+        np.testing.assert_allclose(self.q1.euler_angles.euler_angles, expected)
+        self.assertEqual(self.q1.euler_angles.to_quaternion(), self.q1)
+        self.assertEqual(str(self.q1), str(self.q1))
+        self.q1.euler_angles_convention = conventions.get_convention('ZXZr')
+        self.assertIs(self.q1.euler_angles.convention, self.q1.euler_angles_convention)
+        self.assertIn('ZXZr', str(self.q1))
+        self.q1.quadruple[:] = [0, 1, 0, 0]
+        np.testing.assert_allclose(self.q1.rotation_matrix, np.diag([1, -1, -1]), atol=1e-15)
+        np.testing.assert_allclose(self.q1.rotate_vector(np.array([0.0, 1.0, 0.0])), [0, -1, 0], atol=1e-15)
+        axis, angle = self.q1.axis_angle
+        np.testing.assert_allclose(axis, [1, 0, 0])
+        np.testing.assert_allclose(angle, np.pi)
+        self.q1.polar = 1, [0, 1, 0], np.pi / 2
+        np.testing.assert_allclose(self.q1.axis_angle[0], [0, 1, 0])
+        self.q1.rotation_matrix = np.eye(3)
+        np.testing.assert_allclose(self.q1.euler_angles.euler_angles, np.zeros(3), atol=1e-15)
+        self.q1 *= Rotation(np.array([0, 0, 0, 1], dtype=np.double))
+        np.testing.assert_allclose(self.q1.rotation_matrix, np.diag([-1, -1, 1]), atol=1e-15)
+        self.q1.euler_angles = EulerAngles(np.array([0, 0, np.pi / 2]), self.q1.euler_angles_convention)
+        self.assertEqual(self.q1.euler_angles.to_quaternion(), Rotation(np.array([1, 0, 0, 1]) / np.sqrt(2)))
@@ -0,0 +1,128 @@
+import os
+import pickle
+import tempfile
+import numpy as np
+
+from BDQuaternions import Quaternion, UnitQuaternion, Rotation, RotationSet, EulerAngles, Conventions, PointGroup
+from BDQuaternions.symmetry import get_point_group
+from BDQuaternions.storage import save_rotations, load_rotations, rotations_file_info
+from BDQuaternions.utils import random_rotation
+
+import unittest
+
+
+class OrientedRotation(Rotation):
+    pass
+
+
+class LabelledQuaternion(Quaternion):
+    pass
+
+
+class TestPickle(unittest.TestCase):
+
+    def setUp(self):
+        self.conventions = Conventions()
+
+    def test_quaternions(self):
+        for q in [Quaternion(np.array([1, 2, 3, 4], dtype=np.double)),
+                  UnitQuaternion(np.array([0, 1, 0, 0], dtype=np.double))]:
+            restored = pickle.loads(pickle.dumps(q))
+            self.assertIs(type(restored), type(q))
+            np.testing.assert_array_equal(restored.quadruple, q.quadruple)
+        rotation = random_rotation()
+        rotation.euler_angles_convention = self.conventions.get_convention('XYZr')
+        restored = pickle.loads(pickle.dumps(rotation))
+        self.assertIs(type(restored), Rotation)
+        np.testing.assert_array_equal(restored.quadruple, rotation.quadruple)
+        self.assertIs(restored.euler_angles_convention, rotation.euler_angles_convention)
+        rotations = np.array([random_rotation() for _ in range(5)], dtype=object)
+        restored = pickle.loads(pickle.dumps(rotations))
+        self.assertTrue(all(r1 == r2 for r1, r2 in zip(restored, rotations)))
+
+    def test_subclasses(self):
+        rotation = OrientedRotation(np.array([0.5, 0.5, 0.5, 0.5]), self.conventions.get_convention('Roe'))
+        restored = pickle.loads(pickle.dumps(rotation))
+        self.assertIs(type(restored), OrientedRotation)
+        self.assertEqual(restored, rotation)
+        self.assertIs(restored.euler_angles_convention, rotation.euler_angles_convention)
+        self.assertIs(type(pickle.loads(pickle.dumps(LabelledQuaternion()))), LabelledQuaternion)
+
+    def test_registries(self):
+        convention = self.conventions.get_convention('Bunge')
+        self.assertIs(pickle.loads(pickle.dumps(convention)), convention)
+        self.assertLess(len(pickle.dumps(convention)), 100)
+        point_group = get_point_group('cubic')
+        self.assertIs(pickle.loads(pickle.dumps(point_group)), point_group)
+        custom = PointGroup('custom', [[1, 0, 0, 0], [0, 0, 0, 1]])
+        restored = pickle.loads(pickle.dumps(custom))
+        self.assertEqual(restored.label, 'custom')
+        np.testing.assert_allclose(restored.operators, custom.operators)
+
+    def test_euler_angles(self):
+        ea = EulerAngles(np.array([0.1, 0.2, 0.3]), self.conventions.get_convention('Bunge'))
+        restored = pickle.loads(pickle.dumps(ea))
+        np.testing.assert_allclose(restored.euler_angles, ea.euler_angles)
+        self.assertIs(restored.convention, ea.convention)
+        kocks = self.conventions.get_convention('Kocks')
+        ea = EulerAngles(np.zeros(3), kocks)
+        ea.from_rotation_matrix(np.asarray(Rotation(np.array([0.5, 0.5, 0.5, 0.5])).rotation_matrix), kocks)
+        self.assertGreater(ea.euler_angles[2], np.pi)
+        restored = pickle.loads(pickle.dumps(ea))
+        np.testing.assert_array_equal(restored.euler_angles, ea.euler_angles)
+        self.assertIs(restored.convention, kocks)
+
+    def test_rotation_set_out_of_band(self):
+        rotation_set = RotationSet.random(100, seed=0)
+        buffers = []
+        data = pickle.dumps(rotation_set, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 1)
+        self.assertLess(len(data), 1000)
+        restored = pickle.loads(data, buffers=buffers)
+        np.testing.assert_array_equal(restored.quadruples, rotation_set.quadruples)
+        self.assertTrue(np.shares_memory(restored.quadruples, rotation_set.quadruples))
+        restored = pickle.loads(pickle.dumps(rotation_set, protocol=2))
+        np.testing.assert_array_equal(restored.quadruples, rotation_set.quadruples)
+        self.assertIs(restored.euler_angles_convention, rotation_set.euler_angles_convention)
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'rotations.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_load(self):
+        rotation_set = RotationSet.random(1000, seed=1)
+        rotation_set.euler_angles_convention = 'Roe'
+        save_rotations(self.path, rotation_set, chunk_size=64)
+        info = rotations_file_info(self.path)
+        self.assertEqual(info['count'], 1000)
+        self.assertEqual(info['euler_angles_convention'], 'Roe')
+        self.assertEqual((os.path.getsize(self.path) - 1000 * 32) % 64, 0)
+        loaded = load_rotations(self.path)
+        self.assertIsInstance(loaded.quadruples, np.memmap)
+        self.assertFalse(loaded.quadruples.flags.writeable)
+        np.testing.assert_array_equal(loaded.quadruples, rotation_set.quadruples)
+        self.assertIs(loaded.euler_angles_convention, rotation_set.euler_angles_convention)
+        np.testing.assert_allclose(loaded.rotation_matrix, rotation_set.rotation_matrix)
+        in_memory = load_rotations(self.path, mmap_mode=None)
+        self.assertNotIsInstance(in_memory.quadruples, np.memmap)
+        np.testing.assert_array_equal(in_memory.quadruples, rotation_set.quadruples)
+        del loaded
+
+    def test_arrays_and_errors(self):
+        save_rotations(self.path, np.empty((0, 4)))
+        self.assertEqual(len(load_rotations(self.path)), 0)
+        self.assertEqual(load_rotations(self.path).euler_angles_convention.label, 'Bunge')
+        with self.assertRaises(ValueError):
+            save_rotations(self.path, np.zeros((3, 3)))
+        with self.assertRaises(ValueError):
+            save_rotations(self.path, np.zeros((3, 4)), euler_angles_convention='abc')
+        with open(self.path, 'wb') as f:
+            f.write(b'garbage')
+        with self.assertRaises(ValueError):
+            load_rotations(self.path)
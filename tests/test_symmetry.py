@@ -0,0 +1,95 @@
+import numpy as np
+
+from BDQuaternions import PointGroup
+from BDQuaternions import quaternion_arrays as qa
+from BDQuaternions.symmetry import get_point_group, point_groups, misorientation_angles, disorientations
+from BDQuaternions.symmetry import reduce_to_fundamental_zone, map_misorientation_angles
+
+import unittest
+
+
+def random_versors(shape):
+    return qa.versor(np.random.random(shape + (4,)) - 0.5)
+
+
+def brute_force_angles(q1, q2, operators):
+    d = qa.mul(qa.conjugate(q1), q2)
+    w = np.abs(qa.mul(qa.mul(operators[:, np.newaxis, np.newaxis], d), operators[np.newaxis, :, np.newaxis])[..., 0])
+    return 2 * np.arccos(np.clip(np.max(w, axis=(0, 1)), -1, 1))
+
+
+class TestSymmetry(unittest.TestCase):
+
+    def setUp(self):
+        self.q1 = random_versors((50,))
+        self.q2 = random_versors((50,))
+
+    def test_point_groups(self):
+        orders = {'1': 1, '2': 2, '222': 4, '4': 4, '422': 8, '3': 3, '32': 6, '6': 6, '622': 12, '23': 12, '432': 24}
+        self.assertEqual(sorted(point_groups()), sorted(orders.keys()))
+        for label, order in orders.items():
+            point_group = get_point_group(label)
+            self.assertIsInstance(point_group, PointGroup)
+            self.assertEqual(len(point_group), order)
+            operators = point_group.operators
+            products = qa.mul(operators[:, np.newaxis], operators[np.newaxis, :]).reshape(-1, 4)
+            overlap = np.abs(np.dot(products, operators.T))
+            np.testing.assert_allclose(np.max(overlap, axis=1), np.ones(order * order))
+        self.assertIs(get_point_group('cubic'), get_point_group('432'))
+        self.assertIs(get_point_group('D6'), get_point_group('hexagonal'))
+        self.assertIs(get_point_group(get_point_group('m-3m')), get_point_group('O'))
+        with self.assertRaises(ValueError):
+            get_point_group('abc')
+        with self.assertRaises(ValueError):
+            get_point_group('cubic').operators[0, 0] = 0
+
+    def test_misorientation_angles(self):
+        for label in point_groups():
+            operators = get_point_group(label).operators
+            angles = misorientation_angles(self.q1, self.q2, label)
+            np.testing.assert_allclose(angles, brute_force_angles(self.q1, self.q2, operators), atol=1e-7)
+            np.testing.assert_allclose(misorientation_angles(self.q1, qa.mul(self.q1, operators[-1]), label),
+                                       np.zeros(50), atol=1e-7)
+        self.assertTrue(np.max(misorientation_angles(self.q1, self.q2, 'cubic')) <= np.deg2rad(62.8))
+        angles = misorientation_angles(self.q1[0], self.q2.reshape(5, 10, 4), 'cubic')
+        self.assertEqual(angles.shape, (5, 10))
+        np.testing.assert_allclose(angles.ravel(), misorientation_angles(self.q1[0], self.q2, 'cubic'))
+
+    def test_disorientations(self):
+        for label in ['432', '622', '222']:
+            d = disorientations(self.q1, self.q2, label)
+            self.assertTrue((d[:, 0] >= 0).all())
+            np.testing.assert_allclose(2 * np.arccos(np.clip(d[:, 0], -1, 1)),
+                                       misorientation_angles(self.q1, self.q2, label), atol=1e-7)
+            operators = get_point_group(label).operators
+            d_raw = qa.mul(qa.conjugate(self.q1), self.q2)
+            equivalent = np.abs(np.einsum('ngi,ni->ng', qa.mul(d_raw[:, np.newaxis], operators), d))
+            np.testing.assert_allclose(np.max(equivalent, axis=1), np.ones(50))
+
+    def test_fundamental_zone(self):
+        for label in ['432', '6', '2']:
+            operators = get_point_group(label).operators
+            reduced = reduce_to_fundamental_zone(self.q1, label)
+            self.assertTrue((reduced[:, 0] >= 0).all())
+            candidates = np.abs(qa.mul(self.q1[:, np.newaxis], operators)[..., 0])
+            np.testing.assert_allclose(reduced[:, 0], np.max(candidates, axis=1))
+            np.testing.assert_allclose(reduce_to_fundamental_zone(reduced, label), reduced, atol=1e-12)
+            np.testing.assert_allclose(misorientation_angles(reduced, self.q1, label), np.zeros(50), atol=1e-7)
+        crystal = get_point_group('432').operators
+        sample = get_point_group('222').operators
+        reduced = reduce_to_fundamental_zone(self.q1, 'cubic', 'orthorhombic')
+        candidates = np.abs(qa.mul(qa.mul(sample[:, np.newaxis, np.newaxis], self.q1[:, np.newaxis]), crystal)[..., 0])
+        np.testing.assert_allclose(reduced[:, 0], np.max(candidates, axis=0).max(axis=1))
+        q = self.q1.copy()
+        reduce_to_fundamental_zone(q, 'cubic', out=q)
+        np.testing.assert_allclose(q, reduce_to_fundamental_zone(self.q1, 'cubic'))
+
+    def test_map(self):
+        q_map = random_versors((4, 5))
+        right, bottom = map_misorientation_angles(q_map, 'cubic')
+        self.assertEqual(right.shape, (4, 4))
+        self.assertEqual(bottom.shape, (3, 5))
+        self.assertAlmostEqual(right[1, 2], misorientation_angles(q_map[1, 2], q_map[1, 3], 'cubic'))
+        self.assertAlmostEqual(bottom[2, 4], misorientation_angles(q_map[2, 4], q_map[3, 4], 'cubic'))
+        with self.assertRaises(ValueError):
+            map_misorientation_angles(q_map[0], 'cubic')
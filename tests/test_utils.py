@@ -50,3 +50,39 @@ class TestUtils(unittest.TestCase):
             np.testing.assert_allclose(qs.shape, shape)
             for q in qs.ravel():
                 np.testing.assert_allclose(q.norm, q_norm)
+
+    def test_uniform_quadruples(self):
+        q = utl.random_rotations_quadruples(200000, seed=1)
+        self.assertEqual(q.shape, (200000, 4))
+        np.testing.assert_allclose(np.linalg.norm(q, axis=1), np.ones(200000))
+        np.testing.assert_allclose(np.mean(q, axis=0), np.zeros(4), atol=1e-2)
+        np.testing.assert_allclose(np.mean(q ** 2, axis=0), np.ones(4) / 4, atol=1e-2)
+        np.testing.assert_allclose(np.mean(q < 0, axis=0), np.ones(4) / 2, atol=1e-2)
+        theta = np.array([0.5, 1.0, 2.0, 3.0])
+        angles = 2 * np.arccos(np.abs(q[:, 0]))
+        cdf = (angles[:, np.newaxis] <= theta).mean(axis=0)
+        np.testing.assert_allclose(cdf, (theta - np.sin(theta)) / np.pi, atol=1e-2)
+
+    def test_seeds_and_streams(self):
+        np.testing.assert_array_equal(utl.random_rotations_quadruples((3, 2), seed=7),
+                                      utl.random_rotations_quadruples((3, 2), seed=7))
+        generator = np.random.default_rng(7)
+        first = utl.random_unit_quaternions_quadruples(5, seed=generator)
+        second = utl.random_unit_quaternions_quadruples(5, seed=generator)
+        self.assertFalse(np.allclose(first, second))
+        streams = utl.spawn_generators(42, 3)
+        self.assertEqual(len(streams), 3)
+        samples = [utl.random_rotations_quadruples(4, seed=stream) for stream in streams]
+        self.assertFalse(np.allclose(samples[0], samples[1]))
+        np.testing.assert_array_equal(samples[2],
+                                      utl.random_rotations_quadruples(4, seed=utl.spawn_generators(42, 3)[2]))
+        self.assertEqual(utl.random_rotation(seed=3), utl.random_rotation(seed=3))
+
+    def test_out(self):
+        out = np.empty((70000, 4))
+        result = utl.random_quaternions_quadruples(quadruple_norm=2.0, seed=0, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(np.linalg.norm(out, axis=1), np.full(70000, 2.0))
+        self.assertEqual(utl.random_rotations_quadruples().shape, (4,))
+        with self.assertRaises(ValueError):
+            utl.random_rotations_quadruples(3, out=out)